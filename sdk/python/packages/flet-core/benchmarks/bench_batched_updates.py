@@ -0,0 +1,56 @@
+"""
+Benchmark of an event handler changing 50 Text values with a separate
+`control.update()` call for each, sent immediately, in `page.batch()` block
+or in `page.update_on_next_tick` mode.
+
+Run with:
+
+    python benchmarks/bench_batched_updates.py
+"""
+
+import asyncio
+import time
+
+import flet_core as ft
+from bench_page import create_page
+
+TEXTS = 50
+EVENTS = 200
+
+
+def handle_event(texts, n):
+    for t in texts:
+        t.value = f"{n}"
+        t.update()
+
+
+def bench(mode: str):
+    page = create_page()
+    texts = [ft.Text("0") for _ in range(TEXTS)]
+    page.add(ft.Column(texts))
+    page.update_on_next_tick = mode == "next tick"
+    page.connection.messages = 0
+
+    start = time.perf_counter()
+    for n in range(EVENTS):
+        if mode == "batch":
+            with page.batch():
+                handle_event(texts, n)
+        else:
+            handle_event(texts, n)
+        # next event loop iteration
+        page.loop.run_until_complete(asyncio.sleep(0))
+    elapsed = time.perf_counter() - start
+    return elapsed, page.connection.messages, page.coalesced_updates
+
+
+def main():
+    print(f"{EVENTS} events, {TEXTS} control.update() calls each\n")
+    print(f"{'mode':<12}{'time, ms':>10}{'messages':>10}{'coalesced':>11}")
+    for mode in ["immediate", "batch", "next tick"]:
+        elapsed, messages, coalesced = bench(mode)
+        print(f"{mode:<12}{elapsed * 1000:>10.1f}{messages:>10}{coalesced:>11}")
+
+
+if __name__ == "__main__":
+    main()
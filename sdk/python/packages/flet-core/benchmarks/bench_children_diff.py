@@ -0,0 +1,80 @@
+"""
+Benchmark of children reconciliation in `Control.build_update_commands`.
+
+Compares identity-keyed matching of children against a `difflib.SequenceMatcher`
+based diff (previous implementation) for containers with 1k/10k/100k children,
+and reports the total time of `build_update_commands()` after the change.
+
+Run with:
+
+    python benchmarks/bench_children_diff.py
+"""
+
+import random
+import time
+from difflib import SequenceMatcher
+
+import flet_core as ft
+from flet_core.control import _match_children
+
+
+def make_column(n):
+    col = ft.Column()
+    col._Control__uid = "col"
+    for i in range(n):
+        ctrl = ft.Text(str(i))
+        ctrl._Control__uid = f"_{i}"
+        col.controls.append(ctrl)
+    col.build_update_commands([], [], [], [], False)
+    return col
+
+
+def edit(controls, r):
+    # one insert, one delete and one move
+    controls.insert(r.randint(0, len(controls)), ft.Text("new"))
+    del controls[r.randint(0, len(controls) - 1)]
+    controls.insert(r.randint(0, len(controls)), controls.pop())
+
+
+def shuffle(controls, r):
+    r.shuffle(controls)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(n, mutate):
+    col = make_column(n)
+    previous = list(col._previous_children)
+    mutate(col.controls, random.Random(n))
+    current = col.controls
+
+    keyed = timed(_match_children, previous, current)
+    difflib = (
+        timed(
+            lambda: SequenceMatcher(
+                None, [hash(c) for c in previous], [hash(c) for c in current]
+            ).get_opcodes()
+        )
+        if n <= 10_000
+        else float("nan")
+    )
+    total = timed(col.build_update_commands, [], [], [], [], False)
+    return keyed, difflib, total
+
+
+if __name__ == "__main__":
+    print(
+        f"{'scenario':>8} {'children':>9} {'keyed, ms':>10} {'difflib, ms':>12} "
+        f"{'speedup':>8} {'build_update_commands, ms':>26}"
+    )
+    for mutate in [edit, shuffle]:
+        for n in [1_000, 10_000, 100_000]:
+            keyed, difflib, total = bench(n, mutate)
+            print(
+                f"{mutate.__name__:>8} {n:>9} {keyed:>10.2f} {difflib:>12.2f} "
+                f"{difflib / keyed:>8.1f} {total:>26.2f}"
+            )
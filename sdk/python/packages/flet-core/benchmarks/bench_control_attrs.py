@@ -0,0 +1,79 @@
+"""
+Micro-benchmarks of control property get/set throughput.
+
+"set" changes one of four properties on each call, "client" rows read
+properties which were updated by a client (stored as strings).
+
+Run with:
+
+    python benchmarks/bench_control_attrs.py
+"""
+
+import timeit
+
+import flet_core as ft
+
+NUMBER = 200_000
+
+
+def client_update(ctrl, props):
+    for name, value in props.items():
+        ctrl._set_attr(name, value, dirty=False)
+
+
+def container_benchmarks():
+    c = ft.Container(width=100, bgcolor=ft.colors.AMBER, opacity=0.5, visible=True)
+
+    def get():
+        return c.width, c.bgcolor, c.opacity, c.visible
+
+    def set():
+        c.width = 300 - c.width
+        c.bgcolor = ft.colors.RED
+        c.opacity = 0.7
+        c.visible = False
+
+    c2 = ft.Container()
+    client_update(
+        c2, {"width": "100", "bgcolor": "red", "opacity": "0.5", "visible": "true"}
+    )
+
+    def get_client():
+        return c2.width, c2.bgcolor, c2.opacity, c2.visible
+
+    return {"get": get, "set": set, "get (client)": get_client}
+
+
+def textfield_benchmarks():
+    tf = ft.TextField(value="abc", password=True, max_length=10, autofocus=False)
+
+    def get():
+        return tf.value, tf.password, tf.max_length, tf.autofocus
+
+    def set():
+        tf.value = "def"
+        tf.password = False
+        tf.max_length = 30 - tf.max_length
+        tf.autofocus = True
+
+    tf2 = ft.TextField()
+    client_update(
+        tf2,
+        {"value": "abc", "password": "true", "maxLength": "10", "autofocus": "false"},
+    )
+
+    def get_client():
+        return tf2.value, tf2.password, tf2.max_length, tf2.autofocus
+
+    return {"get": get, "set": set, "get (client)": get_client}
+
+
+if __name__ == "__main__":
+    print(f"{'control':>10} {'operation':>14} {'props/sec':>14}")
+    for name, benchmarks in [
+        ("Container", container_benchmarks()),
+        ("TextField", textfield_benchmarks()),
+    ]:
+        for op, fn in benchmarks.items():
+            t = min(timeit.repeat(fn, number=NUMBER, repeat=3))
+            print(f"{name:>10} {op:>14} {4 * NUMBER / t:>14,.0f}")
@@ -0,0 +1,54 @@
+"""
+Memory benchmark: bytes per control for common controls, measured with
+`tracemalloc` right after creation and after the controls were built
+(all properties sent and marked clean).
+
+One-off allocations of shared structures (e.g. resizes of interned strings
+table) are excluded.
+
+Run with:
+
+    python benchmarks/bench_control_memory.py
+"""
+
+import gc
+import tracemalloc
+
+import flet_core as ft
+
+N = 5_000
+
+CONTROLS = {
+    "Text": lambda i: ft.Text(f"Item {i}", size=14, weight=ft.FontWeight.BOLD),
+    "Container": lambda i: ft.Container(
+        width=100, height=40, bgcolor=ft.colors.AMBER, padding=5, border_radius=4
+    ),
+    "DataCell": lambda i: ft.DataCell(ft.Text(f"{i}")),
+}
+
+
+def per_control_size():
+    snapshot = tracemalloc.take_snapshot()
+    return (
+        sum(s.size for s in snapshot.statistics("traceback") if s.count >= N // 2) / N
+    )
+
+
+def measure(factory):
+    gc.collect()
+    tracemalloc.start(10)
+    controls = [factory(i) for i in range(N)]
+    created = per_control_size()
+    for c in controls:
+        c._build_add_commands()
+    gc.collect()
+    built = per_control_size()
+    tracemalloc.stop()
+    return created, built
+
+
+if __name__ == "__main__":
+    print(f"{'control':>10} {'created, B':>12} {'built, B':>12}")
+    for name, factory in CONTROLS.items():
+        created, built = measure(factory)
+        print(f"{name:>10} {created:>12.0f} {built:>12.0f}")
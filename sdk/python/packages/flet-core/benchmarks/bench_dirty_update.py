@@ -0,0 +1,38 @@
+"""
+Benchmark of `page.update()` changing 3 Text values out of 20k controls
+with and without `page.update_dirty_only`.
+
+Run with:
+
+    python benchmarks/bench_dirty_update.py
+"""
+
+import time
+
+import flet_core as ft
+from bench_page import create_page
+
+ROWS = 5_000  # 4 controls per row
+
+
+def bench(update_dirty_only: bool, ticks: int = 10):
+    page = create_page()
+    page.update_dirty_only = update_dirty_only
+    texts = []
+    for i in range(ROWS):
+        t = ft.Text(str(i))
+        texts.append(t)
+        page.controls.append(ft.Container(ft.Row([t, ft.Icon(ft.icons.ADD)])))
+    page.update()
+
+    start = time.perf_counter()
+    for tick in range(ticks):
+        for t in texts[tick : ROWS : ROWS // 3][:3]:
+            t.value = f"tick {tick}"
+        page.update()
+    return (time.perf_counter() - start) * 1000 / ticks
+
+
+if __name__ == "__main__":
+    print(f"full update: {bench(False):.2f} ms")
+    print(f"dirty only update: {bench(True):.2f} ms")
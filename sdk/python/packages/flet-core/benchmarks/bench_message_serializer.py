@@ -0,0 +1,82 @@
+"""
+Throughput of `encode_message()`, which converts messages into plain dicts
+before encoding, compared to `json.dumps()` with `CommandEncoder`.
+
+Run with:
+
+    python benchmarks/bench_message_serializer.py
+"""
+
+import json
+import timeit
+
+import flet_core as ft
+from flet_core.local_connection import LocalConnection
+from flet_core.protocol import (
+    ClientActions,
+    ClientMessage,
+    Command,
+    CommandEncoder,
+    Message,
+    PageCommandsBatchRequestPayload,
+    UpdateControlPropsPayload,
+    encode_message,
+)
+
+N = 10_000
+
+
+def create_add_message():
+    col = ft.Column([ft.Text(f"Item {i}", size=14) for i in range(N - 1)])
+    add_cmd = Command(
+        0, "add", attrs={"to": "page", "at": "0"}, commands=col._build_add_commands()
+    )
+    _, message = LocalConnection()._process_command(add_cmd)
+    return message
+
+
+def create_update_batch_message():
+    return ClientMessage(
+        ClientActions.PAGE_CONTROLS_BATCH,
+        [
+            ClientMessage(
+                ClientActions.UPDATE_CONTROL_PROPS,
+                UpdateControlPropsPayload(props=[{"i": f"_{i}", "value": str(i)}]),
+            )
+            for i in range(N)
+        ],
+    )
+
+
+def create_commands_batch_message():
+    return Message(
+        "1",
+        "pageCommandsBatchFromHost",
+        PageCommandsBatchRequestPayload(
+            pageName="page",
+            sessionID="1",
+            commands=[
+                Command(0, "set", [f"_{i}"], {"value": str(i)}) for i in range(N)
+            ],
+        ),
+    )
+
+
+def command_encoder(message):
+    return json.dumps(message, cls=CommandEncoder, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    for name, message in [
+        (f"addPageControls, {N} controls", create_add_message()),
+        (f"pageControlsBatch, {N} updateControlProps", create_update_batch_message()),
+        (f"pageCommandsBatchFromHost, {N} commands", create_commands_batch_message()),
+    ]:
+        size = len(command_encoder(message))
+        print(f"{name} ({size / 1024:.0f} KB)")
+        for encoder in [command_encoder, encode_message]:
+            t = min(timeit.repeat(lambda: encoder(message), number=1, repeat=9))
+            print(
+                f"  {encoder.__name__:>16}: {t * 1000:8.2f} ms, "
+                f"{size / t / 1024 / 1024:8.2f} MB/s"
+            )
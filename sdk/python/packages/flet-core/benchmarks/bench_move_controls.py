@@ -0,0 +1,38 @@
+"""
+Regression benchmark: move 5k controls between two Columns in one `page.update()`.
+
+Moving controls to a column which is diffed earlier makes every removed control
+look up the "add" command it was re-added with.
+
+Run with:
+
+    python benchmarks/bench_move_controls.py
+"""
+
+import time
+
+import flet_core as ft
+from bench_page import create_page
+
+N = 5_000
+
+
+def bench(forward: bool):
+    page = create_page()
+    col1 = ft.Column()
+    col2 = ft.Column()
+    page.add(ft.Row([col1, col2]))
+    src, dst = (col1, col2) if forward else (col2, col1)
+    src.controls.extend(ft.Text(str(i)) for i in range(N))
+    page.update()
+
+    dst.controls.extend(src.controls)
+    src.controls.clear()
+    start = time.perf_counter()
+    page.update()
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    print(f"move {N} controls to the next column: {bench(True):.2f} ms")
+    print(f"move {N} controls to the previous column: {bench(False):.2f} ms")
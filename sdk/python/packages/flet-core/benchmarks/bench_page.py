@@ -0,0 +1,40 @@
+"""
+In-process page used by benchmarks: commands are processed by `LocalConnection`
+the same way web/desktop connections do, but messages are only counted.
+"""
+
+import asyncio
+from typing import List
+
+from flet_core.local_connection import LocalConnection
+from flet_core.page import Page
+from flet_core.protocol import (
+    Command,
+    PageCommandResponsePayload,
+    PageCommandsBatchResponsePayload,
+)
+
+
+class BenchConnection(LocalConnection):
+    def __init__(self):
+        super().__init__()
+        self.messages = 0
+
+    def send_command(self, session_id: str, command: Command):
+        result, message = self._process_command(command)
+        if message:
+            self.messages += 1
+        return PageCommandResponsePayload(result=result, error="")
+
+    def send_commands(self, session_id: str, commands: List[Command]):
+        results = []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ["add", "get"]:
+                results.append(result)
+        self.messages += 1
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+def create_page() -> Page:
+    return Page(BenchConnection(), "bench", loop=asyncio.new_event_loop())
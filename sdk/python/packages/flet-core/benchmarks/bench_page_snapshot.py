@@ -0,0 +1,114 @@
+"""
+Benchmark of adding and removing 10k-node subtrees to/from a page snapshot,
+compared to deep-copying controls and collecting descendants recursively,
+and of removing many siblings at once.
+
+Run with:
+
+    python benchmarks/bench_page_snapshot.py
+"""
+
+import copy
+import time
+
+import flet_core as ft
+from flet_core.local_connection import LocalConnection
+from flet_core.page_snapshot import PageSnapshot
+from flet_core.protocol import Command
+
+N = 10_000
+
+
+def wide_tree():
+    return ft.Column([ft.Text(f"Item {i}", size=14) for i in range(N - 1)])
+
+
+def deep_tree(depth=4, width=10):
+    # 1 + 10 + 100 + 1000 + 10000 nodes
+    if depth == 0:
+        return ft.Text("Leaf", size=14)
+    return ft.Column([deep_tree(depth - 1, width) for _ in range(width)])
+
+
+def add_controls_message(control):
+    _, message = LocalConnection()._process_add_command(
+        Command(0, "add", attrs={"to": "page"}, commands=control._build_add_commands())
+    )
+    return message.payload.controls
+
+
+def new_snapshot(snapshot_class):
+    snapshot = snapshot_class()
+    snapshot["page"] = {"i": "page", "t": "page", "p": "", "c": []}
+    return snapshot
+
+
+def deepcopy_add_controls(snapshot, controls):
+    for oc in controls:
+        control = copy.deepcopy(oc)
+        id = control["i"]
+        pid = control["p"]
+        parent = snapshot[pid]
+        if id not in parent["c"]:
+            parent["c"].append(id)
+        snapshot[id] = control
+
+
+def recursive_descendant_ids(snapshot, id):
+    ids = []
+    control = snapshot.get(id)
+    if control:
+        for cid in control["c"]:
+            ids.append(cid)
+            ids.extend(recursive_descendant_ids(snapshot, cid))
+    return ids
+
+
+def recursive_remove_controls(snapshot, ids):
+    for id in ids:
+        control = snapshot[id]
+        for cid in recursive_descendant_ids(snapshot, id):
+            snapshot.pop(cid, None)
+        snapshot.pop(id, None)
+        snapshot[control["p"]]["c"].remove(id)
+
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    for name, tree in [("wide", wide_tree()), ("deep", deep_tree())]:
+        controls = add_controls_message(tree)
+        root_id = controls[0]["i"]
+        print(f"{name} tree, {len(controls)} controls")
+
+        old = new_snapshot(dict)
+        add = measure(deepcopy_add_controls, old, controls)
+        remove = measure(recursive_remove_controls, old, [root_id])
+        print(f"  deepcopy/recursive: add {add:8.2f} ms, remove {remove:8.2f} ms")
+
+        new = new_snapshot(PageSnapshot)
+        add = measure(new.add_controls, controls)
+        remove = measure(new.remove_controls, [root_id])
+        print(f"  PageSnapshot:       add {add:8.2f} ms, remove {remove:8.2f} ms")
+
+    controls = add_controls_message(wide_tree())
+    child_ids = controls[0]["c"]
+    print(f"siblings of wide tree, {len(child_ids)} children")
+    for name, ids in [
+        ("every other", child_ids[::2]),
+        ("all, reversed", child_ids[::-1]),
+    ]:
+        old = new_snapshot(dict)
+        deepcopy_add_controls(old, controls)
+        before = measure(recursive_remove_controls, old, ids)
+        new = new_snapshot(PageSnapshot)
+        new.add_controls(controls)
+        after = measure(new.remove_controls, ids)
+        print(
+            f"  remove {name:<14} one by one {before:8.2f} ms, "
+            f"PageSnapshot {after:8.2f} ms"
+        )
@@ -0,0 +1,85 @@
+"""
+Encode/decode benchmark of a large `pageControlsBatch` message in JSON
+and MessagePack (requires `msgpack` package) encodings, with and without
+zlib compression.
+
+Run with:
+
+    python benchmarks/bench_protocol_encoding.py
+"""
+
+import json
+import timeit
+
+import flet_core as ft
+from flet_core.local_connection import LocalConnection
+from flet_core.protocol import (
+    ClientActions,
+    ClientMessage,
+    MessageCompressions,
+    MessageEncodings,
+    compress_message,
+    encode_message,
+    get_supported_encodings,
+)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+N = 10_000
+
+
+def create_message():
+    col = ft.Column(
+        [
+            ft.Container(
+                ft.Text(f"Item {i}", size=14, weight=ft.FontWeight.BOLD),
+                padding=5,
+                bgcolor=ft.colors.AMBER,
+            )
+            for i in range(N)
+        ]
+    )
+    conn = LocalConnection()
+    add_cmd = ft.protocol.Command(
+        0, "add", attrs={"to": "page", "at": "0"}, commands=col._build_add_commands()
+    )
+    _, message = conn._process_command(add_cmd)
+    return ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, [message])
+
+
+DECODERS = {
+    MessageEncodings.JSON: json.loads,
+    MessageEncodings.MSGPACK: lambda m: msgpack.unpackb(m),
+}
+
+if __name__ == "__main__":
+    message = create_message()
+    print(f"pageControlsBatch with {N * 3} controls")
+    print(
+        f"{'encoding':>10} {'size, KB':>10} {'encode, ms':>12} {'decode, ms':>12} "
+        f"{'zlib, KB':>10} {'compress, ms':>14}"
+    )
+    for encoding in get_supported_encodings():
+        encoded = encode_message(message, encoding)
+        encode = min(
+            timeit.repeat(lambda: encode_message(message, encoding), number=1, repeat=5)
+        )
+        decode = min(
+            timeit.repeat(lambda: DECODERS[encoding](encoded), number=1, repeat=5)
+        )
+        compressed = compress_message(encoded, MessageCompressions.ZLIB, 0)
+        compress = min(
+            timeit.repeat(
+                lambda: compress_message(encoded, MessageCompressions.ZLIB, 0),
+                number=1,
+                repeat=5,
+            )
+        )
+        print(
+            f"{encoding:>10} {len(encoded) / 1024:>10.0f} "
+            f"{encode * 1000:>12.2f} {decode * 1000:>12.2f} "
+            f"{len(compressed) / 1024:>10.0f} {compress * 1000:>14.2f}"
+        )
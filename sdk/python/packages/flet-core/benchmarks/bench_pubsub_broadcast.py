@@ -0,0 +1,83 @@
+"""
+Benchmark of broadcasting messages to 5k async PubSub subscribers while
+another thread keeps subscribing and unsubscribing sessions.
+
+Reports time spent in `send_all()` by a publisher and the worst latency of
+`subscribe()`/`unsubscribe()` calls during broadcasts.
+
+Run with:
+
+    python benchmarks/bench_pubsub_broadcast.py
+"""
+
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flet_core.pubsub import PubSubHub
+
+SESSIONS = 5_000
+BROADCASTS = 200
+
+
+async def on_message(message):
+    pass
+
+
+def churn(hub: PubSubHub, stop: threading.Event, latencies: list):
+    i = 0
+    while not stop.is_set():
+        session_id = f"churn-{i % 100}"
+        start = time.perf_counter()
+        hub.subscribe(session_id, on_message)
+        hub.unsubscribe(session_id)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever)
+    loop_thread.start()
+    executor = ThreadPoolExecutor()
+
+    hub = PubSubHub(loop=loop, executor=executor)
+    for i in range(SESSIONS):
+        hub.subscribe(f"session-{i}", on_message)
+
+    stop = threading.Event()
+    latencies = []
+    churn_thread = threading.Thread(target=churn, args=[hub, stop, latencies])
+    churn_thread.start()
+
+    publish_times = []
+    for _ in range(BROADCASTS):
+        start = time.perf_counter()
+        hub.send_all("message")
+        publish_times.append(time.perf_counter() - start)
+        # let event loop run scheduled handlers
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result()
+
+    stop.set()
+    churn_thread.join()
+    loop.call_soon_threadsafe(loop.stop)
+    loop_thread.join()
+    loop.close()
+    executor.shutdown()
+
+    print(f"{SESSIONS:,} subscribers, {BROADCASTS} broadcasts\n")
+    print(
+        f"send_all(): median {statistics.median(publish_times) * 1000:.2f} ms,"
+        f" max {max(publish_times) * 1000:.2f} ms"
+    )
+    print(
+        f"subscribe() + unsubscribe() during broadcasts ({len(latencies):,} calls):"
+        f" median {statistics.median(latencies) * 1e6:.1f} us,"
+        f" max {max(latencies) * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark of matching topics against 100k subscriptions, exact and wildcard,
+in topic trie compared to exact-only dict index used before, of
+PubSubHub publish throughput with those subscriptions, and of subscribing
+and unsubscribing many sessions of the same topic.
+
+Run with:
+
+    python benchmarks/bench_pubsub_topics.py
+"""
+
+import asyncio
+import random
+import time
+
+from flet_core.pubsub import PubSubHub
+from flet_core.pubsub.topic_trie import TopicTrie
+
+ROOMS = 10_000
+SESSIONS_PER_ROOM = 10
+PUBLISHES = 100_000
+CROWDED_SESSIONS = 20_000
+
+
+def handler(topic, message):
+    pass
+
+
+def dict_index():
+    # exact-only index used by PubSubHub before wildcard support
+    index = {}
+    for room in range(ROOMS):
+        for s in range(SESSIONS_PER_ROOM):
+            index.setdefault(f"room/{room}", {})[f"{room}-{s}"] = handler
+    return index
+
+
+def dict_match(index, topics):
+    for topic in topics:
+        if topic in index:
+            list(index[topic].items())
+
+
+def exact_trie():
+    trie = TopicTrie()
+    for room in range(ROOMS):
+        for s in range(SESSIONS_PER_ROOM):
+            trie.add(f"room/{room}", f"{room}-{s}", handler)
+    return trie
+
+
+def wildcard_patterns():
+    # the same number of subscriptions, every room has exact, `*` and `#` ones
+    for room in range(ROOMS):
+        for s in range(SESSIONS_PER_ROOM):
+            pattern = [
+                f"room/{room}/messages",
+                f"room/{room}/*",
+                f"room/{room}/#",
+            ][s % 3]
+            yield f"{room}-{s}", pattern
+    # a few global observers
+    yield "monitor-1", "room/*/messages"
+    yield "monitor-2", "#"
+
+
+def wildcard_trie():
+    trie = TopicTrie()
+    for session_id, pattern in wildcard_patterns():
+        trie.add(pattern, session_id, handler)
+    return trie
+
+
+def trie_match(trie, topics):
+    for topic in topics:
+        trie.match(topic)
+
+
+def exact_hub(loop):
+    hub = PubSubHub(loop=loop)
+    for room in range(ROOMS):
+        for s in range(SESSIONS_PER_ROOM):
+            hub.subscribe_topic(f"{room}-{s}", f"room/{room}", handler)
+    return hub
+
+
+def wildcard_hub(loop):
+    hub = PubSubHub(loop=loop)
+    for session_id, pattern in wildcard_patterns():
+        hub.subscribe_topic(session_id, pattern, handler)
+    return hub
+
+
+def crowded_subscribe(hub):
+    for s in range(CROWDED_SESSIONS):
+        hub.subscribe_topic(f"s{s}", "chat/room", handler)
+
+
+def crowded_unsubscribe(hub):
+    for s in range(CROWDED_SESSIONS):
+        hub.unsubscribe_all(f"s{s}")
+
+
+def hub_publish(hub, topics):
+    for topic in topics:
+        hub.send_all_on_topic(topic, None)
+
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    rnd = random.Random(0)
+    rooms = [rnd.randrange(ROOMS) for _ in range(PUBLISHES)]
+    exact_topics = [f"room/{r}" for r in rooms]
+    nested_topics = [f"room/{r}/messages" for r in rooms]
+
+    print(f"{ROOMS * SESSIONS_PER_ROOM:,} subscriptions, {PUBLISHES:,} publishes\n")
+    print(f"{'match':<28}{'topics/s':>14}")
+    for name, fn, args in [
+        ("dict, exact (before)", dict_match, (dict_index(), exact_topics)),
+        ("trie, exact", trie_match, (exact_trie(), exact_topics)),
+        ("trie, exact + * + #", trie_match, (wildcard_trie(), nested_topics)),
+    ]:
+        elapsed = measure(fn, *args)
+        print(f"{name:<28}{PUBLISHES / elapsed:>14,.0f}")
+
+    print(f"\n{'PubSubHub publish':<28}{'publishes/s':>14}")
+    for name, fn, args in [
+        ("trie, exact", hub_publish, (exact_hub(loop), exact_topics)),
+        ("trie, exact + * + #", hub_publish, (wildcard_hub(loop), nested_topics)),
+    ]:
+        elapsed = measure(fn, *args)
+        print(f"{name:<28}{PUBLISHES / elapsed:>14,.0f}")
+
+    crowded = f"{CROWDED_SESSIONS:,} sessions, one topic"
+    print(f"\n{crowded:<28}{'seconds':>14}")
+    hub = PubSubHub(loop=loop)
+    for name, fn in [
+        ("subscribe_topic", crowded_subscribe),
+        ("unsubscribe_all", crowded_unsubscribe),
+    ]:
+        print(f"{name:<28}{measure(fn, hub):>14.3f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
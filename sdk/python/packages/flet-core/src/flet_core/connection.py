@@ -17,6 +17,13 @@ class Connection:
     def send_commands(self, session_id: str, commands: List[Command]):
         raise NotImplementedError()
 
+    def wait_send_queue(self, session_id: str):
+        """
+        Blocks a session thread while messages to a slow client pile up.
+        Called by a page after releasing its locks.
+        """
+        pass
+
     def _get_ws_url(self, server: str):
         url = server.rstrip("/")
         if server.startswith("https://"):
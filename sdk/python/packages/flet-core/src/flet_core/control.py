@@ -1,8 +1,24 @@
 import datetime as dt
+import functools
 import json
-from difflib import SequenceMatcher
+import sys
+import threading
+from bisect import bisect_left
+from concurrent.futures import Future
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union, Type
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    Type,
+)
 
 from flet_core.embed_json_encoder import EmbedJsonEncoder
 from flet_core.protocol import Command
@@ -15,8 +31,55 @@ if TYPE_CHECKING:
 
 OptionalNumber = Union[None, int, float]
 
+# attribute name as used in controls -> interned lowercase name
+_attr_names: Dict[str, str] = {}
+
+# attribute name -> bit in Control dirty attributes mask
+_attr_bits: Dict[str, int] = {}
+_attr_bits_lock = threading.Lock()
+
+
+def _attr_name(name: str) -> str:
+    n = _attr_names.get(name)
+    if n is None:
+        n = sys.intern(name.lower())
+        _attr_names[name] = n
+    return n
+
+
+def _attr_bit(name: str) -> int:
+    bit = _attr_bits.get(name)
+    if bit is None:
+        with _attr_bits_lock:
+            bit = _attr_bits.get(name)
+            if bit is None:
+                bit = 1 << len(_attr_bits)
+                _attr_bits[name] = bit
+    return bit
+
+
+# public attributes which are not sent to a client
+_untracked_names = frozenset(["parent", "page", "data"])
+
 
 class Control:
+    # base class state is kept in slots, subclasses still have __dict__
+    __slots__ = (
+        "__page",
+        "__dirty",
+        "__attrs",
+        "__dirty_attrs",
+        "__previous_children",
+        "__uid",
+        "__expand",
+        "__col",
+        "__data",
+        "__event_handlers",
+        "__tasks",
+        "parent",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         ref: Optional[Ref] = None,
@@ -32,8 +95,10 @@ class Control:
     ):
         super().__init__()
         self.__page: Optional[Page] = None
-        self.__attrs: Dict[str, Any] = {}
-        self.__previous_children = []
+        self.__dirty = True
+        self.__attrs: Dict[str, Any] = {}  # key: interned lowercase name
+        self.__dirty_attrs = 0  # bit mask of dirty attributes
+        self.__previous_children: Optional[List[Control]] = None
         self._id = None
         self.__uid: Optional[str] = None
         self.expand = expand
@@ -46,11 +111,16 @@ class Control:
         self.disabled = disabled
         self.__data: Any = None
         self.data = data
-        self.__event_handlers = {}
+        self.__event_handlers: Optional[Dict[str, Any]] = None
+        self.__tasks: Optional[Set[Future]] = None
         self.parent: Optional[Control] = None
         if ref:
             ref.current = self
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _track_property_setters(cls)
+
     def is_isolated(self):
         return False
 
@@ -76,33 +146,59 @@ class Control:
         raise Exception("_getControlName must be overridden in inherited class")
 
     def _add_event_handler(self, event_name, handler):
+        if self.__event_handlers is None:
+            self.__event_handlers = {}
         self.__event_handlers[event_name] = handler
 
     def _get_event_handler(self, event_name):
-        return self.__event_handlers.get(event_name)
+        return self.__event_handlers.get(event_name) if self.__event_handlers else None
+
+    def _add_task(self, future: Future):
+        if self.__tasks is None:
+            self.__tasks = set()
+        tasks = self.__tasks
+        tasks.add(future)
+        future.add_done_callback(tasks.discard)
+
+    def _cancel_tasks(self):
+        tasks = self.__tasks
+        self.__tasks = None
+        if tasks:
+            for future in list(tasks):
+                future.cancel()
 
     def _get_attr(self, name, def_value=None, data_type="string"):
-        name = name.lower()
-        if name not in self.__attrs:
+        name = _attr_names.get(name) or _attr_name(name)
+        s_val = self.__attrs.get(name)
+        if s_val is None:
             return def_value
+        if data_type == "string" or not isinstance(s_val, str):
+            return s_val
 
-        s_val = self.__attrs[name][0]
-        if data_type == "bool" and s_val is not None and isinstance(s_val, str):
-            return s_val.lower() == "true"
-        elif data_type == "bool?" and isinstance(s_val, str):
+        # string value set by a client
+        if data_type == "bool":
+            val = s_val.lower() == "true"
+        elif data_type == "bool?":
             if s_val.lower() == "true":
-                return True
+                val = True
             elif s_val.lower() == "false":
-                return False
+                val = False
             else:
                 return def_value
-        elif data_type == "float" and s_val is not None and isinstance(s_val, str):
-            return float(s_val)
-        elif data_type == "int" and s_val is not None and isinstance(s_val, str):
-            return int(s_val)
+        elif data_type == "float":
+            val = float(s_val)
+        elif data_type == "int":
+            val = int(s_val)
         else:
             return s_val
 
+        # keep parsed value if it's converted back to the same string
+        if (
+            str(val).lower() if isinstance(val, bool) else str(val)
+        ) == s_val and self.__attrs.get(name) is s_val:
+            self.__attrs[name] = val
+        return val
+
     def _set_attr(self, name, value, dirty=True):
         self._set_attr_internal(name, value, dirty)
 
@@ -123,7 +219,9 @@ class Control:
         self._set_attr(name, value)
 
     def _set_attr_internal(self, name, value, dirty=True):
-        name = name.lower()
+        # names of changes coming from a client (dirty=False) are not cached,
+        # so a client can't grow the caches shared by all sessions
+        name = _attr_names.get(name) or (_attr_name(name) if dirty else name.lower())
         orig_val = self.__attrs.get(name)
 
         if orig_val is None and value is None:
@@ -132,8 +230,22 @@ class Control:
         if value is None:
             value = ""
 
-        if orig_val is None or orig_val[0] != value:
-            self.__attrs[name] = (value, dirty)
+        if orig_val is None or orig_val != value:
+            self.__attrs[name] = value
+            if dirty:
+                self.__dirty_attrs |= _attr_bit(name)
+                self._mark_dirty()
+            elif self.__dirty_attrs:
+                self.__dirty_attrs &= ~_attr_bits.get(name, 0)
+
+    def _mark_dirty(self):
+        """
+        Marks the control and all its ancestors as having changes to send.
+        """
+        ctrl = self
+        while ctrl is not None and not ctrl.__dirty:
+            ctrl.__dirty = True
+            ctrl = ctrl.parent
 
     def _set_attr_json(self, name, value):
         ov = self._get_attr(name)
@@ -156,14 +268,14 @@ class Control:
     def __str__(self):
         attrs = {}
         for k, v in self.__attrs.items():
-            attrs[k] = v[0]
+            attrs[k] = v
         return f"{self._get_control_name()} {attrs}"
 
     def __repr__(self):
         return (
             f"{self.__class__.__name__}("
             + ", ".join(
-                f"{k}={v[0]}" if not isinstance(v[0], str) else f"{k}='{v[0]}'"
+                f"{k}={v}" if not isinstance(v, str) else f"{k}='{v}'"
                 for k, v in self.__attrs.items()
             )
             + ")"
@@ -172,12 +284,14 @@ class Control:
     # event_handlers
     @property
     def event_handlers(self):
+        if self.__event_handlers is None:
+            self.__event_handlers = {}
         return self.__event_handlers
 
     # _previous_children
     @property
     def _previous_children(self):
-        return self.__previous_children
+        return self.__previous_children if self.__previous_children else []
 
     # _id
     @property
@@ -288,6 +402,14 @@ class Control:
     def data(self, value):
         self.__data = value
 
+    # task_count
+    @property
+    def task_count(self) -> int:
+        """
+        The number of tasks started with `run_task()` which are not done yet.
+        """
+        return len(self.__tasks) if self.__tasks else 0
+
     # public methods
     def update(self):
         assert self.__page, "Control must be added to the page first."
@@ -297,6 +419,19 @@ class Control:
         assert self.__page, "Control must be added to the page first."
         await self.__page.update_async(self)
 
+    def run_task(
+        self, handler: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Future:
+        """
+        Runs `handler` coroutine in page event loop, like `page.run_task()`.
+
+        The task is cancelled when the control is removed from the page.
+        """
+        assert self.__page, "Control must be added to the page first."
+        future = self.__page.run_task(handler, *args, **kwargs)
+        self._add_task(future)
+        return future
+
     def clean(self):
         assert self.__page, "Control must be added to the page first."
         self.__page._clean(self)
@@ -340,14 +475,12 @@ class Control:
         )
 
     def copy_attrs(self, dest: Dict[str, Any]):
+        dirty_attrs = self.__dirty_attrs
         for attrName in sorted(self.__attrs):
-            attrName = attrName.lower()
-            dirty = self.__attrs[attrName][1]
-
-            if dirty:
+            if dirty_attrs and dirty_attrs & _attr_bits.get(attrName, 0):
                 continue
 
-            val = self.__attrs[attrName][0]
+            val = self.__attrs[attrName]
             sval = ""
             if val is None:
                 continue
@@ -360,7 +493,49 @@ class Control:
             dest[attrName] = sval
 
     def build_update_commands(
-        self, index, commands, added_controls, removed_controls, isolated=False
+        self,
+        index,
+        commands,
+        added_controls,
+        removed_controls,
+        isolated=False,
+        dirty_only=False,
+        pending_adds: Optional["_PendingAdds"] = None,
+    ):
+        """
+        Builds commands updating the control and its descendants.
+
+        With `dirty_only=True` descendants which were not marked
+        with `_mark_dirty()` since the previous update are skipped.
+
+        Commands of several controls updated at once should share
+        `pending_adds` created for the whole update; the caller then
+        inserts "remove" commands with `pending_adds.insert_removes()`.
+        """
+        shared = pending_adds is not None
+        if pending_adds is None:
+            pending_adds = _PendingAdds(commands)
+        self._build_update_commands(
+            index,
+            commands,
+            added_controls,
+            removed_controls,
+            isolated,
+            pending_adds,
+            dirty_only,
+        )
+        if not shared:
+            pending_adds.insert_removes(commands)
+
+    def _build_update_commands(
+        self,
+        index,
+        commands,
+        added_controls,
+        removed_controls,
+        isolated,
+        pending_adds: "_PendingAdds",
+        dirty_only: bool,
     ):
         update_cmd = self._build_command(update=True)
 
@@ -369,105 +544,74 @@ class Control:
             commands.append(update_cmd)
 
         if isolated:
+            self.__dirty = False
             return
 
-        # go through children
-        previous_children = self.__previous_children
-        current_children = self._get_children()
-
-        hashes = {}
-        previous_ints = []
-        current_ints = []
-
-        for ctrl in previous_children:
-            hashes[hash(ctrl)] = ctrl
-            previous_ints.append(hash(ctrl))
-
-        for ctrl in current_children:
-            hashes[hash(ctrl)] = ctrl
-            current_ints.append(hash(ctrl))
-
-        sm = SequenceMatcher(None, previous_ints, current_ints)
-
-        n = 0
-        for tag, a1, a2, b1, b2 in sm.get_opcodes():
-            if tag == "delete" or tag == "replace":
-                # deleted controls
-                ids = []
-                for h in previous_ints[a1:a2]:
-                    ctrl = hashes[h]
-                    # check if re-added control is being deleted
-                    # which means it's a replace
-                    i = 0
-                    replaced = False
-                    while i < len(commands):
-                        cmd = commands[i]
-                        if cmd.name == "add" and any(
-                            c for c in cmd.commands if c.attrs.get("id") == ctrl.__uid
-                        ):
-                            # insert delete command before add
-                            commands.insert(i, Command(0, "remove", [ctrl.__uid]))
-                            replaced = True
-                            break
-                        i += 1
-                    removed_controls.extend(
-                        self._remove_control_recursively(index, ctrl)
-                    )
-                    if not replaced:
-                        ids.append(ctrl.__uid)
-                if len(ids) > 0:
-                    commands.append(Command(0, "remove", ids))
-                if tag == "replace":
-                    # add
-                    for h in current_ints[b1:b2]:
-                        ctrl = hashes[h]
-                        innerCmds = ctrl._build_add_commands(
-                            index=index, added_controls=added_controls
-                        )
-                        assert self.__uid is not None
-                        ctrl.parent = self  # set as parent
-                        commands.append(
-                            Command(
-                                indent=0,
-                                name="add",
-                                attrs={"to": self.__uid, "at": str(n)},
-                                commands=innerCmds,
-                            )
-                        )
-                        n += 1
-            elif tag == "equal":
+        # go through children; the list is copied as it could be changed
+        # by a thread not holding the lock of this subtree
+        previous_children = self._previous_children
+        current_children = list(self._get_children())
+
+        previous_positions, staying = _match_children(
+            previous_children, current_children
+        )
+        current_ids = set(id(ctrl) for ctrl in current_children)
+
+        # deleted and moved controls
+        ids = []
+        for i, ctrl in enumerate(previous_children):
+            if i in staying:
+                continue
+            if id(ctrl) in current_ids:
+                # moved control is re-added below
+                ids.append(ctrl.__uid)
+                continue
+            # check if re-added control is being deleted
+            # which means it's a replace
+            replaced = pending_adds.remove_before_add(ctrl.__uid)
+            removed_controls.extend(self._remove_control_recursively(index, ctrl))
+            if not replaced:
+                ids.append(ctrl.__uid)
+        if len(ids) > 0:
+            commands.append(Command(0, "remove", ids))
+
+        # unchanged and added controls
+        for n, ctrl in enumerate(current_children):
+            i = previous_positions.get(id(ctrl))
+            if i is not None and i in staying:
                 # unchanged control
-                for h in previous_ints[a1:a2]:
-                    ctrl = hashes[h]
-                    ctrl.build_update_commands(
-                        index,
-                        commands,
-                        added_controls,
-                        removed_controls,
-                        isolated=ctrl.is_isolated(),
-                    )
-                    n += 1
-            elif tag == "insert":
+                staying.discard(i)
+                if dirty_only and not ctrl.__dirty:
+                    continue
+                ctrl._build_update_commands(
+                    index,
+                    commands,
+                    added_controls,
+                    removed_controls,
+                    ctrl.is_isolated(),
+                    pending_adds,
+                    dirty_only,
+                )
+            else:
                 # add
-                for h in current_ints[b1:b2]:
-                    ctrl = hashes[h]
-                    innerCmds = ctrl._build_add_commands(
-                        index=index, added_controls=added_controls
-                    )
-                    assert self.__uid is not None
-                    ctrl.parent = self  # set as parent
-                    commands.append(
-                        Command(
-                            indent=0,
-                            name="add",
-                            attrs={"to": self.__uid, "at": str(n)},
-                            commands=innerCmds,
-                        )
-                    )
-                    n += 1
-
-        self.__previous_children.clear()
-        self.__previous_children.extend(current_children)
+                innerCmds = ctrl._build_add_commands(
+                    index=index, added_controls=added_controls
+                )
+                assert self.__uid is not None
+                ctrl.parent = self  # set as parent
+                add_cmd = Command(
+                    indent=0,
+                    name="add",
+                    attrs={"to": self.__uid, "at": str(n)},
+                    commands=innerCmds,
+                )
+                commands.append(add_cmd)
+                pending_adds.add(add_cmd)
+
+        self.__previous_children = current_children if current_children else None
+        # cleared last as before_update() of the control and its children
+        # could mark them dirty again
+        self.__dirty = False
 
     def _remove_control_recursively(self, index, control):
         removed_controls = []
@@ -526,8 +670,8 @@ class Control:
             commands.extend(childCmd)
             control.parent = self  # set as parent
 
-        self.__previous_children.clear()
-        self.__previous_children.extend(children)
+        self.__previous_children = list(children) if children else None
+        self.__dirty = False
 
         return commands
 
@@ -540,25 +684,27 @@ class Control:
         self._before_build_command()
         self.before_update()
 
-        for attrName in sorted(self.__attrs):
-            attrName = attrName.lower()
-            dirty = self.__attrs[attrName][1]
-
-            if (update and not dirty) or attrName == "id":
-                continue
-
-            val = self.__attrs[attrName][0]
-            sval = ""
-            if val is None:
-                continue
-            elif isinstance(val, bool):
-                sval = str(val).lower()
-            elif isinstance(val, dt.datetime) or isinstance(val, dt.date):
-                sval = val.isoformat()
-            else:
-                sval = str(val)
-            command.attrs[attrName] = sval
-            self.__attrs[attrName] = (val, False)
+        dirty_attrs = self.__dirty_attrs
+        if not update or dirty_attrs:
+            for attrName in sorted(self.__attrs):
+                if attrName == "id" or (
+                    update and not dirty_attrs & _attr_bits.get(attrName, 0)
+                ):
+                    continue
+
+                val = self.__attrs[attrName]
+                sval = ""
+                if val is None:
+                    continue
+                elif isinstance(val, bool):
+                    sval = str(val).lower()
+                elif isinstance(val, dt.datetime) or isinstance(val, dt.date):
+                    sval = val.isoformat()
+                else:
+                    sval = str(val)
+                command.attrs[attrName] = sval
+            # all attributes, but "id", are sent
+            self.__dirty_attrs &= _attr_bits.get("id", 0)
 
         id = self.__attrs.get("id")
         if not update and self.__uid is not None:
@@ -573,4 +719,142 @@ class Control:
 
     def _dispose(self):
         self.page = None
-        self.__event_handlers.clear()
+        self.__event_handlers = None
+        self._cancel_tasks()
+
+
+def _track_property_setters(cls):
+    """
+    Makes setters of public properties mark the control dirty. Properties
+    kept in fields, e.g. `container.padding` or `container.content`, are
+    converted to attributes only while building commands, and some setters
+    keep a value in a field or in an attribute depending on its type, e.g.
+    `text.style`, so without it their changes would be skipped by dirty-only
+    updates.
+    """
+    for name, prop in list(cls.__dict__.items()):
+        if (
+            isinstance(prop, property)
+            and prop.fset is not None
+            and name[0] != "_"
+            and name not in _untracked_names
+        ):
+            setattr(cls, name, prop.setter(_marking_dirty(prop.fset)))
+
+
+def _marking_dirty(fset):
+    @functools.wraps(fset)
+    def setter(self, value):
+        fset(self, value)
+        try:
+            dirty = self._Control__dirty
+        except AttributeError:
+            return  # Control.__init__() has not been called yet
+        if not dirty:
+            self._mark_dirty()
+
+    return setter
+
+
+_track_property_setters(Control)
+
+
+class _PendingAdds:
+    """
+    Index of "add" commands of a single update by IDs of added controls.
+
+    Used to detect in O(1) that a deleted control has been re-added
+    to another parent earlier in the same update.
+    """
+
+    def __init__(self, commands: List[Command]):
+        self.__adds: Dict[str, Command] = {}
+        self.__removes: Dict[int, List[str]] = {}  # key: id() of "add" command
+        for cmd in commands:
+            if cmd.name == "add":
+                self.add(cmd)
+
+    def add(self, add_cmd: Command):
+        for cmd in add_cmd.commands:
+            control_id = cmd.attrs.get("id")
+            if control_id is not None:
+                self.__adds[control_id] = add_cmd
+
+    def remove_before_add(self, control_id: Optional[str]) -> bool:
+        add_cmd = self.__adds.get(control_id) if control_id is not None else None
+        if add_cmd is None:
+            return False
+        self.__removes.setdefault(id(add_cmd), []).append(control_id)
+        return True
+
+    def insert_removes(self, commands: List[Command]):
+        """
+        Inserts "remove" commands for re-added controls before their "add" commands.
+        """
+        if len(self.__removes) == 0:
+            return
+        result = []
+        for cmd in commands:
+            ids = self.__removes.get(id(cmd))
+            if ids is not None:
+                result.append(Command(0, "remove", ids))
+            result.append(cmd)
+        commands[:] = result
+        self.__removes.clear()
+
+
+def _match_children(
+    previous_children: List[Control], current_children: List[Control]
+) -> Tuple[Dict[int, int], Set[int]]:
+    """
+    Matches previous and current children by identity in O(n log n).
+
+    Returns a map of control `id()` to its position in `previous_children`
+    and a set of previous positions of controls which stay in place.
+    """
+    previous_positions = {}
+    for i, ctrl in enumerate(previous_children):
+        previous_positions.setdefault(id(ctrl), i)
+
+    # positions of controls which are in both lists,
+    # in the order of current children
+    kept_positions = []
+    for ctrl in current_children:
+        i = previous_positions.get(id(ctrl))
+        if i is not None:
+            kept_positions.append(i)
+
+    # the longest run of controls preserving their relative order
+    # stays in place, other kept controls are moved (removed and re-added)
+    return previous_positions, _longest_increasing_subsequence(kept_positions)
+
+
+def _longest_increasing_subsequence(values: List[int]) -> Set[int]:
+    """
+    Returns the set of values forming the longest strictly increasing
+    subsequence of `values` in O(n log n).
+    """
+    # already ordered - nothing was moved
+    if all(a < b for a, b in zip(values, values[1:])):
+        return set(values)
+
+    tails = []  # index in values of the smallest tail of each run length
+    tail_values = []
+    predecessors = [-1] * len(values)
+    for i, v in enumerate(values):
+        k = bisect_left(tail_values, v)
+        if k > 0:
+            predecessors[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(v)
+        else:
+            tails[k] = i
+            tail_values[k] = v
+
+    result = set()
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        result.add(values[i])
+        i = predecessors[i]
+    return result
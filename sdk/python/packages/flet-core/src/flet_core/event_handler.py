@@ -1,6 +1,7 @@
 import asyncio
 
 from flet_core.control_event import ControlEvent
+from flet_core.fair_executor import TaskPriority
 
 
 class EventHandler:
@@ -25,7 +26,7 @@ class EventHandler:
                     if asyncio.iscoroutinefunction(handler):
                         await handler(ce)
                     else:
-                        e.page.run_thread(handler, ce)
+                        e.page.run_thread(handler, ce, priority=TaskPriority.UI)
 
         return fn
 
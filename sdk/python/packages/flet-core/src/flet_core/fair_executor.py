@@ -0,0 +1,155 @@
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future
+from enum import Enum
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+class TaskPriority(Enum):
+    UI = 0
+    PUBSUB = 1
+    BACKGROUND = 2
+
+
+_Job = Tuple[Future, Callable, tuple, dict]
+
+
+class FairExecutor:
+    """
+    Schedules sync handlers of multiple sessions on a shared `executor`.
+
+    At most `max_workers` jobs run at once, and at most
+    `max_workers_per_session` of them belong to the same session. Jobs with
+    a higher priority run first; sessions with jobs of the same priority
+    take turns, so a session with many slow jobs doesn't delay jobs of
+    other sessions.
+
+    `executor` must have `max_workers` workers not used for other jobs,
+    otherwise they wait for a worker regardless of their priority.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        max_workers: int,
+        max_workers_per_session: Optional[int] = None,
+    ):
+        self.__executor = executor
+        self.__max_workers = max_workers
+        self.__max_workers_per_session = max_workers_per_session
+        self.__lock = threading.Lock()
+        self.__queues: Dict[TaskPriority, OrderedDict[str, Deque[_Job]]] = {
+            priority: OrderedDict() for priority in TaskPriority
+        }
+        self.__queued = 0
+        self.__running = 0
+        self.__running_per_session: Dict[str, int] = {}
+
+    # max_workers_per_session
+    @property
+    def max_workers_per_session(self) -> Optional[int]:
+        return self.__max_workers_per_session
+
+    @max_workers_per_session.setter
+    def max_workers_per_session(self, value: Optional[int]):
+        with self.__lock:
+            self.__max_workers_per_session = value
+            self.__dispatch()
+
+    # queued
+    @property
+    def queued(self) -> int:
+        """
+        The number of jobs waiting for a worker.
+        """
+        return self.__queued
+
+    # running
+    @property
+    def running(self) -> int:
+        return self.__running
+
+    def get_queued(
+        self, session_id: Optional[str] = None, priority: Optional[TaskPriority] = None
+    ) -> int:
+        """
+        The number of jobs of a session and/or priority waiting for a worker.
+        """
+        with self.__lock:
+            return sum(
+                len(jobs)
+                for p, queue in self.__queues.items()
+                if priority is None or p == priority
+                for s, jobs in queue.items()
+                if session_id is None or s == session_id
+            )
+
+    def get_running(self, session_id: str) -> int:
+        return self.__running_per_session.get(session_id, 0)
+
+    def submit(
+        self,
+        session_id: str,
+        priority: TaskPriority,
+        fn: Callable,
+        *args,
+        **kwargs,
+    ) -> Future:
+        future = Future()
+        with self.__lock:
+            queue = self.__queues[priority]
+            jobs = queue.get(session_id)
+            if jobs is None:
+                jobs = queue[session_id] = deque()
+            jobs.append((future, fn, args, kwargs))
+            self.__queued += 1
+            self.__dispatch()
+        return future
+
+    def __dispatch(self):
+        # lock must be held
+        while self.__queued and self.__running < self.__max_workers:
+            job = self.__next_job()
+            if job is None:
+                # all sessions with queued jobs are at their limit
+                return
+            self.__executor.submit(self.__run, *job)
+
+    def __next_job(self) -> Optional[Tuple[str, _Job]]:
+        for queue in self.__queues.values():
+            for session_id, jobs in queue.items():
+                running = self.__running_per_session.get(session_id, 0)
+                if (
+                    self.__max_workers_per_session
+                    and running >= self.__max_workers_per_session
+                ):
+                    continue
+                job = jobs.popleft()
+                if jobs:
+                    # let other sessions go first next time
+                    queue.move_to_end(session_id)
+                else:
+                    del queue[session_id]
+                self.__queued -= 1
+                self.__running += 1
+                self.__running_per_session[session_id] = running + 1
+                return session_id, job
+        return None
+
+    def __run(self, session_id: str, job: _Job):
+        future, fn, args, kwargs = job
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            with self.__lock:
+                self.__running -= 1
+                running = self.__running_per_session[session_id] - 1
+                if running:
+                    self.__running_per_session[session_id] = running
+                else:
+                    del self.__running_per_session[session_id]
+                self.__dispatch()
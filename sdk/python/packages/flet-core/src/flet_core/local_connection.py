@@ -12,6 +12,7 @@ class LocalConnection(Connection):
         super().__init__()
         self.__control_id = 1
         self._client_details = None
+        self.__pending_props: Dict[str, Dict[str, Any]] = {}
 
     def _create_register_web_client_response(
         self, controls: Optional[Dict[str, Dict[str, Any]]] = None
@@ -81,6 +82,35 @@ class LocalConnection(Connection):
             eventData=json.dumps(msg.payload["props"], separators=(",", ":")),
         )
 
+    def _merge_update_control_props(self, msg: ClientMessage) -> bool:
+        """
+        Merges props of `updateControlProps` message with pending props of
+        the same controls.
+
+        Returns `True` if there were no pending props, so a caller should
+        schedule `_pop_update_control_props_handler_arg()` call.
+        """
+        first = not self.__pending_props
+        for props in msg.payload["props"]:
+            pending = self.__pending_props.get(props["i"])
+            if pending is None:
+                self.__pending_props[props["i"]] = dict(props)
+            else:
+                pending.update(props)
+        return first
+
+    def _pop_update_control_props_handler_arg(self) -> Optional[PageEventPayload]:
+        """
+        Returns a single page change event with all pending props.
+        """
+        if not self.__pending_props:
+            return None
+        props = list(self.__pending_props.values())
+        self.__pending_props = {}
+        return self._create_update_control_props_handler_arg(
+            ClientMessage(ClientActions.UPDATE_CONTROL_PROPS, {"props": props})
+        )
+
     def _process_command(self, command: Command):
         logger.debug(f"_process_command: {command}")
         if command.name == "get":
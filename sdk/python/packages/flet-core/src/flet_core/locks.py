@@ -1,3 +1,8 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+
 class NopeLock:
     def __enter__(self):
         pass
@@ -12,3 +17,67 @@ class AsyncNopeLock:
 
     async def __aexit__(self, *args):
         pass
+
+
+class SubtreeLock:
+    """
+    Lock of controls subtrees.
+
+    `acquire(controls)` waits while another thread holds a lock of any of
+    `controls`, their ancestors or descendants, so updates of disjoint
+    subtrees could run at the same time.
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition()
+        self.__locked: Dict[int, Any] = {}  # key: id(control), value: control
+
+    @contextmanager
+    def acquire(self, controls: List[Any]):
+        with self.__condition:
+            self.__condition.wait_for(lambda: not self.__overlaps(controls))
+            self.__lock(controls)
+        try:
+            yield
+        finally:
+            self.release(controls)
+
+    def try_acquire(self, controls: List[Any]) -> bool:
+        """
+        Locks `controls` without waiting and returns `True` if none of them
+        is locked by another thread; they must be unlocked with `release()`.
+        """
+        with self.__condition:
+            if self.__overlaps(controls):
+                return False
+            self.__lock(controls)
+            return True
+
+    def release(self, controls: List[Any]):
+        with self.__condition:
+            for control in controls:
+                self.__locked.pop(id(control), None)
+            self.__condition.notify_all()
+
+    def __lock(self, controls: List[Any]):
+        for control in controls:
+            self.__locked[id(control)] = control
+
+    def __overlaps(self, controls: List[Any]) -> bool:
+        if not self.__locked:
+            return False
+        for control in controls:
+            # control or its ancestor is locked
+            c = control
+            while c is not None:
+                if id(c) in self.__locked:
+                    return True
+                c = c.parent
+            # control is an ancestor of a locked control
+            for locked in self.__locked.values():
+                c = locked.parent
+                while c is not None:
+                    if c is control:
+                        return True
+                    c = c.parent
+        return False
@@ -1,14 +1,27 @@
 import asyncio
 from contextvars import ContextVar
+import functools
 import json
 import logging
 import threading
 import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union, cast
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 from urllib.parse import urlparse
 
 import flet_core
@@ -21,7 +34,7 @@ from flet_core.bottom_app_bar import BottomAppBar
 from flet_core.bottom_sheet import BottomSheet
 from flet_core.client_storage import ClientStorage
 from flet_core.connection import Connection
-from flet_core.control import Control, OptionalNumber
+from flet_core.control import Control, OptionalNumber, _PendingAdds
 from flet_core.control_event import ControlEvent
 from flet_core.cupertino_alert_dialog import CupertinoAlertDialog
 from flet_core.cupertino_app_bar import CupertinoAppBar
@@ -29,11 +42,13 @@ from flet_core.cupertino_bottom_sheet import CupertinoBottomSheet
 from flet_core.cupertino_navigation_bar import CupertinoNavigationBar
 from flet_core.event import Event
 from flet_core.event_handler import EventHandler
+from flet_core.fair_executor import FairExecutor, TaskPriority
 from flet_core.floating_action_button import FloatingActionButton
-from flet_core.locks import NopeLock
+from flet_core.locks import NopeLock, SubtreeLock
 from flet_core.navigation_bar import NavigationBar
 from flet_core.navigation_drawer import NavigationDrawer
 from flet_core.padding import Padding
+from flet_core.page_snapshot import PageSnapshot
 from flet_core.protocol import Command
 from flet_core.pubsub import PubSubClient
 from flet_core.querystring import QueryString
@@ -54,11 +69,13 @@ from flet_core.types import (
 )
 from flet_core.utils import deprecated, classproperty
 from flet_core.utils.concurrency_utils import is_pyodide
+from flet_core.utils.process_pool import get_process_executor
 from flet_core.view import View
 
 logger = logging.getLogger(flet_core.__name__)
 
 _session_page = ContextVar("flet_session_page", default=None)
+_update_batches = ContextVar("flet_update_batches", default=())
 
 
 class context:
@@ -104,6 +121,18 @@ class PageDisconnectedException(Exception):
         super().__init__(message)
 
 
+class _UpdateBatch:
+    """
+    Controls updated in a `page.batch()` block.
+    """
+
+    def __init__(self, page: "Page"):
+        self.page = page
+        self.controls: Dict[int, Control] = {}  # key: id(control)
+        self.calls = 0
+        self.closed = False
+
+
 class Page(AdaptiveControl):
     """
     Page is a container for `View` (https://flet.dev/docs/controls/view) controls.
@@ -134,7 +163,7 @@ class Page(AdaptiveControl):
         conn: Connection,
         session_id,
         loop: asyncio.AbstractEventLoop,
-        executor: Optional[ThreadPoolExecutor] = None,
+        executor: Optional[Union[ThreadPoolExecutor, FairExecutor]] = None,
     ):
         Control.__init__(self)
 
@@ -142,7 +171,7 @@ class Page(AdaptiveControl):
         self._Control__uid = "page"
         self.__conn = conn
         self.__next_control_id = 1
-        self.__snapshot: Dict[str, Dict[str, Any]] = {}
+        self.__snapshot = PageSnapshot()
         self.__expires_at = None
         self.__query: QueryString = QueryString(page=self)  # Querystring
         self._session_id = session_id
@@ -151,6 +180,16 @@ class Page(AdaptiveControl):
         self._index = {self._Control__uid: self}  # index with all page controls
 
         self.__lock = threading.Lock() if not is_pyodide() else NopeLock()
+        self.__subtree_lock = SubtreeLock()
+        self.__send_lock = threading.Lock() if not is_pyodide() else NopeLock()
+        self.__update_dirty_only = False
+        self.__update_on_next_tick = False
+        self.__pending_updates: Dict[int, Control] = {}  # key: id(control)
+        self.__pending_update_calls = 0
+        self.__flush_scheduled = False
+        self.__coalesced_updates = 0
+        self.__process_futures: Set[asyncio.Future] = set()
+        self.__deferred_changes: Optional[asyncio.Future] = None
 
         self.__views = [View()]
         self.__default_view = self.__views[0]
@@ -319,12 +358,107 @@ class Page(AdaptiveControl):
         await self.on_event_async(Event("page", "disconnect", ""))
 
     def update(self, *controls):
+        batch = self.__get_update_batch()
+        if batch is not None and self.__add_to_batch(batch, controls):
+            return
+        if self.__update_on_next_tick:
+            self.__defer_update(controls)
+            return
+        if len(controls) == 0:
+            controls = (self,)
+        with self.__subtree_lock.acquire(controls):
+            r = self.__update(*controls)
+        self.__handle_mount_unmount(*r)
+        self.__wait_send_queue()
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers `update()` calls made in the block until it exits, so that
+        all updated controls are sent in a single message:
+
+        ```
+        with page.batch():
+            for c in controls:
+                c.value = "..."
+                c.update()
+        ```
+        """
+        if self.__get_update_batch() is not None:
+            # nested block is a part of outer one
+            yield self
+            return
+        # updates are collected per context, so a block exiting in one
+        # thread doesn't send updates of blocks still open in others
+        batch = _UpdateBatch(self)
+        token = _update_batches.set(_update_batches.get() + (batch,))
+        try:
+            yield self
+        finally:
+            _update_batches.reset(token)
+            with self.__lock:
+                batch.closed = True
+            self.__update_deferred(list(batch.controls.values()), batch.calls)
+
+    def __get_update_batch(self) -> Optional[_UpdateBatch]:
+        for batch in _update_batches.get():
+            if batch.page is self:
+                return batch
+        return None
+
+    def __add_to_batch(self, batch: _UpdateBatch, controls) -> bool:
         with self.__lock:
-            if len(controls) == 0:
-                r = self.__update(self)
-            else:
-                r = self.__update(*controls)
+            # tasks started in the block could update controls after it exits
+            if batch.closed:
+                return False
+            for control in controls or [self]:
+                batch.controls.setdefault(id(control), control)
+            batch.calls += 1
+            return True
+
+    def __defer_update(self, controls):
+        with self.__lock:
+            for control in controls or [self]:
+                self.__pending_updates.setdefault(id(control), control)
+            self.__pending_update_calls += 1
+            if self.__flush_scheduled:
+                return
+            self.__flush_scheduled = True
+        # flushed on the next event loop iteration by a worker thread, so
+        # the loop doesn't build commands and wait for page locks
+        self.__loop.call_soon_threadsafe(
+            functools.partial(
+                self.run_thread,
+                self.__flush_scheduled_updates,
+                priority=TaskPriority.UI,
+            )
+        )
+
+    def __flush_scheduled_updates(self):
+        with self.__lock:
+            self.__flush_scheduled = False
+            controls = list(self.__pending_updates.values())
+            calls = self.__pending_update_calls
+            self.__pending_updates = {}
+            self.__pending_update_calls = 0
+        try:
+            self.__update_deferred(controls, calls)
+        except PageDisconnectedException:
+            logger.debug(f"Deferred update of disconnected page: {self._session_id}")
+
+    def __update_deferred(self, controls: List[Control], calls: int):
+        if not controls:
+            return
+        with self.__lock:
+            self.__coalesced_updates += calls - 1
+        logger.debug(f"Flushing {calls} page updates of {len(controls)} controls")
+        with self.__subtree_lock.acquire(controls):
+            # skip controls removed from the page since update() call
+            r = self.__update(
+                *[c for c in controls if c is self or c._Control__uid in self._index]
+            )
         self.__handle_mount_unmount(*r)
+        self.__wait_send_queue()
 
     @deprecated(
         reason="Use update() method instead.", version="0.21.0", delete_version="1.0"
@@ -333,10 +467,12 @@ class Page(AdaptiveControl):
         self.update(*controls)
 
     def add(self, *controls):
-        with self.__lock:
+        with self.__subtree_lock.acquire([self]):
             self._controls.extend(controls)
+            self.__default_view._mark_dirty()
             r = self.__update(self)
         self.__handle_mount_unmount(*r)
+        self.__wait_send_queue()
 
     @deprecated(
         reason="Use add() method instead.", version="0.21.0", delete_version="1.0"
@@ -345,13 +481,15 @@ class Page(AdaptiveControl):
         self.add(*controls)
 
     def insert(self, at, *controls):
-        with self.__lock:
+        with self.__subtree_lock.acquire([self]):
             n = at
             for control in controls:
                 self._controls.insert(n, control)
                 n += 1
+            self.__default_view._mark_dirty()
             r = self.__update(self)
         self.__handle_mount_unmount(*r)
+        self.__wait_send_queue()
 
     @deprecated(
         reason="Use insert() method instead.", version="0.21.0", delete_version="1.0"
@@ -360,11 +498,13 @@ class Page(AdaptiveControl):
         self.insert(at, *controls)
 
     def remove(self, *controls):
-        with self.__lock:
+        with self.__subtree_lock.acquire([self]):
             for control in controls:
                 self._controls.remove(control)
+            self.__default_view._mark_dirty()
             r = self.__update(self)
         self.__handle_mount_unmount(*r)
+        self.__wait_send_queue()
 
     @deprecated(
         reason="Use remove() method instead.", version="0.21.0", delete_version="1.0"
@@ -373,10 +513,12 @@ class Page(AdaptiveControl):
         self.remove(*controls)
 
     def remove_at(self, index):
-        with self.__lock:
+        with self.__subtree_lock.acquire([self]):
             self._controls.pop(index)
+            self.__default_view._mark_dirty()
             r = self.__update(self)
         self.__handle_mount_unmount(*r)
+        self.__wait_send_queue()
 
     @deprecated(
         reason="Use remove_at() method instead.", version="0.21.0", delete_version="1.0"
@@ -395,7 +537,7 @@ class Page(AdaptiveControl):
         self.clean()
 
     def _clean(self, control: Control):
-        with self.__lock:
+        with self.__subtree_lock.acquire([control]):
             control._previous_children.clear()
             assert control.uid is not None
             removed_controls = []
@@ -403,16 +545,22 @@ class Page(AdaptiveControl):
                 removed_controls.extend(
                     self._remove_control_recursively(self.index, child)
                 )
-            self._send_command("clean", [control.uid])
+            with self.__send_lock:
+                self._send_command("clean", [control.uid])
             for c in removed_controls:
                 c.will_unmount()
+                c._cancel_tasks()
+        self.__wait_send_queue()
 
     def _close(self):
         self.__pubsub.unsubscribe_all()
+        for future in list(self.__process_futures):
+            future.cancel()
         removed_controls = self._remove_control_recursively(self.index, self)
         for c in removed_controls:
             c.will_unmount()
             c._dispose()
+        self._cancel_tasks()
         self._controls.clear()
         self._previous_children.clear()
         self.__on_view_pop = None
@@ -421,24 +569,41 @@ class Page(AdaptiveControl):
         self.__conn = None
 
     def __update(self, *controls) -> Tuple[List[Control], List[Control]]:
+        # subtree lock of `controls` must be held by a caller, so commands
+        # of disjoint subtrees are built concurrently and sent one by one
         if self.__conn is None:
             raise PageDisconnectedException("Page has been disconnected")
         commands, added_controls, removed_controls = self.__prepare_update(*controls)
         self.__validate_controls_page(added_controls)
-        results = self.__conn.send_commands(self._session_id, commands).results
-        self.__update_control_ids(added_controls, results)
+        with self.__send_lock:
+            results = self.__conn.send_commands(self._session_id, commands).results
+            self.__update_control_ids(added_controls, results)
         return added_controls, removed_controls
 
+    def __wait_send_queue(self):
+        # page locks must be released, as the event loop sending queued
+        # messages could be waiting for them
+        conn = self.__conn
+        if conn is not None:
+            conn.wait_send_queue(self._session_id)
+
     def __prepare_update(self, *controls):
         added_controls = []
         removed_controls = []
         commands = []
+        pending_adds = _PendingAdds(commands)
 
         # build commands
         for control in controls:
             control.build_update_commands(
-                self._index, commands, added_controls, removed_controls
+                self._index,
+                commands,
+                added_controls,
+                removed_controls,
+                dirty_only=self.__update_dirty_only,
+                pending_adds=pending_adds,
             )
+        pending_adds.insert_removes(commands)
 
         if len(commands) == 0:
             return commands, added_controls, removed_controls
@@ -467,13 +632,14 @@ class Page(AdaptiveControl):
     def __handle_mount_unmount(self, added_controls, removed_controls):
         for ctrl in removed_controls:
             ctrl.will_unmount()
+            ctrl._cancel_tasks()
             ctrl.parent = None  # remove parent reference
             ctrl.page = None
         for ctrl in added_controls:
             ctrl.did_mount()
 
     def error(self, message=""):
-        with self.__lock:
+        with self.__send_lock:
             self._send_command("error", [message])
 
     @deprecated(
@@ -486,39 +652,97 @@ class Page(AdaptiveControl):
         logger.debug(f"page.on_event_async: {e.target} {e.name} {e.data}")
 
         if e.target == "page" and e.name == "change":
-            with self.__lock:
-                self.__on_page_change_event(e.data)
+            await self.__on_page_change_event(e.data)
 
         elif e.target in self._index:
+            # handlers see changes of events which came before
+            deferred = self.__deferred_changes
+            if deferred is not None:
+                await asyncio.wait([deferred])
             ce = ControlEvent(e.target, e.name, e.data, self._index[e.target], self)
             handler = self._index[e.target].event_handlers.get(e.name)
             if handler:
                 if asyncio.iscoroutinefunction(handler):
                     await handler(ce)
                 else:
-                    self.run_thread(handler, ce)
+                    self.run_thread(handler, ce, priority=TaskPriority.UI)
 
-    def __on_page_change_event(self, data):
+    async def __on_page_change_event(self, data):
+        changes = []
         for props in json.loads(data):
-            id = props["i"]
-            if id in self._index:
-                for name in props:
-                    if name != "i":
-                        self._index[id]._set_attr(name, props[name], dirty=False)
+            control = self._index.get(props["i"])
+            if control is not None:
+                changes.append((control, props))
+        controls = [c for c, _ in changes]
+        previous = self.__deferred_changes
+        if previous is None and self.__subtree_lock.try_acquire(controls):
+            try:
+                self.__apply_changes(changes)
+            finally:
+                self.__subtree_lock.release(controls)
+            return
+
+        # controls are being updated by another thread, so changes are
+        # applied by a worker thread waiting for them instead of the event
+        # loop, after changes deferred before
+        async def apply_deferred_changes():
+            if previous is not None:
+                await asyncio.wait([previous])
+            await self.__run_in_executor(self.__apply_locked_changes, changes)
+
+        deferred = asyncio.ensure_future(apply_deferred_changes())
+        self.__deferred_changes = deferred
+        try:
+            await deferred
+        finally:
+            if self.__deferred_changes is deferred:
+                self.__deferred_changes = None
+
+    def __apply_locked_changes(self, changes):
+        with self.__subtree_lock.acquire([c for c, _ in changes]):
+            self.__apply_changes(changes)
+
+    def __apply_changes(self, changes):
+        for control, props in changes:
+            for name in props:
+                if name != "i":
+                    control._set_attr(name, props[name], dirty=False)
+
+    def __run_in_executor(self, handler, *args) -> Awaitable[Any]:
+        if isinstance(self.__executor, FairExecutor):
+            return asyncio.wrap_future(
+                self.__executor.submit(
+                    self._session_id, TaskPriority.UI, handler, *args
+                )
+            )
+        return asyncio.get_running_loop().run_in_executor(
+            self.__executor, handler, *args
+        )
 
     def run_task(self, handler: Callable[..., Awaitable[Any]], *args, **kwargs):
+        """
+        Runs `handler` coroutine in page event loop.
+
+        Returns `concurrent.futures.Future` of the task. Tasks which are not
+        done yet are cancelled when the session closes; their number is
+        available in `page.task_count`.
+        """
         _session_page.set(self)
         assert asyncio.iscoroutinefunction(handler)
         
         future = asyncio.run_coroutine_threadsafe(handler(*args, **kwargs), self.__loop)
 
         def _on_completion(f):
+            if f.cancelled():
+                return
+
             exception = f.exception()
 
             if exception:
                 raise exception
 
         future.add_done_callback(_on_completion)
+        self._add_task(future)
 
         return future
 
@@ -529,10 +753,17 @@ class Page(AdaptiveControl):
 
         return wrapper
 
-    def run_thread(self, handler, *args):
+    def run_thread(
+        self, handler, *args, priority: TaskPriority = TaskPriority.BACKGROUND
+    ):
         handler_with_context = self.__context_wrapper(handler)
         if is_pyodide():
             handler_with_context(*args)
+        elif isinstance(self.__executor, FairExecutor):
+            future = self.__executor.submit(
+                self._session_id, priority, handler_with_context, *args
+            )
+            future.add_done_callback(self.__log_thread_exception)
         else:
             assert self.__loop
             self.__loop.call_soon_threadsafe(
@@ -542,6 +773,36 @@ class Page(AdaptiveControl):
                 *args,
             )
 
+    async def run_process(self, fn: Callable, *args):
+        """
+        Runs CPU-bound `fn(*args)` in a process pool shared by all sessions,
+        so it doesn't hold GIL of the session thread, and returns its result.
+        `fn` must be a module-level function and its arguments and result
+        must be picklable.
+
+        Sync handlers could wait for the result with
+        `page.run_task(page.run_process, fn, *args).result()`.
+
+        When the session is closed jobs not started yet are cancelled and
+        results of running jobs are discarded.
+        """
+        if is_pyodide():
+            return fn(*args)
+        future = asyncio.wrap_future(get_process_executor().submit(fn, *args))
+        self.__process_futures.add(future)
+        try:
+            return await future
+        finally:
+            self.__process_futures.discard(future)
+
+    def __log_thread_exception(self, future):
+        if not future.cancelled() and future.exception():
+            e = future.exception()
+            logger.error(
+                f"Unhandled error in thread of session {self._session_id}: {e}",
+                exc_info=e,
+            )
+
     def go(self, route, skip_route_change_event=False, **kwargs):
         self.route = route if not kwargs else route + self.query.post(kwargs)
 
@@ -1197,7 +1458,7 @@ class Page(AdaptiveControl):
 
     # snapshot
     @property
-    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+    def snapshot(self) -> PageSnapshot:
         return self.__snapshot
 
     @property
@@ -1223,6 +1484,47 @@ class Page(AdaptiveControl):
     def session_id(self):
         return self._session_id
 
+    # update_dirty_only
+    @property
+    def update_dirty_only(self) -> bool:
+        """
+        If `True`, `update()` skips controls that have no property changes since
+        the previous update. Assigning a property, including children (e.g.
+        `container.content = ...` or `column.controls = [...]`), marks the
+        control for update. In-place changes are not tracked: changes of
+        children lists (e.g. `column.controls.append()`) and of nested objects
+        (e.g. `container.padding.left = 10`) are sent only when the changed
+        control is updated explicitly with `control.update()`.
+        """
+        return self.__update_dirty_only
+
+    @update_dirty_only.setter
+    def update_dirty_only(self, value: bool):
+        self.__update_dirty_only = value
+
+    # update_on_next_tick
+    @property
+    def update_on_next_tick(self) -> bool:
+        """
+        If `True`, `update()` doesn't send changes immediately, but schedules
+        a single update of all controls updated until the next event loop
+        iteration. The update is sent by a worker thread.
+        """
+        return self.__update_on_next_tick
+
+    @update_on_next_tick.setter
+    def update_on_next_tick(self, value: bool):
+        self.__update_on_next_tick = value
+
+    # coalesced_updates
+    @property
+    def coalesced_updates(self) -> int:
+        """
+        The number of `update()` calls merged into other calls by
+        `update_on_next_tick` mode or `batch()`.
+        """
+        return self.__coalesced_updates
+
     # auth
     @property
     def auth(self):
@@ -0,0 +1,72 @@
+from typing import Any, Dict, Iterable, List, Set
+
+
+class PageSnapshot(Dict[str, Dict[str, Any]]):
+    """
+    Server-side copy of controls tree sent to a client, keyed by control ID.
+
+    Every control is a dict in the same format as in `addPageControls`
+    message: `i` - ID, `t` - type, `p` - parent ID, `c` - list of children IDs
+    and control properties.
+    """
+
+    def add_controls(self, controls: List[Dict[str, Any]]):
+        """
+        Adds controls of `addPageControls` message.
+
+        Snapshot keeps its own shallow copies of controls, so the message
+        could be sent after snapshot is changed.
+        """
+        added_ids = set()
+        for oc in controls:
+            control = oc.copy()
+            control["c"] = oc["c"].copy()
+            id = control["i"]
+            pid = control["p"]
+
+            # children of controls added in the same message
+            # are already in their parents' lists
+            if pid not in added_ids:
+                parent = self.get(pid)
+                assert parent, f"parent control not found: {pid}"
+                if id not in parent["c"]:
+                    if "at" in control:
+                        parent["c"].insert(int(control["at"]), id)
+                    else:
+                        parent["c"].append(id)
+            self[id] = control
+            added_ids.add(id)
+
+    def set_props(self, id: str, props: Dict[str, Any]):
+        control = self.get(id)
+        if control:
+            control.update(props)
+
+    def remove_controls(self, ids: Iterable[str]):
+        removed: Dict[str, Set[str]] = {}  # key: parent ID, value: children IDs
+        for id in ids:
+            control = self.get(id)
+            assert control is not None, f"control with ID '{id}' not found."
+            self.__pop_subtree(id)
+            removed.setdefault(control["p"], set()).add(id)
+
+        # children list of every parent is filtered once
+        for pid, children in removed.items():
+            parent = self.get(pid)
+            if parent:
+                parent["c"][:] = [cid for cid in parent["c"] if cid not in children]
+
+    def clean_controls(self, ids: Iterable[str]):
+        for id in ids:
+            control = self.get(id)
+            if control:
+                for cid in control["c"]:
+                    self.__pop_subtree(cid)
+                control["c"] = []
+
+    def __pop_subtree(self, id: str):
+        stack = [id]
+        while stack:
+            control = self.pop(stack.pop(), None)
+            if control:
+                stack.extend(control["c"])
@@ -1,6 +1,12 @@
 import json
+import zlib
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 
 class CommandEncoder(json.JSONEncoder):
@@ -135,6 +141,121 @@ class ClientMessage:
     payload: Any
 
 
+_batched_actions = {
+    ClientActions.ADD_PAGE_CONTROLS,
+    ClientActions.UPDATE_CONTROL_PROPS,
+    ClientActions.CLEAN_CONTROL,
+    ClientActions.REMOVE_CONTROL,
+}
+
+
+def is_control_message(message: Any) -> bool:
+    """
+    Returns `True` if a message adds, updates or removes controls.
+    """
+    if isinstance(message, EncodedControlMessages):
+        return True
+    return isinstance(message, ClientMessage) and (
+        message.action in _batched_actions
+        or message.action == ClientActions.PAGE_CONTROLS_BATCH
+    )
+
+
+def flatten_control_messages(messages: List[ClientMessage]) -> List[ClientMessage]:
+    """
+    Replaces `pageControlsBatch` messages with messages they contain.
+    """
+    result = []
+    for message in messages:
+        if message.action == ClientActions.PAGE_CONTROLS_BATCH:
+            result.extend(message.payload)
+        else:
+            result.append(message)
+    return result
+
+
+def batch_client_messages(
+    messages: List[Union[ClientMessage, str, bytes]]
+) -> List[Union[ClientMessage, str, bytes]]:
+    """
+    Merges consecutive control messages into `pageControlsBatch` messages
+    preserving their order. Other messages, as well as already encoded ones,
+    are returned as is.
+    """
+    result = []
+    group = []
+
+    def flush():
+        if len(group) == 1:
+            result.append(group[0])
+        elif len(group) > 1:
+            batch = []
+            for m in group:
+                if m.action == ClientActions.PAGE_CONTROLS_BATCH:
+                    batch.extend(m.payload)
+                else:
+                    batch.append(m)
+            result.append(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, batch))
+        group.clear()
+
+    for message in messages:
+        if is_control_message(message):
+            group.append(message)
+        else:
+            flush()
+            result.append(message)
+    flush()
+    return result
+
+
+def coalesce_client_messages(
+    messages: List[Union[ClientMessage, str, bytes]]
+) -> List[Union[ClientMessage, str, bytes]]:
+    """
+    Batches messages like `batch_client_messages()` and merges consecutive
+    `updateControlProps` messages into one with a single set of props
+    per control.
+    """
+    flat = []
+    for message in messages:
+        if (
+            isinstance(message, ClientMessage)
+            and message.action == ClientActions.PAGE_CONTROLS_BATCH
+        ):
+            flat.extend(message.payload)
+        else:
+            flat.append(message)
+
+    result = []
+    props = {}
+
+    def flush():
+        if props:
+            result.append(
+                ClientMessage(
+                    ClientActions.UPDATE_CONTROL_PROPS,
+                    UpdateControlPropsPayload(props=list(props.values())),
+                )
+            )
+            props.clear()
+
+    for message in flat:
+        if (
+            isinstance(message, ClientMessage)
+            and message.action == ClientActions.UPDATE_CONTROL_PROPS
+        ):
+            for p in message.payload.props:
+                control_props = props.get(p["i"])
+                if control_props is None:
+                    props[p["i"]] = control_props = {}
+                control_props.update(p)
+        else:
+            flush()
+            result.append(message)
+    flush()
+    return batch_client_messages(result)
+
+
 @dataclass
 class RegisterWebClientRequestPayload:
     pageName: str
@@ -152,6 +273,8 @@ class RegisterWebClientRequestPayload:
     platformBrightness: str
     media: str
     sessionId: str
+    encodings: Optional[List[str]] = None
+    compressions: Optional[List[str]] = None
 
 
 @dataclass
@@ -206,3 +329,268 @@ class CleanControlPayload:
 @dataclass
 class RemoveControlPayload:
     ids: List[str]
+
+
+#
+# Encoding of messages sent to a client
+#
+
+
+class MessageEncodings:
+    """
+    Encodings of messages sent to a client.
+
+    A client lists encodings it supports in `RegisterWebClientRequestPayload.encodings`.
+    MessagePack is available if `msgpack` package is installed. JSON messages
+    start with `{`, MessagePack ones with a map marker, so clients can tell
+    them apart by the first byte.
+    """
+
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
+def get_supported_encodings() -> List[str]:
+    encodings = [MessageEncodings.JSON]
+    if msgpack is not None:
+        encodings.append(MessageEncodings.MSGPACK)
+    return encodings
+
+
+def negotiate_encoding(client_encodings: Optional[List[str]]) -> str:
+    """
+    Returns the first of client encodings, in client's order of preference,
+    supported by server or JSON.
+    """
+    supported = get_supported_encodings()
+    for encoding in client_encodings or []:
+        if encoding in supported:
+            return encoding
+    return MessageEncodings.JSON
+
+
+_command_encoder = CommandEncoder()
+
+
+def encode_message(
+    message: Any, encoding: str = MessageEncodings.JSON
+) -> Union[str, bytes]:
+    plain = message_to_plain(message)
+    if encoding == MessageEncodings.MSGPACK:
+        return msgpack.packb(plain, default=_command_encoder.default)
+    return json.dumps(plain, default=_command_encoder.default, separators=(",", ":"))
+
+
+class MessageCompressions:
+    """
+    Compressions of messages sent to a client.
+
+    A client lists compressions it supports in
+    `RegisterWebClientRequestPayload.compressions`. Compressed messages are
+    sent in binary frames starting with zlib header byte `0x78`, which is
+    neither a JSON nor a MessagePack map start.
+    """
+
+    ZLIB = "zlib"
+
+
+def negotiate_compression(client_compressions: Optional[List[str]]) -> Optional[str]:
+    if client_compressions and MessageCompressions.ZLIB in client_compressions:
+        return MessageCompressions.ZLIB
+    return None
+
+
+def compress_message(
+    message: Union[str, bytes], compression: Optional[str], threshold: int
+) -> Union[str, bytes]:
+    """
+    Compresses encoded message if it's at least `threshold` bytes long.
+    """
+    if compression != MessageCompressions.ZLIB or len(message) < threshold:
+        return message
+    if isinstance(message, str):
+        message = message.encode()
+    return zlib.compress(message)
+
+
+class EncodedControlMessages:
+    """
+    Control messages encoded by a session thread, so that a send loop shared
+    by all sessions doesn't spend its time on encoding.
+
+    Messages are encoded one by one, and consecutive `EncodedControlMessages`
+    are joined into a single `pageControlsBatch` frame with
+    `join_encoded_messages()` without encoding them again. If the encoded
+    messages are at least `compression_threshold` long they are compressed
+    together into `frame` and can't be joined with others.
+    """
+
+    def __init__(
+        self,
+        messages: List[ClientMessage],
+        encoding: str = MessageEncodings.JSON,
+        compression: Optional[str] = None,
+        compression_threshold: int = 0,
+    ):
+        self.messages = flatten_control_messages(messages)
+        self.encoding = encoding
+        self.parts: Optional[List[Union[str, bytes]]] = [
+            encode_message(m, encoding) for m in self.messages
+        ]
+        self.frame: Optional[bytes] = None
+        if (
+            compression is not None
+            and sum(len(p) for p in self.parts) >= compression_threshold
+        ):
+            self.frame = compress_message(
+                join_encoded_messages([self]), compression, compression_threshold
+            )
+            self.parts = None
+
+    def __len__(self):
+        return len(self.messages)
+
+
+def join_encoded_messages(
+    encoded: List[EncodedControlMessages],
+) -> Union[str, bytes]:
+    """
+    Returns a frame with all `encoded` messages, in a `pageControlsBatch`
+    message if there is more than one.
+    """
+    if len(encoded) == 1 and encoded[0].frame is not None:
+        return encoded[0].frame
+    parts = []
+    for e in encoded:
+        assert e.parts is not None, "compressed messages can't be joined"
+        parts.extend(e.parts)
+    if len(parts) == 1:
+        return parts[0]
+    if encoded[0].encoding == MessageEncodings.MSGPACK:
+        return (
+            _get_msgpack_batch_prefix()
+            + msgpack.Packer().pack_array_header(len(parts))
+            + b"".join(parts)
+        )
+    return _json_batch_prefix + ",".join(parts) + "]}"
+
+
+def batch_encoded_messages(messages: List[Any]) -> List[Any]:
+    """
+    Joins consecutive `EncodedControlMessages` which are not compressed into
+    frames with `join_encoded_messages()`. Other messages are returned as is.
+    """
+    result = []
+    group = []
+
+    def flush():
+        if group:
+            result.append(join_encoded_messages(group))
+            group.clear()
+
+    for message in messages:
+        if isinstance(message, EncodedControlMessages) and message.frame is None:
+            group.append(message)
+        else:
+            flush()
+            result.append(
+                message.frame
+                if isinstance(message, EncodedControlMessages)
+                else message
+            )
+    flush()
+    return result
+
+
+# beginning of encoded pageControlsBatch message up to its payload items
+_json_batch_prefix = '{"action":"' + ClientActions.PAGE_CONTROLS_BATCH + '","payload":['
+_msgpack_batch_prefix: Optional[bytes] = None
+
+
+def _get_msgpack_batch_prefix() -> bytes:
+    global _msgpack_batch_prefix
+    if _msgpack_batch_prefix is None:
+        # without the header of empty payload array
+        _msgpack_batch_prefix = msgpack.packb(
+            {"action": ClientActions.PAGE_CONTROLS_BATCH, "payload": []}
+        )[:-1]
+    return _msgpack_batch_prefix
+
+
+def message_to_plain(obj: Any) -> Any:
+    """
+    Converts a message into plain dicts and lists, so it can be encoded
+    without calling `CommandEncoder.default` for every nested object.
+
+    Dicts are expected to be plain already and are not copied. Objects of
+    unknown types are returned as is and handled by `CommandEncoder`.
+    """
+    converter = _plain_converters.get(obj.__class__)
+    return obj if converter is None else converter(obj)
+
+
+def _list_to_plain(obj: List[Any]):
+    return [message_to_plain(item) for item in obj]
+
+
+def _command_to_plain(obj: Command):
+    d = {}
+    if obj.indent > 0:
+        d["i"] = obj.indent
+    if obj.name is not None:
+        d["n"] = obj.name
+    if obj.values:
+        d["v"] = obj.values
+    if obj.attrs:
+        d["a"] = obj.attrs
+    if obj.commands:
+        d["c"] = [_command_to_plain(command) for command in obj.commands]
+    return d
+
+
+def _message_to_plain(obj: Message):
+    return {
+        "id": obj.id,
+        "action": obj.action,
+        "payload": message_to_plain(obj.payload),
+    }
+
+
+def _client_message_to_plain(obj: ClientMessage):
+    return {"action": obj.action, "payload": message_to_plain(obj.payload)}
+
+
+def _fields_to_plain(obj: Any):
+    return {k: message_to_plain(v) for k, v in obj.__dict__.items()}
+
+
+def _attrs_to_plain(obj: Any):
+    return obj.__dict__
+
+
+_plain_converters = {
+    list: _list_to_plain,
+    Command: _command_to_plain,
+    Message: _message_to_plain,
+    ClientMessage: _client_message_to_plain,
+    # payloads with nested messages or commands
+    PageCommandRequestPayload: _fields_to_plain,
+    PageCommandsBatchRequestPayload: _fields_to_plain,
+    RegisterWebClientResponsePayload: _fields_to_plain,
+    # payloads with plain fields only
+    PageCommandResponsePayload: _attrs_to_plain,
+    PageCommandsBatchResponsePayload: _attrs_to_plain,
+    PageEventPayload: _attrs_to_plain,
+    RegisterHostClientRequestPayload: _attrs_to_plain,
+    RegisterHostClientResponsePayload: _attrs_to_plain,
+    PageSessionCreatedPayload: _attrs_to_plain,
+    RegisterWebClientRequestPayload: _attrs_to_plain,
+    SessionPayload: _attrs_to_plain,
+    PageEventFromWebPayload: _attrs_to_plain,
+    SessionCrashedPayload: _attrs_to_plain,
+    InvokeMethodPayload: _attrs_to_plain,
+    AddPageControlsPayload: _attrs_to_plain,
+    UpdateControlPropsPayload: _attrs_to_plain,
+    CleanControlPayload: _attrs_to_plain,
+    RemoveControlPayload: _attrs_to_plain,
+}
@@ -1,2 +1,7 @@
+from flet_core.pubsub.pubsub_backend import (
+    LocalPubSubBackend,
+    PubSubBackend,
+    UnixSocketPubSubBackend,
+)
 from flet_core.pubsub.pubsub_client import PubSubClient
 from flet_core.pubsub.pubsub_hub import PubSubHub
@@ -0,0 +1,302 @@
+import logging
+import os
+import pickle
+import queue
+import socket
+import struct
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List
+
+import flet_core
+from flet_core.locks import NopeLock
+from flet_core.utils.concurrency_utils import is_pyodide
+
+logger = logging.getLogger(flet_core.__name__)
+
+PubSubCallback = Callable[[Any], None]
+
+DEFAULT_BROKER_QUEUE_SIZE = 10000
+
+
+class PubSubBackend:
+    """
+    Delivers messages published by `PubSubHub` to all hubs of the same
+    channel, which could live in other processes.
+    """
+
+    def subscribe(self, channel: str, callback: PubSubCallback):
+        raise NotImplementedError()
+
+    def unsubscribe(self, channel: str, callback: PubSubCallback):
+        raise NotImplementedError()
+
+    def publish(self, channel: str, message: Any):
+        raise NotImplementedError()
+
+
+class LocalPubSubBackend(PubSubBackend):
+    """
+    Delivers messages to hubs in the current process only.
+
+    Could be used in tests to simulate hubs running in multiple processes.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock() if not is_pyodide() else NopeLock()
+        self.__callbacks: Dict[str, List[PubSubCallback]] = {}
+
+    def subscribe(self, channel: str, callback: PubSubCallback):
+        with self.__lock:
+            self.__callbacks[channel] = self.__callbacks.get(channel, []) + [callback]
+
+    def unsubscribe(self, channel: str, callback: PubSubCallback):
+        with self.__lock:
+            callbacks = [c for c in self.__callbacks.get(channel, []) if c != callback]
+            if callbacks:
+                self.__callbacks[channel] = callbacks
+            else:
+                self.__callbacks.pop(channel, None)
+
+    def publish(self, channel: str, message: Any):
+        for callback in self.__callbacks.get(channel, []):
+            callback(message)
+
+
+class UnixSocketPubSubBackend(LocalPubSubBackend):
+    """
+    Delivers messages to hubs in all processes on the same host using
+    the same socket `path`, e.g. multiple Uvicorn workers.
+
+    One of the processes, holding a lock on `<path>.lock` file, runs
+    a broker relaying messages between processes. If that process exits
+    another one takes over. Messages must be picklable.
+
+    Broker sends messages to every process in its own thread, through
+    a queue of up to `broker_queue_size` messages. A process which doesn't
+    read messages until its queue is full is disconnected, so it can't
+    stall delivery to others.
+
+    The socket is not authenticated, so `path` must be in a directory
+    accessible to application user only.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        reconnect_delay_seconds: float = 0.5,
+        broker_queue_size: int = DEFAULT_BROKER_QUEUE_SIZE,
+    ):
+        super().__init__()
+        self.__path = path
+        self.__reconnect_delay_seconds = reconnect_delay_seconds
+        self.__broker_queue_size = broker_queue_size
+        self.__sock = None
+        self.__send_lock = threading.Lock()
+        self.__broker_lock_file = None
+        self.__connected = threading.Event()
+        threading.Thread(
+            target=self.__connect_loop, name="flet_pubsub", daemon=True
+        ).start()
+
+    def wait_connected(self, timeout: float = None) -> bool:
+        return self.__connected.wait(timeout)
+
+    def publish(self, channel: str, message: Any):
+        super().publish(channel, message)
+        sock = self.__sock
+        if sock is None:
+            logger.warning("PubSub broker is not connected, message not relayed.")
+            return
+        try:
+            data = pickle.dumps((channel, message))
+        except Exception as e:
+            logger.warning(f"PubSub message can't be relayed to other processes: {e}")
+            return
+        try:
+            with self.__send_lock:
+                sock.sendall(struct.pack(">I", len(data)) + data)
+        except OSError as e:
+            logger.warning(f"Error relaying PubSub message: {e}")
+
+    def __connect_loop(self):
+        while True:
+            try:
+                self.__try_start_broker()
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self.__path)
+                self.__sock = sock
+                self.__connected.set()
+                try:
+                    for data in _read_frames(sock):
+                        self.__deliver(data)
+                finally:
+                    self.__connected.clear()
+                    self.__sock = None
+                    sock.close()
+            except OSError as e:
+                logger.debug(f"PubSub broker connection error: {e}")
+            except Exception as e:
+                logger.error(
+                    f"PubSub broker connection error: {e} {traceback.format_exc()}"
+                )
+            time.sleep(self.__reconnect_delay_seconds)
+
+    def __deliver(self, data: bytes):
+        # a message which can't be delivered must not stop the connection
+        try:
+            channel, message = pickle.loads(data)
+            super().publish(channel, message)
+        except Exception as e:
+            logger.error(
+                f"Error delivering PubSub message: {e} {traceback.format_exc()}"
+            )
+
+    def __try_start_broker(self):
+        if self.__broker_lock_file is not None:
+            return
+        import fcntl
+
+        lock_file = open(f"{self.__path}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            # broker is running in another process
+            lock_file.close()
+            return
+
+        # remove socket left by exited broker
+        if os.path.exists(self.__path):
+            os.unlink(self.__path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.__path)
+        server.listen()
+        self.__broker_lock_file = lock_file
+        broker = _PubSubBroker(server, self.__broker_queue_size, self.__broker_stopped)
+        threading.Thread(
+            target=broker.run, name="flet_pubsub_broker", daemon=True
+        ).start()
+        logger.info(f"Started PubSub broker on {self.__path}")
+
+    def __broker_stopped(self):
+        # release the lock, so this or another process could start a new broker
+        lock_file = self.__broker_lock_file
+        self.__broker_lock_file = None
+        lock_file.close()
+
+
+class _PubSubBroker:
+    def __init__(
+        self,
+        server: socket.socket,
+        queue_size: int,
+        on_stopped: Callable[[], None],
+    ):
+        self.__server = server
+        self.__queue_size = queue_size
+        self.__on_stopped = on_stopped
+        self.__lock = threading.Lock()
+        # copy-on-write, so relaying doesn't hold the lock
+        self.__clients: List[_BrokerClient] = []
+
+    def run(self):
+        try:
+            while True:
+                sock, _ = self.__server.accept()
+                client = _BrokerClient(sock, self.__queue_size)
+                with self.__lock:
+                    self.__clients = self.__clients + [client]
+                threading.Thread(
+                    target=self.__relay,
+                    args=[client],
+                    name="flet_pubsub_broker",
+                    daemon=True,
+                ).start()
+        except Exception as e:
+            logger.error(f"PubSub broker stopped: {e} {traceback.format_exc()}")
+        finally:
+            self.__server.close()
+            # processes reconnect to a new broker
+            for client in self.__clients:
+                client.close()
+            self.__on_stopped()
+
+    def __relay(self, client: "_BrokerClient"):
+        try:
+            for data in _read_frames(client.sock):
+                frame = struct.pack(">I", len(data)) + data
+                for c in self.__clients:
+                    if c is not client:
+                        c.send(frame)
+        except OSError:
+            pass
+        finally:
+            with self.__lock:
+                self.__clients = [c for c in self.__clients if c is not client]
+            client.close()
+
+
+class _BrokerClient:
+    """
+    Connection of a process to the broker with a queue of frames sent to
+    it by a thread of its own.
+    """
+
+    def __init__(self, sock: socket.socket, queue_size: int):
+        self.sock = sock
+        self.__frames = queue.Queue(queue_size)
+        threading.Thread(
+            target=self.__send_loop, name="flet_pubsub_broker", daemon=True
+        ).start()
+
+    def send(self, frame: bytes):
+        try:
+            self.__frames.put_nowait(frame)
+        except queue.Full:
+            logger.warning("PubSub process doesn't read messages, disconnecting it.")
+            self.close()
+
+    def close(self):
+        # wakes up blocked reads and sends, the socket is closed by send loop
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.__frames.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def __send_loop(self):
+        try:
+            while True:
+                frame = self.__frames.get()
+                if frame is None:
+                    return
+                self.sock.sendall(frame)
+        except OSError:
+            self.close()
+        finally:
+            self.sock.close()
+
+
+def _read_frames(sock: socket.socket):
+    while True:
+        header = _read_exactly(sock, 4)
+        if header is None:
+            return
+        data = _read_exactly(sock, struct.unpack(">I", header)[0])
+        if data is None:
+            return
+        yield data
+
+
+def _read_exactly(sock: socket.socket, size: int):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
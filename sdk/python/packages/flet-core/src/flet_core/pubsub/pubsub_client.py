@@ -68,8 +68,8 @@ class PubSubClient:
     async def subscribe_async(self, handler: Callable):
         self.subscribe(handler)
 
-    def subscribe_topic(self, topic: str, handler: Callable):
-        self.__pubsub.subscribe_topic(self.__session_id, topic, handler)
+    def subscribe_topic(self, topic: str, handler: Callable, coalesce: bool = False):
+        self.__pubsub.subscribe_topic(self.__session_id, topic, handler, coalesce)
 
     @deprecated(
         reason="Use subscribe_topic() method instead.",
@@ -1,92 +1,163 @@
 import asyncio
 import logging
 import threading
+import traceback
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 import flet_core
+from flet_core.fair_executor import FairExecutor, TaskPriority
 from flet_core.locks import NopeLock
+from flet_core.pubsub.pubsub_backend import PubSubBackend
+from flet_core.pubsub.topic_trie import TopicTrie
 from flet_core.utils.concurrency_utils import is_pyodide
 
 logger = logging.getLogger(flet_core.__name__)
 
+DEFAULT_MAX_MAILBOX_SIZE = 1000
+
 
 class PubSubHub:
+    """
+    Delivers messages between sessions of the same application.
+
+    If `backend` is set, messages are published through it to hubs with
+    the same `channel`, possibly in other processes, and every hub
+    dispatches them to its own subscribers.
+
+    Topic subscriptions could contain `*` and `#` wildcards, see `TopicTrie`.
+
+    Publishing doesn't hold the lock: it reads copy-on-write snapshots of
+    subscribers and schedules all handlers of a message in one event loop
+    callback.
+
+    Messages to a session are queued in its mailbox of up to
+    `max_mailbox_size` messages and delivered one at a time in FIFO order.
+    If a mailbox is full the oldest message is dropped. A topic subscribed
+    with `coalesce=True` keeps only the latest undelivered message of every
+    matching topic in the mailbox.
+    """
+
     def __init__(
         self,
         loop: Optional[asyncio.AbstractEventLoop] = None,
-        executor: Optional[ThreadPoolExecutor] = None,
+        executor: Optional[Union[ThreadPoolExecutor, FairExecutor]] = None,
+        backend: Optional[PubSubBackend] = None,
+        channel: str = "",
+        max_mailbox_size: Optional[int] = DEFAULT_MAX_MAILBOX_SIZE,
     ):
         logger.debug("Creating new PubSubHub instance")
         self.__loop = loop
         self.__executor = executor
+        self.__max_mailbox_size = max_mailbox_size
+        self.__mailboxes: Dict[str, _Mailbox] = {}  # key: session_id
+        self.__mailboxes_lock = threading.Lock() if not is_pyodide() else NopeLock()
+        self.__dropped_messages = 0
+        self.__backend = backend
+        self.__channel = channel
         self.__lock = threading.Lock() if not is_pyodide() else NopeLock()
         self.__subscribers: Dict[
             str, Union[Callable, Callable[..., Awaitable[Any]]]
         ] = {}  # key: session_id, value: handler
-        self.__topic_subscribers: Dict[
-            str, Dict[str, Union[Callable, Callable[..., Awaitable[Any]]]]
-        ] = {}  # key: topic, value: dict[session_id, handler]
+        self.__subscribers_snapshot: Optional[Tuple] = None
+        self.__topic_subscribers = TopicTrie(self.__lock)
         self.__subscriber_topics: Dict[
             str, Dict[str, Union[Callable, Callable[..., Awaitable[Any]]]]
         ] = {}  # key: session_id, value: dict[topic, handler]
+        if self.__backend:
+            self.__backend.subscribe(self.__channel, self.__dispatch)
+
+    # dropped_messages
+    @property
+    def dropped_messages(self) -> int:
+        """
+        The number of messages dropped from full mailboxes.
+        """
+        return self.__dropped_messages
 
     def send_all(self, message: Any):
         logger.debug(f"pubsub.send_all({message})")
-        with self.__lock:
-            for handler in self.__subscribers.values():
-                self.__send(handler, [message])
+        self.__publish(None, None, message)
 
     def send_all_on_topic(self, topic: str, message: Any):
         logger.debug(f"pubsub.send_all_on_topic({topic}, {message})")
-        with self.__lock:
-            if topic in self.__topic_subscribers:
-                for handler in self.__topic_subscribers[topic].values():
-                    self.__send(handler, [topic, message])
+        self.__publish(None, topic, message)
 
     def send_others(self, except_session_id: str, message: Any):
         logger.debug(f"pubsub.send_others({except_session_id}, {message})")
-        with self.__lock:
-            for session_id, handler in self.__subscribers.items():
-                if except_session_id != session_id:
-                    self.__send(handler, [message])
+        self.__publish(except_session_id, None, message)
 
     def send_others_on_topic(self, except_session_id: str, topic: str, message: Any):
         logger.debug(
             f"pubsub.send_others_on_topic({except_session_id}, {topic}, {message})"
         )
-        with self.__lock:
-            if topic in self.__topic_subscribers:
-                for session_id, handler in self.__topic_subscribers[topic].items():
-                    if except_session_id != session_id:
-                        self.__send(handler, [topic, message])
+        self.__publish(except_session_id, topic, message)
+
+    def close(self):
+        """
+        Stops receiving messages from backend.
+        """
+        if self.__backend:
+            self.__backend.unsubscribe(self.__channel, self.__dispatch)
+
+    def __publish(
+        self, except_session_id: Optional[str], topic: Optional[str], message: Any
+    ):
+        if self.__backend:
+            self.__backend.publish(self.__channel, (except_session_id, topic, message))
+        else:
+            self.__dispatch((except_session_id, topic, message))
+
+    def __dispatch(self, envelope):
+        except_session_id, topic, message = envelope
+        if topic is None:
+            subscribers = self.__subscribers_snapshot
+            if subscribers is None:
+                with self.__lock:
+                    subscribers = self.__subscribers_snapshot = tuple(
+                        (session_id, (handler, False))
+                        for session_id, handler in self.__subscribers.items()
+                    )
+            args = [message]
+        else:
+            subscribers = self.__topic_subscribers.match(topic)
+            args = [topic, message]
+        self.__send(
+            [
+                (session_id, handler, coalesce)
+                for session_id, (handler, coalesce) in subscribers
+                if except_session_id != session_id
+            ],
+            topic,
+            args,
+        )
 
     def subscribe(self, session_id: str, handler: Callable):
         logger.debug(f"pubsub.subscribe({session_id})")
         with self.__lock:
             self.__subscribers[session_id] = handler
+            self.__subscribers_snapshot = None
 
     def subscribe_topic(
         self,
         session_id: str,
         topic: str,
         handler: Union[Callable, Callable[..., Awaitable[Any]]],
+        coalesce: bool = False,
     ):
         logger.debug(f"pubsub.subscribe_topic({session_id}, {topic})")
         with self.__lock:
-            self.__subscribe_topic(session_id, topic, handler)
+            self.__subscribe_topic(session_id, topic, handler, coalesce)
 
     def __subscribe_topic(
         self,
         session_id: str,
         topic: str,
         handler: Union[Callable, Callable[..., Awaitable[Any]]],
+        coalesce: bool,
     ):
-        topic_subscribers = self.__topic_subscribers.get(topic)
-        if topic_subscribers is None:
-            topic_subscribers = {}
-            self.__topic_subscribers[topic] = topic_subscribers
-        topic_subscribers[session_id] = handler
+        self.__topic_subscribers.add(topic, session_id, (handler, coalesce))
         subscriber_topics = self.__subscriber_topics.get(session_id)
         if subscriber_topics is None:
             subscriber_topics = {}
@@ -108,20 +179,17 @@ class PubSubHub:
         with self.__lock:
             self.__unsubscribe(session_id)
             if session_id in self.__subscriber_topics:
-                for topic in self.__subscriber_topics[session_id].keys():
+                for topic in list(self.__subscriber_topics[session_id].keys()):
                     self.__unsubscribe_topic(session_id, topic)
 
     def __unsubscribe(self, session_id: str):
         logger.debug(f"pubsub.__unsubscribe({session_id})")
-        self.__subscribers.pop(session_id, None)
+        if self.__subscribers.pop(session_id, None) is not None:
+            self.__subscribers_snapshot = None
 
     def __unsubscribe_topic(self, session_id: str, topic: str):
         logger.debug(f"pubsub.__unsubscribe_topic({session_id}, {topic})")
-        topic_subscribers = self.__topic_subscribers.get(topic)
-        if topic_subscribers is not None:
-            topic_subscribers.pop(session_id, None)
-            if len(topic_subscribers) == 0:
-                self.__topic_subscribers.pop(topic, None)
+        self.__topic_subscribers.remove(topic, session_id)
         subscriber_topics = self.__subscriber_topics.get(session_id)
         if subscriber_topics is not None:
             subscriber_topics.pop(topic, None)
@@ -129,16 +197,109 @@ class PubSubHub:
                 self.__subscriber_topics.pop(session_id, None)
 
     def __send(
-        self, handler: Union[Callable, Callable[..., Awaitable[Any]]], args: Iterable
+        self,
+        subscribers: List[Tuple[str, Callable, bool]],
+        topic: Optional[str],
+        args: List[Any],
     ):
+        if not subscribers:
+            return
+
         assert self.__loop, "PubSub event loop is not set"
 
-        if asyncio.iscoroutinefunction(handler):
-            asyncio.run_coroutine_threadsafe(handler(*args), self.__loop)
-        else:
-            if self.__executor:
-                self.__loop.call_soon_threadsafe(
-                    self.__loop.run_in_executor, self.__executor, handler, *args
+        inline_handlers = []
+        new_mailboxes = []
+        with self.__mailboxes_lock:
+            for session_id, handler, coalesce in subscribers:
+                if not self.__executor and not asyncio.iscoroutinefunction(handler):
+                    # sync handlers are called in publisher's thread
+                    inline_handlers.append(handler)
+                    continue
+                mailbox = self.__mailboxes.get(session_id)
+                if mailbox is None:
+                    mailbox = self.__mailboxes[session_id] = _Mailbox()
+                    new_mailboxes.append((session_id, mailbox))
+                if not mailbox.put(
+                    handler,
+                    args,
+                    (handler, topic) if coalesce else None,
+                    self.__max_mailbox_size,
+                ):
+                    self.__dropped_messages += 1
+                    if not mailbox.overflowed:
+                        mailbox.overflowed = True
+                        logger.warning(
+                            f"PubSub mailbox of session {session_id} is full, dropping oldest messages."
+                        )
+
+        for handler in inline_handlers:
+            handler(*args)
+
+        # start delivery to all new mailboxes in one event loop callback
+        if new_mailboxes:
+            self.__loop.call_soon_threadsafe(self.__start_delivery, new_mailboxes)
+
+    def __start_delivery(self, mailboxes: List[Tuple[str, "_Mailbox"]]):
+        for session_id, mailbox in mailboxes:
+            self.__loop.create_task(self.__deliver(session_id, mailbox))
+
+    async def __deliver(self, session_id: str, mailbox: "_Mailbox"):
+        while True:
+            with self.__mailboxes_lock:
+                if not mailbox.messages:
+                    # mailbox is re-created on the next message
+                    del self.__mailboxes[session_id]
+                    return
+                handler, args = mailbox.get()
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    await handler(*args)
+                elif isinstance(self.__executor, FairExecutor):
+                    await asyncio.wrap_future(
+                        self.__executor.submit(
+                            session_id, TaskPriority.PUBSUB, handler, *args
+                        )
+                    )
+                else:
+                    await self.__loop.run_in_executor(self.__executor, handler, *args)
+            except Exception as e:
+                logger.error(
+                    f"Error handling PubSub message: {e} {traceback.format_exc()}"
                 )
-            else:
-                handler(*args)
+
+
+class _Mailbox:
+    __slots__ = ["messages", "coalesced", "overflowed"]
+
+    def __init__(self):
+        self.messages = deque()  # items: [handler, args, coalesce_key]
+        self.coalesced = {}  # key: coalesce_key, value: item
+        self.overflowed = False
+
+    def put(self, handler, args, coalesce_key, max_size: Optional[int]) -> bool:
+        """
+        Returns `False` if the oldest message was dropped.
+        """
+        if coalesce_key is not None:
+            item = self.coalesced.get(coalesce_key)
+            if item is not None:
+                # replace undelivered message keeping its place in the queue
+                item[1] = args
+                return True
+        result = True
+        if max_size and len(self.messages) >= max_size:
+            dropped = self.messages.popleft()
+            if dropped[2] is not None:
+                del self.coalesced[dropped[2]]
+            result = False
+        item = [handler, args, coalesce_key]
+        self.messages.append(item)
+        if coalesce_key is not None:
+            self.coalesced[coalesce_key] = item
+        return result
+
+    def get(self):
+        handler, args, coalesce_key = self.messages.popleft()
+        if coalesce_key is not None:
+            del self.coalesced[coalesce_key]
+        return handler, args
@@ -0,0 +1,101 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+TOPIC_SEPARATOR = "/"
+SINGLE_LEVEL_WILDCARD = "*"
+MULTI_LEVEL_WILDCARD = "#"
+
+
+class _TopicNode:
+    __slots__ = ["children", "subscribers", "snapshot"]
+
+    def __init__(self):
+        self.children: Dict[str, "_TopicNode"] = {}
+        self.subscribers: Dict[str, Any] = {}  # key: session_id, value: handler
+        # items of `subscribers` iterated by `match()`, rebuilt on demand
+        self.snapshot: Optional[Tuple[Tuple[str, Any], ...]] = None
+
+
+class TopicTrie:
+    """
+    Index of topic subscriptions split into `/`-separated levels.
+
+    A subscription level could be a wildcard: `*` matches exactly one level
+    and `#`, allowed as the last level only, matches zero or more levels, so
+    both `room/*` and `room/#` match `room/1`, but only `room/#` matches
+    `room` and `room/1/messages`. Matching a topic costs O(depth) for
+    a fixed number of wildcard subscriptions.
+
+    `add()` and `remove()` must be called holding `lock`. `match()` could
+    run concurrently with them; it takes `lock` only to rebuild a snapshot
+    of subscribers of a node changed since the last match.
+    """
+
+    def __init__(self, lock: Optional[Any] = None):
+        self.__root = _TopicNode()
+        self.__lock = lock if lock is not None else threading.Lock()
+
+    def add(self, pattern: str, session_id: str, handler: Any):
+        levels = pattern.split(TOPIC_SEPARATOR)
+        if MULTI_LEVEL_WILDCARD in levels[:-1]:
+            raise ValueError(
+                f"'{MULTI_LEVEL_WILDCARD}' must be the last level of topic: {pattern}"
+            )
+        node = self.__root
+        for level in levels:
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+        node.subscribers[session_id] = handler
+        node.snapshot = None
+
+    def remove(self, pattern: str, session_id: str):
+        path = [self.__root]
+        levels = pattern.split(TOPIC_SEPARATOR)
+        for level in levels:
+            node = path[-1].children.get(level)
+            if node is None:
+                return
+            path.append(node)
+        node = path[-1]
+        if node.subscribers.pop(session_id, None) is not None:
+            node.snapshot = None
+
+        # prune empty nodes
+        for i in range(len(levels), 0, -1):
+            node = path[i]
+            if node.subscribers or node.children:
+                break
+            del path[i - 1].children[levels[i - 1]]
+
+    def match(self, topic: str) -> List[Tuple[str, Any]]:
+        """
+        Returns `(session_id, handler)` of every subscription matching `topic`.
+        """
+        result = []
+        levels = topic.split(TOPIC_SEPARATOR)
+        depth = len(levels)
+        stack = [(self.__root, 0)]
+        while stack:
+            node, i = stack.pop()
+            multi = node.children.get(MULTI_LEVEL_WILDCARD)
+            if multi is not None:
+                result.extend(self.__get_subscribers(multi))
+            if i == depth:
+                result.extend(self.__get_subscribers(node))
+                continue
+            child = node.children.get(levels[i])
+            if child is not None:
+                stack.append((child, i + 1))
+            single = node.children.get(SINGLE_LEVEL_WILDCARD)
+            if single is not None and single is not child:
+                stack.append((single, i + 1))
+        return result
+
+    def __get_subscribers(self, node: _TopicNode) -> Tuple[Tuple[str, Any], ...]:
+        snapshot = node.snapshot
+        if snapshot is None:
+            with self.__lock:
+                snapshot = node.snapshot = tuple(node.subscribers.items())
+        return snapshot
@@ -0,0 +1,249 @@
+import asyncio
+import threading
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, List, Optional, Union
+
+from flet_core.protocol import (
+    ClientActions,
+    ClientMessage,
+    EncodedControlMessages,
+    coalesce_client_messages,
+    is_control_message,
+)
+
+QueuedMessage = Union[ClientMessage, EncodedControlMessages, str, bytes]
+
+
+class SendQueuePolicy(Enum):
+    BLOCK = "block"
+    COALESCE = "coalesce"
+    DROP = "drop"
+
+
+class SendQueue:
+    """
+    Queue of messages to send to a client.
+
+    Messages are put from any thread and taken by a send loop running in
+    `loop`. If `max_size` is set and the queue is full `policy` decides what
+    happens to a new message:
+
+    * `BLOCK` - producer thread waits in `wait_not_full()` until the send loop
+      takes queued messages.
+    * `COALESCE` - queued `updateControlProps` messages are merged per control
+      first; producer waits in `wait_not_full()` if the queue is still full.
+      Merged messages are encoded with `encode` if specified. It's called on
+      the producer thread without the queue locked.
+    * `DROP` - queued control messages are dropped and replaced with a message
+      returned by `resync` which brings the client up to date. `resync` is
+      called with the queue locked and must not put messages.
+
+    `put()` itself never waits, so producers could put messages while holding
+    locks, e.g. page locks, the event loop could also need, and wait for
+    the queue after releasing them. The queue could grow beyond `max_size`
+    by messages put before the producer waits, and for producers running in
+    `loop` itself, which never wait as that would block the send loop.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_size: Optional[int] = None,
+        policy: SendQueuePolicy = SendQueuePolicy.BLOCK,
+        resync: Optional[Callable[[], QueuedMessage]] = None,
+        encode: Optional[Callable[[ClientMessage], QueuedMessage]] = None,
+    ):
+        if policy == SendQueuePolicy.DROP and resync is None:
+            raise ValueError("resync must be specified for DROP policy")
+        self.__loop = loop
+        self.__max_size = max_size
+        self.__policy = policy
+        self.__resync = resync
+        self.__encode = encode
+        self.__messages: Deque[QueuedMessage] = deque()
+        self.__depth = 0
+        self.__peak_depth = 0
+        self.__dropped = 0
+        self.__closed = False
+        self.__coalescing = False
+        self.__lock = threading.Lock()
+        self.__not_full = threading.Condition(self.__lock)
+        self.__waiter: Optional[asyncio.Future] = None
+
+    # depth
+    @property
+    def depth(self) -> int:
+        """
+        Number of queued control messages.
+        """
+        return self.__depth
+
+    # peak_depth
+    @property
+    def peak_depth(self) -> int:
+        return self.__peak_depth
+
+    # dropped
+    @property
+    def dropped(self) -> int:
+        """
+        Number of control messages dropped by `DROP` policy.
+        """
+        return self.__dropped
+
+    def put(self, message: QueuedMessage):
+        with self.__lock:
+            if self.__closed:
+                return
+            if (
+                not self.__is_full()
+                or not is_control_message(message)
+                or self.__policy == SendQueuePolicy.BLOCK
+                or self.__coalescing
+            ):
+                self.__append(message)
+                return
+            if self.__policy == SendQueuePolicy.DROP:
+                self.__drop()
+                return
+            # queued messages are coalesced without the queue locked, so that
+            # the send loop isn't blocked while they are encoded; meanwhile
+            # it doesn't take messages put later by other producers
+            queued = list(self.__messages)
+            self.__messages.clear()
+            self.__depth = 0
+            self.__coalescing = True
+        coalesced = queued
+        try:
+            coalesced = self.__coalesce(queued)
+        finally:
+            with self.__lock:
+                self.__coalescing = False
+                if not self.__closed:
+                    self.__put_front(coalesced + [message])
+
+    def wait_not_full(self):
+        """
+        Blocks a producer thread while the queue is full.
+
+        Must be called without holding locks the event loop could wait for,
+        as the loop could then never take messages from the queue.
+        """
+        if self.__policy == SendQueuePolicy.DROP or self.__in_loop():
+            return
+        with self.__lock:
+            while self.__is_full() and not self.__closed:
+                self.__not_full.wait()
+
+    def put_back(self, messages: List[QueuedMessage]):
+        with self.__lock:
+            self.__put_front(messages)
+
+    async def get_all(self) -> List[QueuedMessage]:
+        """
+        Waits for messages and takes all of them from the queue.
+        """
+        while True:
+            with self.__lock:
+                if self.__messages and not self.__coalescing:
+                    return self.__take_all()
+                waiter = self.__waiter = self.__loop.create_future()
+            await waiter
+
+    def get_all_nowait(self) -> List[QueuedMessage]:
+        with self.__lock:
+            return self.__take_all() if not self.__coalescing else []
+
+    def close(self):
+        """
+        Discards queued messages and releases waiting producers.
+        """
+        with self.__lock:
+            self.__closed = True
+            self.__messages.clear()
+            self.__depth = 0
+            self.__not_full.notify_all()
+
+    def __take_all(self):
+        messages = list(self.__messages)
+        self.__messages.clear()
+        self.__depth = 0
+        self.__not_full.notify_all()
+        return messages
+
+    def __is_full(self):
+        return self.__max_size is not None and self.__depth >= self.__max_size
+
+    def __in_loop(self):
+        try:
+            return asyncio.get_running_loop() is self.__loop
+        except RuntimeError:
+            return False
+
+    def __put_front(self, messages: List[QueuedMessage]):
+        for message in reversed(messages):
+            self.__messages.appendleft(message)
+            self.__depth += _message_size(message)
+        self.__peak_depth = max(self.__peak_depth, self.__depth)
+        self.__notify_waiter()
+
+    def __append(self, message: QueuedMessage):
+        self.__messages.append(message)
+        self.__depth += _message_size(message)
+        self.__peak_depth = max(self.__peak_depth, self.__depth)
+        self.__notify_waiter()
+
+    def __notify_waiter(self):
+        waiter = self.__waiter
+        if waiter is not None:
+            self.__waiter = None
+            if self.__in_loop():
+                _wake(waiter)
+            else:
+                self.__loop.call_soon_threadsafe(_wake, waiter)
+
+    def __coalesce(self, messages: List[QueuedMessage]) -> List[QueuedMessage]:
+        messages = coalesce_client_messages(
+            [
+                ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, m.messages)
+                if isinstance(m, EncodedControlMessages)
+                else m
+                for m in messages
+            ]
+        )
+        if self.__encode is None:
+            return messages
+        return [self.__encode(m) if is_control_message(m) else m for m in messages]
+
+    def __drop(self):
+        # control messages and encoded frames are dropped, other messages,
+        # e.g. method calls a page could be waiting results for, are kept
+        kept = []
+        for message in self.__messages:
+            if is_control_message(message):
+                self.__dropped += _message_size(message)
+            elif isinstance(message, ClientMessage):
+                kept.append(message)
+        self.__dropped += 1
+        self.__messages.clear()
+        self.__depth = 0
+        self.__append(self.__resync())
+        for message in kept:
+            self.__append(message)
+
+
+def _message_size(message: QueuedMessage) -> int:
+    if isinstance(message, EncodedControlMessages):
+        return len(message)
+    if (
+        isinstance(message, ClientMessage)
+        and message.action == ClientActions.PAGE_CONTROLS_BATCH
+    ):
+        return len(message.payload)
+    return 1
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
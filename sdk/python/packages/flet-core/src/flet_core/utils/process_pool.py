@@ -0,0 +1,45 @@
+import sys
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+_lock = threading.Lock()
+_executor: Optional["ProcessPoolExecutor"] = None
+
+
+def get_process_executor() -> "ProcessPoolExecutor":
+    """
+    Returns process pool shared by all sessions, creating it on first call.
+
+    Worker processes are started with "spawn" method, as forking a process
+    running event loop and thread pools is not safe.
+    """
+    # imported on demand as processes are not available in Pyodide
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def shutdown_process_executor(wait: bool = True):
+    """
+    Shuts down shared process pool, cancelling jobs not started yet on
+    Python 3.9+.
+    """
+    global _executor
+    with _lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        if sys.version_info >= (3, 9):
+            executor.shutdown(wait=wait, cancel_futures=True)
+        else:
+            executor.shutdown(wait=wait)
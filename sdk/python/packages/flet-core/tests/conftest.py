@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from typing import List
+
+import pytest
+from flet_core.local_connection import LocalConnection
+from flet_core.page import Page
+from flet_core.protocol import (
+    Command,
+    PageCommandResponsePayload,
+    PageCommandsBatchResponsePayload,
+)
+
+
+class _Connection(LocalConnection):
+    """
+    Processes commands and maintains page snapshot like web connection
+    does, recording sent batches of commands.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.page = None
+        self.batches: List[List[Command]] = []
+        self.sending = threading.Lock()
+
+    def send_command(self, session_id: str, command: Command):
+        # sends must be serialized by page
+        assert self.sending.acquire(blocking=False), "concurrent send"
+        try:
+            result, _ = self._process_command(command)
+            return PageCommandResponsePayload(result=result, error="")
+        finally:
+            self.sending.release()
+
+    def send_commands(self, session_id: str, commands: List[Command]):
+        assert self.sending.acquire(blocking=False), "concurrent send"
+        try:
+            results = []
+            for command in commands:
+                result, _ = self._process_command(command)
+                if command.name in ["add", "get"]:
+                    results.append(result)
+            self.batches.append(commands)
+            return PageCommandsBatchResponsePayload(results=results, error="")
+        finally:
+            self.sending.release()
+
+    def _process_add_command(self, command: Command):
+        result, message = super()._process_add_command(command)
+        self.page.snapshot.add_controls(message.payload.controls)
+        return result, message
+
+    def _process_set_command(self, values, attrs):
+        result, message = super()._process_set_command(values, attrs)
+        self.page.snapshot.set_props(values[0], attrs)
+        return result, message
+
+    def _process_remove_command(self, values):
+        result, message = super()._process_remove_command(values)
+        self.page.snapshot.remove_controls(values)
+        return result, message
+
+    def _process_clean_command(self, values):
+        result, message = super()._process_clean_command(values)
+        self.page.snapshot.clean_controls(values)
+        return result, message
+
+
+@pytest.fixture
+def page():
+    """
+    Page of a session with event loop running in its own thread.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    conn = _Connection()
+    page = Page(conn, "s1", loop=loop)
+    conn.page = page
+    page.snapshot["page"] = {"i": "page", "t": "page", "p": "", "c": []}
+    yield page
+    page._close()
+    asyncio.run_coroutine_threadsafe(_drain(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+async def _drain():
+    # let cancelled tasks finish before the loop is closed
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,56 @@
+import flet_core as ft
+
+
+def test_attr_names_are_case_insensitive():
+    c = ft.Container()
+    c._set_attr("someAttr", "value")
+    assert c._get_attr("someattr") == "value"
+    assert c._get_attr("SomeAttr") == "value"
+    assert c._build_add_commands()[0].attrs == {"someattr": "value"}
+
+
+def test_client_values_are_typed():
+    tf = ft.TextField()
+    for name, value in {
+        "value": "abc",
+        "password": "true",
+        "opacity": "1",
+        "tooltip": "0.5",
+    }.items():
+        tf._set_attr(name, value, dirty=False)
+
+    for _ in range(2):
+        assert tf.value == "abc"
+        assert tf.password is True
+        assert tf.opacity == 1.0
+
+    # parsed values are not sent back to client
+    assert tf._build_command(update=True).attrs == {}
+
+    dest = {}
+    tf.copy_attrs(dest)
+    assert dest == {
+        "value": "abc",
+        "password": "true",
+        "opacity": "1",
+        "tooltip": "0.5",
+    }
+
+    nb = ft.NavigationBar()
+    nb._set_attr("selectedIndex", "2", dirty=False)
+    assert nb.selected_index == 2
+    assert nb.selected_index == 2
+
+
+def test_client_attr_names_are_not_cached():
+    from flet_core.control import _attr_bits, _attr_names
+
+    c = ft.Container()
+    c._set_attr("clientOnlyAttr", "1")
+    c._set_attr("clientOnlyAttr", "2", dirty=False)
+    c._set_attr("anotherClientAttr", "3", dirty=False)
+    assert c._get_attr("anotherclientattr") == "3"
+    assert "anotherClientAttr" not in _attr_names
+    assert "anotherclientattr" not in _attr_bits
+    # client change of a dirty attribute isn't sent back
+    assert c._build_command(update=True).attrs == {}
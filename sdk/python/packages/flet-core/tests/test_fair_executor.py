@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flet_core.fair_executor import FairExecutor, TaskPriority
+
+
+@pytest.fixture
+def pool():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown()
+
+
+def _block(fe: FairExecutor, session_id="blocker"):
+    # occupy the only worker until released
+    started = threading.Event()
+    release = threading.Event()
+
+    def job():
+        started.set()
+        release.wait(5)
+
+    future = fe.submit(session_id, TaskPriority.UI, job)
+    assert started.wait(5)
+    return release, future
+
+
+def test_sessions_take_turns_and_ui_goes_first(pool):
+    fe = FairExecutor(pool, max_workers=1)
+    release, blocker = _block(fe)
+
+    order = []
+    futures = []
+    for session_id in ["a", "b"]:
+        for i in range(3):
+            futures.append(
+                fe.submit(
+                    session_id,
+                    TaskPriority.BACKGROUND,
+                    order.append,
+                    f"{session_id}{i}",
+                )
+            )
+    futures.append(fe.submit("c", TaskPriority.PUBSUB, order.append, "c-pubsub"))
+    futures.append(fe.submit("b", TaskPriority.UI, order.append, "b-ui"))
+
+    assert fe.queued == 8
+    assert fe.running == 1
+    assert fe.get_queued(session_id="b") == 4
+    assert fe.get_queued(priority=TaskPriority.BACKGROUND) == 6
+
+    release.set()
+    for f in [blocker] + futures:
+        f.result(5)
+    assert order == ["b-ui", "c-pubsub", "a0", "b0", "a1", "b1", "a2", "b2"]
+    assert fe.queued == 0
+    assert fe.running == 0
+
+
+def test_max_workers_per_session(pool):
+    fe = FairExecutor(pool, max_workers=2, max_workers_per_session=1)
+    release, blocker = _block(fe, "a")
+
+    # the second job of session "a" waits while other session runs
+    a2 = fe.submit("a", TaskPriority.UI, lambda: "a2")
+    b1 = fe.submit("b", TaskPriority.UI, lambda: "b1")
+    assert b1.result(5) == "b1"
+    assert not a2.done()
+    assert fe.get_running("a") == 1
+
+    release.set()
+    assert a2.result(5) == "a2"
+    blocker.result(5)
+
+
+def test_exception_and_cancellation(pool):
+    fe = FairExecutor(pool, max_workers=1)
+    release, blocker = _block(fe)
+
+    def fail():
+        raise ValueError("error")
+
+    failed = fe.submit("a", TaskPriority.UI, fail)
+    cancelled = fe.submit("a", TaskPriority.UI, lambda: "never")
+    assert cancelled.cancel()
+    ok = fe.submit("a", TaskPriority.UI, lambda x: x * 2, 21)
+
+    release.set()
+    with pytest.raises(ValueError):
+        failed.result(5)
+    assert ok.result(5) == 42
+    assert fe.running == 0
@@ -0,0 +1,57 @@
+import json
+
+from flet_core.local_connection import LocalConnection
+from flet_core.protocol import (
+    ClientActions,
+    ClientMessage,
+    RegisterWebClientRequestPayload,
+)
+
+
+def _connection():
+    conn = LocalConnection()
+    conn._client_details = RegisterWebClientRequestPayload(
+        pageName="",
+        pageRoute="/",
+        pageWidth="",
+        pageHeight="",
+        windowWidth="",
+        windowHeight="",
+        windowTop="",
+        windowLeft="",
+        isPWA="",
+        isWeb="",
+        isDebug="",
+        platform="",
+        platformBrightness="",
+        media="",
+        sessionId="s1",
+    )
+    return conn
+
+
+def _update(*props):
+    return ClientMessage(ClientActions.UPDATE_CONTROL_PROPS, {"props": list(props)})
+
+
+def test_merge_update_control_props():
+    conn = _connection()
+    assert conn._pop_update_control_props_handler_arg() is None
+
+    assert conn._merge_update_control_props(_update({"i": "_1", "value": "a"}))
+    assert not conn._merge_update_control_props(
+        _update({"i": "_2", "value": "1"}, {"i": "_1", "value": "ab"})
+    )
+    assert not conn._merge_update_control_props(
+        _update({"i": "_1", "value": "abc", "selection": "3"})
+    )
+
+    e = conn._pop_update_control_props_handler_arg()
+    assert e.eventTarget == "page"
+    assert e.eventName == "change"
+    assert json.loads(e.eventData) == [
+        {"i": "_1", "value": "abc", "selection": "3"},
+        {"i": "_2", "value": "1"},
+    ]
+    assert conn._pop_update_control_props_handler_arg() is None
+    assert conn._merge_update_control_props(_update({"i": "_1", "value": "x"}))
@@ -1,6 +1,7 @@
 import random
 
 import flet_core as ft
+from flet_core.control import _PendingAdds
 
 
 def test_moving_children():
@@ -42,3 +43,94 @@ def test_moving_children():
 
     for i in range(0, 20):
         replace_controls(c)
+
+
+def test_reconciled_children_order():
+    c = ft.Stack()
+    c._Control__uid = "0"
+    for i in range(0, 50):
+        c.controls.append(ft.Container())
+        c.controls[i]._Control__uid = f"_{i}"
+
+    index = []
+    commands = []
+    c.build_update_commands(index, commands, [], [], False)
+    client_ids = [ctrl._Control__uid for ctrl in c.controls]
+
+    new_id = 100
+    for _ in range(0, 20):
+        # shuffle, delete and insert controls
+        random.shuffle(c.controls)
+        del c.controls[random.randint(0, len(c.controls) - 1)]
+        for _ in range(0, 2):
+            ctrl = ft.Container()
+            ctrl._Control__uid = f"_{new_id}"
+            new_id += 1
+            c.controls.insert(random.randint(0, len(c.controls)), ctrl)
+
+        commands.clear()
+        c.build_update_commands(index, commands, [], [], False)
+
+        # apply commands as a client would do
+        for cmd in commands:
+            if cmd.name == "add":
+                client_ids.insert(int(cmd.attrs["at"]), cmd.commands[0].attrs["id"])
+            elif cmd.name == "remove":
+                for v in cmd.values:
+                    client_ids.remove(v)
+        assert client_ids == [ctrl._Control__uid for ctrl in c.controls]
+
+
+def test_moving_children_between_parents():
+    r = ft.Row(controls=[ft.Column(), ft.Column()])
+    r._Control__uid = "r"
+    col1, col2 = r.controls
+    col1._Control__uid = "c1"
+    col2._Control__uid = "c2"
+    for i in range(0, 10):
+        col2.controls.append(ft.Text())
+        col2.controls[i]._Control__uid = f"_{i}"
+
+    index = []
+    commands = []
+    r.build_update_commands(index, commands, [], [], False)
+
+    # move from the last column to the first one
+    col1.controls.extend(col2.controls[:5])
+    del col2.controls[:5]
+
+    commands.clear()
+    r.build_update_commands(index, commands, [], [], False)
+
+    removed = set()
+    for cmd in commands:
+        if cmd.name == "remove":
+            removed.update(cmd.values)
+        elif cmd.name == "add":
+            for sub_cmd in cmd.commands:
+                assert sub_cmd.attrs["id"] in removed
+    assert removed == set(f"_{i}" for i in range(0, 5))
+
+
+def test_move_between_controls_updated_together():
+    a = ft.Column([ft.Text("x")])
+    b = ft.Column()
+    a._Control__uid = "a"
+    b._Control__uid = "b"
+    a.controls[0]._Control__uid = "x"
+    index = {"page": None, "x": a.controls[0]}
+    for c in [a, b]:
+        c.build_update_commands(index, [], [], [], False)
+
+    # control is added to "b" before it's removed from "a"
+    b.controls.append(a.controls.pop())
+    commands = []
+    pending_adds = _PendingAdds(commands)
+    for c in [b, a]:
+        c.build_update_commands(
+            index, commands, [], [], False, pending_adds=pending_adds
+        )
+    pending_adds.insert_removes(commands)
+
+    assert [cmd.name for cmd in commands] == ["remove", "add"]
+    assert commands[0].values == ["x"]
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import flet_core as ft
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def texts(page):
+    page.add(*[ft.Text(f"{i}") for i in range(3)])
+    page.connection.batches.clear()
+
+
+def _set_values(page, value):
+    for c in page.controls:
+        c.value = value
+        c.update()
+
+
+def test_batch_sends_single_message(page):
+    with page.batch():
+        _set_values(page, "a")
+        with page.batch():
+            page.controls[0].value = "b"
+            page.controls[0].update()
+        assert page.connection.batches == []
+
+    assert len(page.connection.batches) == 1
+    assert [(c.name, c.attrs) for c in page.connection.batches[0]] == [
+        ("set", {"value": "b"}),
+        ("set", {"value": "a"}),
+        ("set", {"value": "a"}),
+    ]
+    assert page.coalesced_updates == 3
+
+
+def test_update_on_next_tick(page):
+    page.update_on_next_tick = True
+
+    async def set_values():
+        # updated in a single event loop iteration
+        _set_values(page, "a")
+        return len(page.connection.batches)
+
+    assert asyncio.run_coroutine_threadsafe(set_values(), page.loop).result(5) == 0
+
+    # flushed by a worker thread on the next loop iteration
+    for _ in range(100):
+        if page.connection.batches:
+            break
+        time.sleep(0.01)
+    assert len(page.connection.batches) == 1
+    assert page.coalesced_updates == 2
+
+    page.update_on_next_tick = False
+    _set_values(page, "b")
+    assert len(page.connection.batches) == 4
+
+
+def test_deferred_update_skips_removed_controls(page):
+    removed = page.controls[0]
+    removed_uid = removed.uid
+    with page.batch():
+        _set_values(page, "a")
+        page.remove_at(0)
+        removed.value = "b"
+    assert removed_uid not in page.index
+    assert [
+        c.values
+        for b in page.connection.batches
+        for c in b
+        if c.name == "set" and c.attrs.get("value") == "b"
+    ] == []
+
+
+def test_batches_are_flushed_separately(page):
+    entered = threading.Event()
+    exit = threading.Event()
+
+    def other_batch():
+        with page.batch():
+            page.controls[0].value = "a"
+            page.controls[0].update()
+            entered.set()
+            exit.wait(5)
+
+    t = threading.Thread(target=other_batch)
+    t.start()
+    assert entered.wait(5)
+    with page.batch():
+        page.controls[1].value = "b"
+        page.controls[1].update()
+
+    # block still open in other thread isn't flushed
+    assert [[(c.values, c.attrs) for c in b] for b in page.connection.batches] == [
+        [([page.controls[1].uid], {"value": "b"})]
+    ]
+
+    exit.set()
+    t.join()
+    assert len(page.connection.batches) == 2
+    assert [(c.values, c.attrs) for c in page.connection.batches[1]] == [
+        ([page.controls[0].uid], {"value": "a"})
+    ]
@@ -0,0 +1,184 @@
+import asyncio
+import sys
+import threading
+
+import flet_core as ft
+from flet_core.event import Event
+from flet_core.locks import SubtreeLock
+from flet_core.page import Page
+
+PRODUCERS = 8
+ITERATIONS = 100
+
+
+def _assert_snapshot_matches(page: Page):
+    def visit(control):
+        snapshot_control = page.snapshot[control.uid]
+        children = control._get_children()
+        assert snapshot_control["c"] == [c.uid for c in children]
+        for c in children:
+            visit(c)
+
+    visit(page)
+
+
+def test_concurrent_subtree_updates(page):
+    columns = [ft.Column() for _ in range(PRODUCERS)]
+    page.add(*columns)
+
+    errors = []
+
+    def produce(column: ft.Column, n: int):
+        try:
+            for i in range(ITERATIONS):
+                column.controls.append(ft.Text(f"{n}-{i}"))
+                if len(column.controls) > 10:
+                    column.controls.pop(0)
+                column.controls[0].value = f"first {i}"
+                column.update()
+                if i % 25 == 0:
+                    column.clean()
+        except Exception as e:
+            errors.append(e)
+
+    def handle_changes():
+        try:
+            for i in range(ITERATIONS):
+                page.update()
+                asyncio.run(
+                    page.on_event_async(
+                        Event("page", "change", '[{"i":"page","route":"/x"}]')
+                    )
+                )
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=produce, args=[column, n])
+        for n, column in enumerate(columns)
+    ]
+    threads.append(threading.Thread(target=handle_changes))
+    # switch threads often to provoke races
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert errors == []
+    page.update()
+    _assert_snapshot_matches(page)
+    assert all(len(page.snapshot[c.uid]["c"]) <= 10 for c in columns)
+
+
+def _acquired_while_locked(lock: SubtreeLock, locked, control) -> bool:
+    entered = threading.Event()
+    released = threading.Event()
+
+    def hold():
+        with lock.acquire([locked]):
+            entered.set()
+            released.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    assert entered.wait(5)
+
+    acquired = threading.Event()
+
+    def acquire():
+        with lock.acquire([control]):
+            acquired.set()
+
+    t = threading.Thread(target=acquire)
+    t.start()
+    result = acquired.wait(0.05)
+    released.set()
+    holder.join()
+    t.join()
+    assert acquired.is_set()
+    return result
+
+
+def test_subtree_lock():
+    lock = SubtreeLock()
+    column1 = ft.Column([ft.Text()])
+    column2 = ft.Column([ft.Text()])
+    row = ft.Row([column1, column2])
+    for c in [column1, column2]:
+        c.parent = row
+        c.controls[0].parent = c
+
+    # disjoint subtree is not blocked
+    assert _acquired_while_locked(lock, column1, column2.controls[0])
+    # the same control, ancestors and descendants are blocked
+    assert not _acquired_while_locked(lock, column1, column1)
+    assert not _acquired_while_locked(lock, column1, row)
+    assert not _acquired_while_locked(lock, column1, column1.controls[0])
+
+    assert lock.try_acquire([column2])
+    assert not lock.try_acquire([row])
+    lock.release([column2])
+    assert lock.try_acquire([row])
+    lock.release([row])
+
+
+def test_change_event_does_not_block_event_loop(page):
+    loop = page.loop
+    text = ft.TextField()
+    page.add(text)
+    with page._Page__subtree_lock.acquire([text]):
+        changes = [
+            asyncio.run_coroutine_threadsafe(
+                page.on_event_async(
+                    Event("page", "change", f'[{{"i":"{text.uid}","value":"{v}"}}]')
+                ),
+                loop,
+            )
+            for v in ["a", "b"]
+        ]
+        # event loop is not waiting for the lock
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(1)
+        assert text.value == ""
+    for change in changes:
+        change.result(5)
+    # changes are applied in order
+    assert text.value == "b"
+
+
+def test_control_event_sees_deferred_changes(page):
+    seen = []
+    handled = threading.Event()
+
+    async def on_click_async(e):
+        seen.append(tf.value)
+
+    def on_click(e):
+        seen.append(tf.value)
+        handled.set()
+
+    tf = ft.TextField(value="old")
+    async_button = ft.ElevatedButton(on_click=on_click_async)
+    button = ft.ElevatedButton(on_click=on_click)
+    page.add(tf, async_button, button)
+
+    def send(e: Event):
+        return asyncio.run_coroutine_threadsafe(page.on_event_async(e), page.loop)
+
+    # page is being updated by another thread
+    with page._Page__subtree_lock.acquire([page]):
+        events = [
+            send(Event("page", "change", f'[{{"i":"{tf.uid}","value":"new"}}]')),
+            send(Event(async_button.uid, "click", "")),
+            send(Event(button.uid, "click", "")),
+        ]
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), page.loop).result(1)
+        assert seen == []
+    for e in events:
+        e.result(5)
+    assert handled.wait(5)
+    assert seen == ["new", "new"]
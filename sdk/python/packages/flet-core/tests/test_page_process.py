@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+import pytest
+from flet_core.utils.process_pool import shutdown_process_executor
+
+
+@pytest.fixture(autouse=True)
+def process_executor():
+    yield
+    shutdown_process_executor(wait=False)
+
+
+def _run(page, coro):
+    return asyncio.run_coroutine_threadsafe(coro, page.loop).result(10)
+
+
+def test_run_process(page):
+    assert _run(page, page.run_process(pow, 2, 10)) == 1024
+
+
+def test_run_process_error(page):
+    with pytest.raises(ZeroDivisionError):
+        _run(page, page.run_process(divmod, 1, 0))
+
+
+def test_run_process_cancelled_on_close(page):
+    async def main():
+        task = asyncio.create_task(page.run_process(time.sleep, 2))
+        await asyncio.sleep(0)
+        page._close()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.perf_counter()
+    _run(page, main())
+    assert time.perf_counter() - start < 1
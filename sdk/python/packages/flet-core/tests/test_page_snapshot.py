@@ -0,0 +1,73 @@
+import flet_core as ft
+from flet_core.local_connection import LocalConnection
+from flet_core.page_snapshot import PageSnapshot
+from flet_core.protocol import Command
+
+
+def _add_message(control, to="page", at=None):
+    attrs = {"to": to}
+    if at is not None:
+        attrs["at"] = str(at)
+    _, message = LocalConnection()._process_add_command(
+        Command(0, "add", attrs=attrs, commands=control._build_add_commands())
+    )
+    return message
+
+
+def _snapshot():
+    snapshot = PageSnapshot()
+    snapshot["page"] = {"i": "page", "t": "page", "p": "", "c": []}
+    return snapshot
+
+
+def test_add_controls():
+    snapshot = _snapshot()
+    message = _add_message(ft.Column([ft.Text("a"), ft.Text("b")]))
+    snapshot.add_controls(message.payload.controls)
+    assert snapshot["page"]["c"] == ["_1"]
+    assert snapshot["_1"]["c"] == ["_2", "_3"]
+    assert snapshot["_2"]["value"] == "a"
+
+    # snapshot doesn't share controls with the message
+    snapshot["_1"]["c"].append("_4")
+    snapshot.set_props("_2", {"value": "c"})
+    assert message.payload.controls[0]["c"] == ["_2", "_3"]
+    assert message.payload.controls[1]["value"] == "a"
+
+    message = _add_message(ft.Text("d"), to="_1", at=0)
+    message.payload.controls[0]["i"] = "_5"
+    snapshot.add_controls(message.payload.controls)
+    assert snapshot["_1"]["c"] == ["_5", "_2", "_3", "_4"]
+
+
+def test_remove_and_clean_controls():
+    snapshot = _snapshot()
+    snapshot.add_controls(
+        _add_message(
+            ft.Column([ft.Row([ft.Text("a"), ft.Text("b")]), ft.Text("c")])
+        ).payload.controls
+    )
+    assert set(snapshot) == {"page", "_1", "_2", "_3", "_4", "_5"}
+
+    snapshot.clean_controls(["_2"])
+    assert set(snapshot) == {"page", "_1", "_2", "_5"}
+    assert snapshot["_2"]["c"] == []
+
+    snapshot.remove_controls(["_1"])
+    assert set(snapshot) == {"page"}
+    assert snapshot["page"]["c"] == []
+
+
+def test_remove_siblings():
+    snapshot = _snapshot()
+    snapshot.add_controls(
+        _add_message(
+            ft.Column([ft.Row([ft.Text(str(i))]) for i in range(5)])
+        ).payload.controls
+    )
+    # _1 column, _2.._11 rows with texts
+    assert snapshot["_1"]["c"] == ["_2", "_4", "_6", "_8", "_10"]
+
+    snapshot.remove_controls(["_8", "_2", "_6"])
+    assert snapshot["_1"]["c"] == ["_4", "_10"]
+    assert set(snapshot) == {"page", "_1", "_4", "_5", "_10", "_11"}
@@ -0,0 +1,232 @@
+import json
+import zlib
+
+import flet_core.protocol
+import pytest
+from flet_core.protocol import (
+    AddPageControlsPayload,
+    ClientActions,
+    ClientMessage,
+    Command,
+    CommandEncoder,
+    EncodedControlMessages,
+    Message,
+    MessageCompressions,
+    MessageEncodings,
+    PageCommandsBatchRequestPayload,
+    RemoveControlPayload,
+    SessionCrashedPayload,
+    UpdateControlPropsPayload,
+    batch_client_messages,
+    batch_encoded_messages,
+    compress_message,
+    encode_message,
+    negotiate_compression,
+    negotiate_encoding,
+)
+
+
+def _encode_with_command_encoder(message):
+    return json.dumps(message, cls=CommandEncoder, separators=(",", ":"))
+
+
+def test_encode_client_message():
+    message = ClientMessage(
+        ClientActions.PAGE_CONTROLS_BATCH,
+        [
+            ClientMessage(
+                ClientActions.ADD_PAGE_CONTROLS,
+                AddPageControlsPayload(
+                    controls=[{"t": "text", "i": "_1", "p": "page", "c": []}]
+                ),
+            ),
+            ClientMessage(
+                ClientActions.UPDATE_CONTROL_PROPS,
+                UpdateControlPropsPayload(props=[{"i": "_1", "value": "a"}]),
+            ),
+        ],
+    )
+    assert encode_message(message) == _encode_with_command_encoder(message)
+
+
+def test_encode_commands():
+    message = Message(
+        "1",
+        "pageCommandsBatchFromHost",
+        PageCommandsBatchRequestPayload(
+            pageName="page",
+            sessionID="1",
+            commands=[
+                Command(
+                    0,
+                    "add",
+                    ["column"],
+                    {"to": "page"},
+                    commands=[Command(1, None, ["text"], {"value": "a"})],
+                ),
+                Command(0, "clean", ["_1"]),
+            ],
+        ),
+    )
+    assert encode_message(message) == _encode_with_command_encoder(message)
+
+
+def test_encode_unknown_payload():
+    class CustomPayload:
+        def __init__(self):
+            self.value = 1
+
+    message = ClientMessage("custom", CustomPayload())
+    assert encode_message(message) == '{"action":"custom","payload":{"value":1}}'
+
+
+def test_negotiate_encoding(monkeypatch):
+    assert negotiate_encoding(None) == MessageEncodings.JSON
+    assert negotiate_encoding(["cbor"]) == MessageEncodings.JSON
+    assert negotiate_encoding(["json", "msgpack"]) == MessageEncodings.JSON
+
+    monkeypatch.setattr(flet_core.protocol, "msgpack", object())
+    assert negotiate_encoding(["cbor", "msgpack", "json"]) == MessageEncodings.MSGPACK
+
+    # msgpack package is not installed
+    monkeypatch.setattr(flet_core.protocol, "msgpack", None)
+    assert negotiate_encoding(["msgpack", "json"]) == MessageEncodings.JSON
+
+
+def test_encode_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    message = ClientMessage(
+        ClientActions.PAGE_CONTROLS_BATCH,
+        [
+            ClientMessage(
+                ClientActions.ADD_PAGE_CONTROLS,
+                AddPageControlsPayload(
+                    controls=[{"t": "text", "i": "_1", "p": "page", "c": []}]
+                ),
+            ),
+            ClientMessage(
+                ClientActions.REMOVE_CONTROL, RemoveControlPayload(ids=["_2"])
+            ),
+        ],
+    )
+    m = encode_message(message, MessageEncodings.MSGPACK)
+    assert isinstance(m, bytes)
+    # map marker, so clients can tell it from JSON
+    assert 0x80 <= m[0] <= 0x8F
+    assert msgpack.unpackb(m) == json.loads(encode_message(message))
+
+
+def test_compress_message():
+    assert negotiate_compression(None) is None
+    assert negotiate_compression(["gzip"]) is None
+    compression = negotiate_compression(["gzip", "zlib"])
+    assert compression == MessageCompressions.ZLIB
+
+    assert compress_message("{}", compression, threshold=10) == "{}"
+    assert compress_message("{}" * 10, None, threshold=10) == "{}" * 10
+    m = compress_message("{}" * 10, compression, threshold=10)
+    assert m[0] == 0x78
+    assert zlib.decompress(m) == b"{}" * 10
+
+
+def test_batch_client_messages():
+    def update(id):
+        return ClientMessage(
+            ClientActions.UPDATE_CONTROL_PROPS,
+            UpdateControlPropsPayload(props=[{"i": id, "value": "a"}]),
+        )
+
+    remove = ClientMessage(
+        ClientActions.REMOVE_CONTROL, RemoveControlPayload(ids=["_3"])
+    )
+    batch = ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, [update("_2"), remove])
+    crashed = ClientMessage(
+        ClientActions.SESSION_CRASHED, SessionCrashedPayload(message="error")
+    )
+
+    assert batch_client_messages([]) == []
+    assert batch_client_messages([batch]) == [batch]
+    assert batch_client_messages([update("_1"), "{}", update("_2")]) == [
+        update("_1"),
+        "{}",
+        update("_2"),
+    ]
+    assert batch_client_messages([update("_1"), batch, crashed, update("_4")]) == [
+        ClientMessage(
+            ClientActions.PAGE_CONTROLS_BATCH, [update("_1"), update("_2"), remove]
+        ),
+        crashed,
+        update("_4"),
+    ]
+    assert len(batch.payload) == 2
+
+
+def _update(id):
+    return ClientMessage(
+        ClientActions.UPDATE_CONTROL_PROPS,
+        UpdateControlPropsPayload(props=[{"i": id, "value": "a"}]),
+    )
+
+
+@pytest.mark.parametrize("encoding", [MessageEncodings.JSON, MessageEncodings.MSGPACK])
+def test_batch_encoded_messages(encoding):
+    if encoding == MessageEncodings.MSGPACK:
+        pytest.importorskip("msgpack")
+    remove = ClientMessage(
+        ClientActions.REMOVE_CONTROL, RemoveControlPayload(ids=["_3"])
+    )
+    batch = ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, [_update("_2"), remove])
+
+    # single message is sent as is
+    assert batch_encoded_messages(
+        [EncodedControlMessages([_update("_1")], encoding)]
+    ) == [encode_message(_update("_1"), encoding)]
+
+    # joined frame is the same as encoded batch
+    frames = batch_encoded_messages(
+        [
+            EncodedControlMessages([_update("_1")], encoding),
+            EncodedControlMessages([batch], encoding),
+            "{}",
+            EncodedControlMessages([_update("_4")], encoding),
+        ]
+    )
+    assert frames == [
+        encode_message(
+            ClientMessage(
+                ClientActions.PAGE_CONTROLS_BATCH,
+                [_update("_1"), _update("_2"), remove],
+            ),
+            encoding,
+        ),
+        "{}",
+        encode_message(_update("_4"), encoding),
+    ]
+
+
+def test_batch_compressed_messages():
+    small = EncodedControlMessages(
+        [_update("_1")],
+        compression=MessageCompressions.ZLIB,
+        compression_threshold=1000,
+    )
+    large = EncodedControlMessages(
+        [_update(f"_{i}") for i in range(100)],
+        compression=MessageCompressions.ZLIB,
+        compression_threshold=1000,
+    )
+    assert small.frame is None
+    assert len(large) == 100
+
+    # compressed frames are not joined with others
+    frames = batch_encoded_messages([small, large, small])
+    assert len(frames) == 3
+    assert frames[1] == large.frame
+    assert json.loads(zlib.decompress(frames[1])) == json.loads(
+        encode_message(
+            ClientMessage(
+                ClientActions.PAGE_CONTROLS_BATCH,
+                [_update(f"_{i}") for i in range(100)],
+            )
+        )
+    )
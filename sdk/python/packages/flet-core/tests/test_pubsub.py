@@ -0,0 +1,292 @@
+import asyncio
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flet_core.pubsub import LocalPubSubBackend, PubSubHub, UnixSocketPubSubBackend
+from flet_core.pubsub.topic_trie import TopicTrie
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def _fail():
+    raise ValueError("can't unpickle")
+
+
+class _Unpicklable:
+    def __reduce__(self):
+        return _fail, ()
+
+
+def _hub(loop, backend=None, channel="app"):
+    return PubSubHub(loop=loop, backend=backend, channel=channel)
+
+
+def test_hub_without_backend(loop):
+    hub = _hub(loop)
+    received = []
+    hub.subscribe("s1", lambda m: received.append(("s1", m)))
+    hub.subscribe("s2", lambda m: received.append(("s2", m)))
+    hub.subscribe_topic("s1", "t", lambda t, m: received.append(("s1", t, m)))
+
+    hub.send_all("a")
+    hub.send_others("s1", "b")
+    hub.send_all_on_topic("t", "c")
+    hub.send_others_on_topic("s1", "t", "d")
+    assert received == [("s1", "a"), ("s2", "a"), ("s2", "b"), ("s1", "t", "c")]
+
+
+def test_unsubscribe_all(loop):
+    hub = _hub(loop)
+    received = []
+    hub.subscribe("s1", lambda m: received.append(m))
+    hub.subscribe_topic("s1", "t1", lambda t, m: received.append(m))
+    hub.subscribe_topic("s1", "t2", lambda t, m: received.append(m))
+    hub.unsubscribe_all("s1")
+
+    hub.send_all("a")
+    hub.send_all_on_topic("t1", "b")
+    hub.send_all_on_topic("t2", "c")
+    assert received == []
+
+
+def test_local_backend_delivers_to_all_hubs_of_channel(loop):
+    backend = LocalPubSubBackend()
+    hub1 = _hub(loop, backend)
+    hub2 = _hub(loop, backend)
+    other_app = _hub(loop, backend, channel="other")
+    received = []
+    hub1.subscribe("s1", lambda m: received.append(("s1", m)))
+    hub2.subscribe("s2", lambda m: received.append(("s2", m)))
+    other_app.subscribe("s3", lambda m: received.append(("s3", m)))
+    hub2.subscribe_topic("s2", "t", lambda t, m: received.append(("s2", t, m)))
+
+    hub1.send_all("a")
+    hub1.send_others("s2", "b")
+    hub1.send_all_on_topic("t", "c")
+    hub2.send_others_on_topic("s2", "t", "d")
+    assert received == [("s1", "a"), ("s2", "a"), ("s1", "b"), ("s2", "t", "c")]
+
+    hub2.close()
+    hub1.send_all("e")
+    assert received[-1] == ("s1", "e")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires Unix sockets")
+def test_unix_socket_backend(loop, tmp_path):
+    path = str(tmp_path.joinpath("pubsub.sock"))
+    backend1 = UnixSocketPubSubBackend(path)
+    assert backend1.wait_connected(5)
+    backend2 = UnixSocketPubSubBackend(path)
+    assert backend2.wait_connected(5)
+
+    hub1 = _hub(loop, backend1)
+    hub2 = _hub(loop, backend2)
+    received = []
+    received_event = threading.Event()
+
+    def on_message(m):
+        received.append(m)
+        received_event.set()
+
+    hub2.subscribe("s2", on_message)
+    # broker could still be registering the second connection
+    for _ in range(50):
+        hub1.send_all("hello")
+        if received_event.wait(0.1):
+            break
+    assert received[0] == "hello"
+
+    # message which can't be unpickled doesn't stop delivery
+    received.clear()
+    received_event.clear()
+    hub1.send_all(_Unpicklable())
+    hub1.send_all("after")
+    assert received_event.wait(5)
+    assert received == ["after"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires Unix sockets")
+def test_unix_socket_backend_stalled_process(loop, tmp_path):
+    path = str(tmp_path.joinpath("pubsub.sock"))
+    backend1 = UnixSocketPubSubBackend(path, broker_queue_size=100)
+    assert backend1.wait_connected(5)
+    backend2 = UnixSocketPubSubBackend(path)
+    assert backend2.wait_connected(5)
+    # process which never reads messages
+    stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stalled.connect(path)
+
+    hub1 = _hub(loop, backend1)
+    hub2 = _hub(loop, backend2)
+    received = []
+    received_event = threading.Event()
+
+    def on_message(m):
+        received.append(m)
+        if m == "last":
+            received_event.set()
+
+    hub2.subscribe("s2", on_message)
+    for _ in range(50):
+        hub1.send_all("hello")
+        if received:
+            break
+        time.sleep(0.1)
+
+    # much more than socket buffers and queue of stalled process
+    message = "x" * 65536
+    for _ in range(200):
+        hub1.send_all(message)
+    hub1.send_all("last")
+    assert received_event.wait(5)
+    assert received.count(message) == 200
+
+    # stalled process is disconnected
+    stalled.settimeout(5)
+    while stalled.recv(65536):
+        pass
+    stalled.close()
+
+
+def test_topic_trie_wildcards():
+    trie = TopicTrie()
+    trie.add("room/1", "exact", 1)
+    trie.add("room/*", "single", 2)
+    trie.add("room/#", "multi", 3)
+    trie.add("#", "all", 4)
+    trie.add("*/1/messages", "inner", 5)
+
+    def match(topic):
+        return sorted(s for s, _ in trie.match(topic))
+
+    assert match("room/1") == ["all", "exact", "multi", "single"]
+    assert match("room/2") == ["all", "multi", "single"]
+    assert match("room") == ["all", "multi"]
+    assert match("room/1/messages") == ["all", "inner", "multi"]
+    assert match("lobby") == ["all"]
+
+    trie.remove("room/*", "single")
+    trie.remove("#", "all")
+    trie.remove("room/unknown", "exact")
+    assert match("room/2") == ["multi"]
+
+    # snapshots of matched subscribers follow changes
+    trie.add("room/#", "multi2", 6)
+    assert match("room/2") == ["multi", "multi2"]
+    trie.remove("room/#", "multi")
+    assert match("room/2") == ["multi2"]
+
+    with pytest.raises(ValueError):
+        trie.add("room/#/messages", "s", 6)
+
+
+def test_hub_topic_wildcards(loop):
+    hub = _hub(loop)
+    received = []
+    hub.subscribe_topic("s1", "room/*", lambda t, m: received.append(("s1", t, m)))
+    hub.subscribe_topic("s2", "room/#", lambda t, m: received.append(("s2", t, m)))
+
+    hub.send_all_on_topic("room/1", "a")
+    hub.send_others_on_topic("s2", "room/1/messages", "b")
+    hub.send_all_on_topic("lobby", "c")
+    assert sorted(received) == [("s1", "room/1", "a"), ("s2", "room/1", "a")]
+
+    hub.unsubscribe_topic("s1", "room/*")
+    hub.send_all_on_topic("room/2", "d")
+    assert received[-1] == ("s2", "room/2", "d")
+
+
+def test_async_and_executor_handlers():
+    loop = asyncio.new_event_loop()
+    executor = ThreadPoolExecutor()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    try:
+        hub = PubSubHub(loop=loop, executor=executor)
+        received = []
+        all_received = threading.Event()
+
+        def on_message(m):
+            received.append(m)
+            if len(received) == 200:
+                all_received.set()
+
+        async def on_message_async(m):
+            on_message(m)
+
+        for i in range(100):
+            hub.subscribe(f"sync-{i}", on_message)
+            hub.subscribe(f"async-{i}", on_message_async)
+
+        hub.send_all("a")
+        assert all_received.wait(5)
+        assert received == ["a"] * 200
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        executor.shutdown()
+
+
+def _run_pending(loop):
+    loop.run_until_complete(asyncio.sleep(0.01))
+
+
+def test_mailbox_fifo_order(loop):
+    hub = _hub(loop)
+    received = []
+
+    async def on_message(m):
+        # a slow handler must not let later messages overtake it
+        await asyncio.sleep(0.001 if m % 2 == 0 else 0)
+        received.append(m)
+
+    hub.subscribe("s1", on_message)
+    for i in range(5):
+        hub.send_all(i)
+    _run_pending(loop)
+    assert received == [0, 1, 2, 3, 4]
+
+
+def test_mailbox_drops_oldest(loop):
+    hub = PubSubHub(loop=loop, max_mailbox_size=3)
+    received = []
+
+    async def on_message(m):
+        received.append(m)
+
+    hub.subscribe("s1", on_message)
+    for i in range(5):
+        hub.send_all(i)
+    _run_pending(loop)
+    assert received == [2, 3, 4]
+    assert hub.dropped_messages == 2
+
+
+def test_mailbox_coalesces_topic_messages(loop):
+    hub = _hub(loop)
+    received = []
+
+    async def on_message(t, m):
+        received.append((t, m))
+
+    hub.subscribe_topic("s1", "telemetry/#", on_message, coalesce=True)
+    hub.subscribe_topic("s2", "telemetry/#", on_message)
+    for i in range(3):
+        hub.send_all_on_topic("telemetry/cpu", i)
+        hub.send_all_on_topic("telemetry/mem", i)
+    _run_pending(loop)
+
+    # s1 gets the latest value of every topic, s2 gets every message
+    assert received.count(("telemetry/cpu", 2)) == 2
+    assert received.count(("telemetry/mem", 2)) == 2
+    assert len(received) == 8
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import threading
+from typing import List
+
+import flet_core as ft
+import pytest
+from flet_core.event import Event
+from flet_core.local_connection import LocalConnection
+from flet_core.page import Page
+from flet_core.protocol import (
+    ClientActions,
+    ClientMessage,
+    Command,
+    EncodedControlMessages,
+    InvokeMethodPayload,
+    PageCommandsBatchResponsePayload,
+    UpdateControlPropsPayload,
+)
+from flet_core.send_queue import SendQueue, SendQueuePolicy
+
+
+def _update(id, value):
+    return ClientMessage(
+        ClientActions.UPDATE_CONTROL_PROPS,
+        UpdateControlPropsPayload(props=[{"i": id, "value": value}]),
+    )
+
+
+def _invoke(method_id):
+    return ClientMessage(
+        ClientActions.INVOKE_METHOD,
+        InvokeMethodPayload(
+            methodId=method_id, methodName="m", controlId="page", arguments={}
+        ),
+    )
+
+
+def test_unbounded_queue():
+    async def main():
+        q = SendQueue(asyncio.get_running_loop())
+        for i in range(100):
+            q.put(_update("_1", str(i)))
+        assert q.depth == 100
+        messages = await q.get_all()
+        assert len(messages) == 100
+        assert q.depth == 0
+        assert q.peak_depth == 100
+
+    asyncio.run(main())
+
+
+def test_block_policy():
+    async def main():
+        q = SendQueue(asyncio.get_running_loop(), max_size=2)
+
+        def produce():
+            for i in range(5):
+                q.put(_update("_1", str(i)))
+                q.wait_not_full()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+
+        received = []
+        while len(received) < 5:
+            messages = await q.get_all()
+            assert len(messages) <= 2
+            received.extend(messages)
+        producer.join()
+        assert [m.payload.props[0]["value"] for m in received] == [
+            "0",
+            "1",
+            "2",
+            "3",
+            "4",
+        ]
+        assert q.peak_depth == 2
+
+    asyncio.run(main())
+
+
+def test_coalesce_policy():
+    async def main():
+        q = SendQueue(
+            asyncio.get_running_loop(), max_size=2, policy=SendQueuePolicy.COALESCE
+        )
+        for i in range(5):
+            q.put(_update(f"_{i % 2}", str(i)))
+        messages = await q.get_all()
+        assert messages == [
+            ClientMessage(
+                ClientActions.UPDATE_CONTROL_PROPS,
+                UpdateControlPropsPayload(
+                    props=[{"i": "_0", "value": "2"}, {"i": "_1", "value": "3"}]
+                ),
+            ),
+            _update("_0", "4"),
+        ]
+
+    asyncio.run(main())
+
+
+def test_drop_policy():
+    async def main():
+        q = SendQueue(
+            asyncio.get_running_loop(),
+            max_size=2,
+            policy=SendQueuePolicy.DROP,
+            resync=lambda: "resync",
+        )
+        q.put(_update("_1", "1"))
+        q.put(_invoke("1"))
+        q.put(_update("_1", "2"))
+        q.put(_update("_1", "3"))
+        assert await q.get_all() == ["resync", _invoke("1")]
+        assert q.dropped == 3
+
+    asyncio.run(main())
+
+
+def test_drop_policy_requires_resync():
+    with pytest.raises(ValueError):
+        SendQueue(asyncio.new_event_loop(), policy=SendQueuePolicy.DROP)
+
+
+def test_close_releases_producers():
+    async def main():
+        q = SendQueue(asyncio.get_running_loop(), max_size=1)
+        q.put(_update("_1", "1"))
+        producer = threading.Thread(target=q.wait_not_full)
+        producer.start()
+        await asyncio.sleep(0.1)
+        q.close()
+        producer.join(1)
+        assert not producer.is_alive()
+        assert q.depth == 0
+
+    asyncio.run(main())
+
+
+class _QueueConnection(LocalConnection):
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_size: int):
+        super().__init__()
+        self.send_queue = SendQueue(loop, max_size=max_size)
+
+    def send_commands(self, session_id: str, commands: List[Command]):
+        results = []
+        messages = []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ["add", "get"]:
+                results.append(result)
+            if message:
+                messages.append(message)
+        self.send_queue.put(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages))
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+    def wait_send_queue(self, session_id: str):
+        self.send_queue.wait_not_full()
+
+    async def send_loop(self):
+        try:
+            while True:
+                await self.send_queue.get_all()
+                await asyncio.sleep(0.001)  # slow client
+        except asyncio.CancelledError:
+            pass
+
+
+def test_full_queue_does_not_block_event_loop():
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever)
+    loop_thread.start()
+    conn = _QueueConnection(loop, max_size=1)
+    page = Page(conn, "s1", loop=loop)
+    send_loop = asyncio.run_coroutine_threadsafe(conn.send_loop(), loop)
+    text = ft.Text()
+    page.add(text)
+
+    def produce():
+        for i in range(200):
+            text.value = str(i)
+            text.update()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    try:
+        # event loop applies client changes of the control being updated
+        change = Event("page", "change", json.dumps([{"i": text.uid, "a": "1"}]))
+        for _ in range(50):
+            asyncio.run_coroutine_threadsafe(page.on_event_async(change), loop).result(
+                5
+            )
+        producer.join(5)
+        assert not producer.is_alive()
+    finally:
+        conn.send_queue.close()
+        producer.join()
+        send_loop.cancel()
+        # let send loop handle cancellation before the loop stops
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+
+
+def test_coalesce_policy_encodes_messages():
+    async def main():
+        q = SendQueue(
+            asyncio.get_running_loop(),
+            max_size=2,
+            policy=SendQueuePolicy.COALESCE,
+            encode=lambda m: EncodedControlMessages([m]),
+        )
+        for i in range(5):
+            q.put(EncodedControlMessages([_update(f"_{i % 2}", str(i))]))
+        messages = await q.get_all()
+        assert [m.messages for m in messages] == [
+            [
+                ClientMessage(
+                    ClientActions.UPDATE_CONTROL_PROPS,
+                    UpdateControlPropsPayload(
+                        props=[{"i": "_0", "value": "2"}, {"i": "_1", "value": "3"}]
+                    ),
+                )
+            ],
+            [_update("_0", "4")],
+        ]
+
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+import flet_core as ft
+import pytest
+
+
+async def _forever(started: threading.Event):
+    started.set()
+    await asyncio.sleep(60)
+
+
+def _start(control, n=1):
+    futures = []
+    for _ in range(n):
+        started = threading.Event()
+        futures.append(control.run_task(_forever, started))
+        assert started.wait(5)
+    return futures
+
+
+def _wait_cancelled(futures):
+    for f in futures:
+        with pytest.raises(Exception):
+            f.result(5)
+        assert f.cancelled()
+
+
+def test_control_tasks_cancelled_on_remove(page):
+    text = ft.Text()
+    column = ft.Column([text])
+    page.add(column)
+
+    futures = _start(text, 2)
+    assert text.task_count == 2
+    assert page.task_count == 2
+
+    page.remove(column)
+    _wait_cancelled(futures)
+    assert text.task_count == 0
+    assert page.task_count == 0
+
+
+def test_control_tasks_cancelled_on_clean_and_update(page):
+    column = ft.Column([ft.Text(), ft.Text()])
+    page.add(column)
+
+    cleaned = _start(column.controls[0])
+    column.clean()
+    _wait_cancelled(cleaned)
+
+    column.controls = [ft.Text()]
+    column.update()
+    kept = _start(column)
+    removed = _start(column.controls[0])
+    column.controls.clear()
+    column.update()
+    _wait_cancelled(removed)
+    assert not kept[0].done()
+    assert column.task_count == 1
+
+
+def test_done_tasks_are_forgotten(page):
+    async def add(a, b):
+        return a + b
+
+    assert page.run_task(add, 1, 2).result(5) == 3
+    assert page.task_count == 0
+
+
+def test_tasks_cancelled_on_close(page):
+    text = ft.Text()
+    page.add(text)
+    futures = _start(page) + _start(text)
+    assert page.task_count == 2
+
+    page._close()
+    _wait_cancelled(futures)
+    assert page.task_count == 0
+    assert text.task_count == 0
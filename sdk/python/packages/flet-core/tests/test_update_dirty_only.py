@@ -0,0 +1,99 @@
+import flet_core as ft
+
+
+def build_tree():
+    col = ft.Column()
+    col._Control__uid = "col"
+    for i in range(0, 3):
+        row = ft.Row([ft.Text(f"{i}")])
+        col.controls.append(row)
+
+    index = []
+    commands = []
+    col.build_update_commands(index, commands, [], [], False)
+    # assign IDs like page does
+    for i, row in enumerate(col.controls):
+        row._Control__uid = f"row{i}"
+        row.controls[0]._Control__uid = f"text{i}"
+    return col
+
+
+def test_dirty_only_sends_changed_controls():
+    col = build_tree()
+    col.controls[1].controls[0].value = "changed"
+
+    commands = []
+    col.build_update_commands([], commands, [], [], False, dirty_only=True)
+    assert [(cmd.name, cmd.values, cmd.attrs) for cmd in commands] == [
+        ("set", ["text1"], {"value": "changed"})
+    ]
+
+    commands = []
+    col.build_update_commands([], commands, [], [], False, dirty_only=True)
+    assert commands == []
+
+
+def test_dirty_only_skips_clean_subtrees():
+    col = build_tree()
+    col.controls[2].controls.append(ft.Text("new"))
+
+    # clean row is not visited
+    commands = []
+    col.build_update_commands([], commands, [], [], False, dirty_only=True)
+    assert commands == []
+
+    # explicitly updated row is
+    commands = []
+    col.controls[2].build_update_commands([], commands, [], [], False, dirty_only=True)
+    assert [(cmd.name, cmd.attrs) for cmd in commands] == [
+        ("add", {"to": "row2", "at": "1"})
+    ]
+
+
+def test_full_update_visits_clean_subtrees():
+    col = build_tree()
+    col.controls[2].controls.append(ft.Text("new"))
+
+    commands = []
+    col.build_update_commands([], commands, [], [], False)
+    assert [(cmd.name, cmd.attrs) for cmd in commands] == [
+        ("add", {"to": "row2", "at": "1"})
+    ]
+
+
+def test_dirty_only_sends_field_properties():
+    col = build_tree()
+    container = ft.Container(ft.Text("a"))
+    col.controls.append(container)
+    col.build_update_commands([], [], [], [], False)
+    container._Control__uid = "container"
+    assert not container._Control__dirty
+
+    container.padding = 20
+    commands = []
+    col.build_update_commands([], commands, [], [], False, dirty_only=True)
+    assert [(cmd.name, cmd.values, cmd.attrs) for cmd in commands] == [
+        ("set", ["container"], {"padding": "20"})
+    ]
+
+    # replaced content is visited too
+    container.content = ft.Text("b")
+    commands = []
+    col.build_update_commands([], commands, [], [], False, dirty_only=True)
+    assert [(cmd.name, cmd.attrs) for cmd in commands] == [
+        ("remove", {}),
+        ("add", {"to": "container", "at": "0"}),
+    ]
+
+
+def test_dirty_only_sends_property_set_as_field_or_attribute():
+    col = build_tree()
+    text = col.controls[0].controls[0]
+
+    # TextStyle is kept in a field, TextThemeStyle in an attribute
+    text.style = ft.TextStyle(size=20)
+    commands = []
+    col.build_update_commands([], commands, [], [], False, dirty_only=True)
+    assert [(cmd.name, cmd.values, list(cmd.attrs)) for cmd in commands] == [
+        ("set", ["text0"], ["style"])
+    ]
@@ -11,10 +11,10 @@ from flet_core.protocol import (
     ClientActions,
     ClientMessage,
     Command,
-    CommandEncoder,
     PageCommandResponsePayload,
     PageCommandsBatchResponsePayload,
     RegisterWebClientRequestPayload,
+    encode_message,
 )
 
 logger = logging.getLogger(flet.__name__)
@@ -99,6 +99,6 @@ class PyodideConnection(LocalConnection):
         return PageCommandsBatchResponsePayload(results=results, error="")
 
     def __send(self, message: ClientMessage):
-        j = json.dumps(message, cls=CommandEncoder, separators=(",", ":"))
+        j = encode_message(message)
         logger.debug(f"__send: {j}")
         self.send_callback(j)
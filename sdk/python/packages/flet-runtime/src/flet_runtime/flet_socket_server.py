@@ -15,12 +15,15 @@ from flet_core.protocol import (
     ClientActions,
     ClientMessage,
     Command,
-    CommandEncoder,
+    MessageEncodings,
     PageCommandResponsePayload,
     PageCommandsBatchResponsePayload,
     RegisterWebClientRequestPayload,
+    encode_message,
+    negotiate_encoding,
 )
 from flet_core.pubsub import PubSubHub
+from flet_core.send_queue import SendQueue, SendQueuePolicy
 from flet_core.utils import random_string
 from flet_runtime.utils import get_free_tcp_port, is_windows
 
@@ -37,9 +40,13 @@ class FletSocketServer(LocalConnection):
         on_session_created=None,
         blocking=False,
         executor: Optional[ThreadPoolExecutor] = None,
+        max_send_queue_size: Optional[int] = None,
+        send_queue_policy: SendQueuePolicy = SendQueuePolicy.BLOCK,
     ):
         super().__init__()
-        self.__send_queue = asyncio.Queue()
+        self.__send_queue = SendQueue(
+            loop, max_size=max_send_queue_size, policy=send_queue_policy
+        )
         self.__port = port
         self.__uds_path = uds_path
         self.__on_event = on_event
@@ -49,6 +56,11 @@ class FletSocketServer(LocalConnection):
         self.__executor = executor
         self.pubsubhub = PubSubHub(loop=loop, executor=executor)
         self.__running_tasks = set()
+        self.__encoding = MessageEncodings.JSON
+
+    @property
+    def send_queue(self) -> SendQueue:
+        return self.__send_queue
 
     async def start(self):
         self.__connected = False
@@ -106,16 +118,20 @@ class FletSocketServer(LocalConnection):
 
     async def __send_loop(self, writer: asyncio.StreamWriter):
         while True:
-            message = await self.__send_queue.get()
+            messages = await self.__send_queue.get_all()
             try:
-                data = message.encode("utf-8")
-                msg = struct.pack(">I", len(data)) + data
-                writer.write(msg)
-                # await writer.drain()
-                logger.debug(f"sent to TCP: {len(msg)}")
+                for message in messages:
+                    m = encode_message(message, self.__encoding)
+                    logger.debug(f"__send: {m}")
+                    data = m.encode("utf-8") if isinstance(m, str) else m
+                    msg = struct.pack(">I", len(data)) + data
+                    writer.write(msg)
+                    logger.debug(f"sent to TCP: {len(msg)}")
+                # wait for slow client to let messages accumulate in the queue
+                await writer.drain()
             except Exception:
-                # re-enqueue the message to repeat it when re-connected
-                self.__send_queue.put_nowait(message)
+                # re-enqueue messages to repeat them when re-connected
+                self.__send_queue.put_back(messages)
                 raise
 
     async def __on_message(self, data: str):
@@ -123,8 +139,13 @@ class FletSocketServer(LocalConnection):
         msg_dict = json.loads(data)
         msg = ClientMessage(**msg_dict)
         task = None
+        if msg.action != ClientActions.UPDATE_CONTROL_PROPS:
+            # apply control changes before other events
+            self.__flush_update_control_props()
+
         if msg.action == ClientActions.REGISTER_WEB_CLIENT:
             self._client_details = RegisterWebClientRequestPayload(**msg.payload)
+            self.__encoding = negotiate_encoding(self._client_details.encodings)
 
             # register response
             self.__send(self._create_register_web_client_response())
@@ -142,10 +163,9 @@ class FletSocketServer(LocalConnection):
                 )
 
         elif msg.action == ClientActions.UPDATE_CONTROL_PROPS:
-            if self.__on_event is not None:
-                task = asyncio.create_task(
-                    self.__on_event(self._create_update_control_props_handler_arg(msg))
-                )
+            # merge control changes received in the same event loop tick
+            if self.__on_event is not None and self._merge_update_control_props(msg):
+                asyncio.get_running_loop().call_soon(self.__flush_update_control_props)
         else:
             # it's something else
             raise Exception(f'Unknown message "{msg.action}": {msg.payload}')
@@ -154,6 +174,13 @@ class FletSocketServer(LocalConnection):
             self.__running_tasks.add(task)
             task.add_done_callback(self.__running_tasks.discard)
 
+    def __flush_update_control_props(self):
+        e = self._pop_update_control_props_handler_arg()
+        if e is not None:
+            task = asyncio.create_task(self.__on_event(e))
+            self.__running_tasks.add(task)
+            task.add_done_callback(self.__running_tasks.discard)
+
     def send_command(self, session_id: str, command: Command):
         result, message = self._process_command(command)
         if message:
@@ -173,10 +200,11 @@ class FletSocketServer(LocalConnection):
             self.__send(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages))
         return PageCommandsBatchResponsePayload(results=results, error="")
 
+    def wait_send_queue(self, session_id: str):
+        self.__send_queue.wait_not_full()
+
     def __send(self, message: ClientMessage):
-        j = json.dumps(message, cls=CommandEncoder, separators=(",", ":"))
-        logger.debug(f"__send: {j}")
-        self.__loop.call_soon_threadsafe(self.__send_queue.put_nowait, j)
+        self.__send_queue.put(message)
 
     async def close(self):
         logger.debug("Closing connection...")
@@ -196,6 +224,7 @@ class FletSocketServer(LocalConnection):
         # close socket
         if self.__receive_loop_task:
             self.__receive_loop_task.cancel()
+        self.__send_queue.close()
         if self.__send_loop_task:
             self.__send_loop_task.cancel()
         if self.__server:
@@ -0,0 +1,96 @@
+"""
+Load benchmark of FletAppManager session registry: N sessions receiving
+M events/sec each while other sessions connect, reconnect and disconnect.
+
+Prints achieved event rate and latency of `get_session()` calls made
+for every event.
+
+Run with:
+
+    python benchmarks/bench_session_registry.py [sessions] [events_per_second]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from flet.fastapi.flet_app_manager import FletAppManager
+
+DURATION_SECONDS = 5
+CHURN_PER_SECOND = 200
+
+
+class FakePage:
+    # stands for Page: connecting and disconnecting pages call
+    # "connect"/"disconnect" event handlers which take a while
+    def __init__(self):
+        self.connection = None
+        self.expires_at = None
+
+    async def _connect(self, conn):
+        await asyncio.sleep(0.001)
+        self.expires_at = None
+
+    async def _disconnect(self, session_timeout_seconds):
+        self.expires_at = datetime.now(timezone.utc) + timedelta(
+            seconds=session_timeout_seconds
+        )
+        await asyncio.sleep(0.001)
+
+    def _close(self):
+        pass
+
+
+async def session_events(manager, session_id, events_per_second, latencies):
+    interval = 1 / events_per_second
+    end = time.perf_counter() + DURATION_SECONDS
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await manager.get_session(session_id)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def session_churn(manager):
+    i = 0
+    end = time.perf_counter() + DURATION_SECONDS
+    while time.perf_counter() < end:
+        session_id = f"churn_{i}"
+        await manager.add_session(session_id, FakePage())
+        await manager.disconnect_session(session_id, 0)
+        await manager.reconnect_session(session_id, None)
+        await manager.delete_session(session_id)
+        i += 1
+        await asyncio.sleep(1 / CHURN_PER_SECOND)
+
+
+async def main(sessions, events_per_second):
+    manager = FletAppManager()
+    for i in range(sessions):
+        await manager.add_session(f"session_{i}", FakePage())
+
+    latencies = []
+    await asyncio.gather(
+        session_churn(manager),
+        *[
+            session_events(manager, f"session_{i}", events_per_second, latencies)
+            for i in range(sessions)
+        ],
+    )
+
+    latencies.sort()
+    print(
+        f"{sessions} sessions x {events_per_second} events/s: "
+        f"{len(latencies) / DURATION_SECONDS:.0f} events/s, get_session latency "
+        f"p50 {statistics.median(latencies) * 1e6:.1f} us, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.1f} us, "
+        f"max {latencies[-1] * 1e6:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    events_per_second = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(sessions, events_per_second))
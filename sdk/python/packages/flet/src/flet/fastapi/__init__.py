@@ -4,3 +4,9 @@ from flet.fastapi.flet_app_manager import app_manager
 from flet.fastapi.flet_fastapi import FastAPI
 from flet.fastapi.flet_static_files import FletStaticFiles
 from flet.fastapi.flet_upload import FletUpload
+from flet.fastapi.session_store import (
+    FileSessionStore,
+    SessionData,
+    SessionStore,
+    SQLiteSessionStore,
+)
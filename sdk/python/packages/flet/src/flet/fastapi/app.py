@@ -7,12 +7,17 @@ from flet.fastapi.flet_app import (
     DEFAULT_FLET_OAUTH_STATE_TIMEOUT,
     DEFAULT_FLET_SESSION_TIMEOUT,
     FletApp,
+    get_send_queue_options,
 )
 from flet.fastapi.flet_fastapi import FastAPI
 from flet.fastapi.flet_oauth import FletOAuth
 from flet.fastapi.flet_static_files import FletStaticFiles
+from flet.fastapi.flet_app_manager import app_manager
 from flet.fastapi.flet_upload import FletUpload
+from flet.fastapi.session_store import SessionStore
 from flet_core.page import Page
+from flet_core.pubsub.pubsub_backend import PubSubBackend, UnixSocketPubSubBackend
+from flet_core.send_queue import SendQueuePolicy
 from flet_core.types import WebRenderer
 
 
@@ -32,6 +37,14 @@ def app(
     secret_key: Optional[str] = None,
     session_timeout_seconds: int = DEFAULT_FLET_SESSION_TIMEOUT,
     oauth_state_timeout_seconds: int = DEFAULT_FLET_OAUTH_STATE_TIMEOUT,
+    compression_threshold: Optional[int] = None,
+    send_linger_seconds: float = 0,
+    max_send_queue_size: Optional[int] = None,
+    send_queue_policy: SendQueuePolicy = SendQueuePolicy.BLOCK,
+    keep_page_snapshot: bool = True,
+    session_store: Optional[SessionStore] = None,
+    pubsub_backend: Optional[PubSubBackend] = None,
+    max_threads_per_session: Optional[int] = None,
 ):
     """
     Mount all Flet FastAPI handlers in one call.
@@ -51,8 +64,36 @@ def app(
     * `secret_key` (str, optional) - secret key to sign and verify upload requests.
     * `session_timeout_seconds` (int, optional)- session lifetime, in seconds, after user disconnected.
     * `oauth_state_timeout_seconds` (int, optional) - OAuth state lifetime, in seconds, which is a maximum allowed time between starting OAuth flow and redirecting to OAuth callback URL.
+    * `compression_threshold` (int, optional) - compress messages of this size, in bytes, or larger if the client supports compression. Compression is disabled if `None`.
+    * `send_linger_seconds` (float, optional) - time to wait for more outgoing messages to send them in one frame.
+    * `max_send_queue_size` (int, optional) - maximum number of control messages waiting to be sent to a slow client. Unlimited if `None`.
+    * `send_queue_policy` (SendQueuePolicy) - what to do with a new message when send queue is full: `BLOCK` (default) session thread, `COALESCE` queued control updates or `DROP` queued messages and re-send the entire page.
+    * `keep_page_snapshot` (bool) - whether to keep a copy of page controls to restore them on a client reconnecting to existing session. If `False` a new session is started on reconnect and `DROP` send queue policy is not available. Default is `True`.
+    * `session_store` (SessionStore, optional) - persistent store of session storage, e.g. `FileSessionStore` or `SQLiteSessionStore`, to restore sessions after application restart.
+    * `pubsub_backend` (PubSubBackend, optional) - backend delivering PubSub messages between application processes, e.g. `UnixSocketPubSubBackend` for multiple workers on the same host.
+    * `max_threads_per_session` (int, optional) - maximum number of sync event and PubSub handlers of a session running at the same time. Unlimited if `None`.
     """
 
+    # fail on startup rather than on the first connection
+    get_send_queue_options(send_queue_policy, keep_page_snapshot)
+
+    if session_store:
+        app_manager.session_store = session_store
+
+    env_pubsub_socket = os.getenv("FLET_PUBSUB_SOCKET")
+    if env_pubsub_socket and not pubsub_backend:
+        pubsub_backend = UnixSocketPubSubBackend(env_pubsub_socket)
+
+    if pubsub_backend:
+        app_manager.pubsub_backend = pubsub_backend
+
+    env_max_threads_per_session = os.getenv("FLET_MAX_THREADS_PER_SESSION")
+    if env_max_threads_per_session:
+        max_threads_per_session = int(env_max_threads_per_session)
+
+    if max_threads_per_session:
+        app_manager.session_executor.max_workers_per_session = max_threads_per_session
+
     env_upload_dir = os.getenv("FLET_UPLOAD_DIR")
     if env_upload_dir:
         upload_dir = env_upload_dir
@@ -85,6 +126,11 @@ def app(
             oauth_state_timeout_seconds=oauth_state_timeout_seconds,
             upload_endpoint_path=upload_endpoint_path,
             secret_key=secret_key,
+            compression_threshold=compression_threshold,
+            send_linger_seconds=send_linger_seconds,
+            max_send_queue_size=max_send_queue_size,
+            send_queue_policy=send_queue_policy,
+            keep_page_snapshot=keep_page_snapshot,
         ).handle(websocket)
 
     if upload_dir:
@@ -0,0 +1,65 @@
+import asyncio
+import heapq
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Tuple
+
+
+class ExpiryQueue:
+    """
+    Keys ordered by their expiration time.
+
+    Keys can be pushed from any thread. Expired keys are popped in O(log n)
+    each, so a sweep costs O(expired) rather than O(total). A key pushed
+    again with a new expiration time is returned once per push; callers
+    should compare the returned expiration time with the current one.
+    """
+
+    def __init__(self):
+        self.__heap: List[Tuple[datetime, int, Any]] = []
+        self.__counter = itertools.count()
+        self.__lock = threading.Lock()
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__waiter: Optional[asyncio.Future] = None
+
+    def push(self, key: Any, expires_at: datetime):
+        with self.__lock:
+            entry = (expires_at, next(self.__counter), key)
+            heapq.heappush(self.__heap, entry)
+            if self.__heap[0] is entry and self.__waiter is not None:
+                # wake up waiter to re-schedule for earlier time
+                self.__loop.call_soon_threadsafe(_wake, self.__waiter)
+                self.__waiter = None
+
+    def pop_expired(self) -> List[Tuple[Any, datetime]]:
+        now = datetime.now(timezone.utc)
+        expired = []
+        with self.__lock:
+            while self.__heap and self.__heap[0][0] <= now:
+                expires_at, _, key = heapq.heappop(self.__heap)
+                expired.append((key, expires_at))
+        return expired
+
+    async def wait(self):
+        """
+        Waits until the earliest key expires.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.__lock:
+                timeout = None
+                if self.__heap:
+                    timeout = (
+                        self.__heap[0][0] - datetime.now(timezone.utc)
+                    ).total_seconds()
+                    if timeout <= 0:
+                        return
+                self.__loop = loop
+                waiter = self.__waiter = loop.create_future()
+            await asyncio.wait([waiter], timeout=timeout)
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
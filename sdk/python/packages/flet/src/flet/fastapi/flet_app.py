@@ -1,11 +1,10 @@
 import asyncio
-import copy
 import json
 import logging
 import os
 import traceback
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import flet.fastapi as flet_fastapi
 from fastapi import WebSocket, WebSocketDisconnect
@@ -18,15 +17,23 @@ from flet_core.protocol import (
     ClientActions,
     ClientMessage,
     Command,
-    CommandEncoder,
+    EncodedControlMessages,
+    MessageEncodings,
     PageCommandResponsePayload,
     PageCommandsBatchResponsePayload,
     RegisterWebClientRequestPayload,
+    batch_encoded_messages,
+    compress_message,
+    encode_message,
+    is_control_message,
+    negotiate_compression,
+    negotiate_encoding,
 )
 from flet_core.pubsub import PubSubHub
+from flet_core.send_queue import SendQueue, SendQueuePolicy
 from flet_core.utils import random_string
 from flet_runtime.uploads import build_upload_url
-from flet_runtime.utils import sha1
+from flet_runtime.utils import get_bool_env_var, sha1
 
 logger = logging.getLogger(flet_fastapi.__name__)
 
@@ -37,6 +44,27 @@ _pubsubhubs_lock = asyncio.Lock()
 _pubsubhubs = {}
 
 
+def get_send_queue_options(
+    send_queue_policy: SendQueuePolicy, keep_page_snapshot: bool
+) -> Tuple[SendQueuePolicy, bool]:
+    """
+    Returns send queue policy and `keep_page_snapshot` overridden with
+    environment variables. Raises `ValueError` if `DROP` policy, which
+    re-sends page snapshot, is used without it.
+    """
+    env_send_queue_policy = os.getenv("FLET_SEND_QUEUE_POLICY")
+    if env_send_queue_policy:
+        send_queue_policy = SendQueuePolicy(env_send_queue_policy)
+
+    env_keep_page_snapshot = get_bool_env_var("FLET_KEEP_PAGE_SNAPSHOT")
+    if env_keep_page_snapshot is not None:
+        keep_page_snapshot = env_keep_page_snapshot
+
+    if send_queue_policy == SendQueuePolicy.DROP and not keep_page_snapshot:
+        raise ValueError("DROP send queue policy requires keep_page_snapshot=True")
+    return send_queue_policy, keep_page_snapshot
+
+
 class FletApp(LocalConnection):
     def __init__(
         self,
@@ -46,6 +74,11 @@ class FletApp(LocalConnection):
         oauth_state_timeout_seconds: int = DEFAULT_FLET_OAUTH_STATE_TIMEOUT,
         upload_endpoint_path: Optional[str] = None,
         secret_key: Optional[str] = None,
+        compression_threshold: Optional[int] = None,
+        send_linger_seconds: float = 0,
+        max_send_queue_size: Optional[int] = None,
+        send_queue_policy: SendQueuePolicy = SendQueuePolicy.BLOCK,
+        keep_page_snapshot: bool = True,
     ):
         """
         Handle Flet app WebSocket connections.
@@ -57,6 +90,11 @@ class FletApp(LocalConnection):
         * `oauth_state_timeout_seconds` (int, optional) - OAuth state lifetime, in seconds, which is a maximum allowed time between starting OAuth flow and redirecting to OAuth callback URL.
         * `upload_endpoint_path` (str, optional) - absolute URL of upload endpoint, e.g. `/upload`.
         * `secret_key` (str, optional) - secret key to sign upload requests.
+        * `compression_threshold` (int, optional) - compress messages of this size, in bytes, or larger if the client supports compression. Compression is disabled if `None`.
+        * `send_linger_seconds` (float, optional) - time to wait for more outgoing messages to send them in one frame.
+        * `max_send_queue_size` (int, optional) - maximum number of control messages waiting to be sent to a slow client. Unlimited if `None`.
+        * `send_queue_policy` (SendQueuePolicy) - what to do with a new message when send queue is full: `BLOCK` (default) session thread, `COALESCE` queued control updates or `DROP` queued messages and re-send the entire page.
+        * `keep_page_snapshot` (bool) - whether to keep a copy of page controls to restore them on a client reconnecting to existing session. If `False` a new session is started on reconnect and `DROP` send queue policy is not available. Default is `True`.
         """
         super().__init__()
         self.__id = random_string(8)
@@ -76,8 +114,49 @@ class FletApp(LocalConnection):
         if env_oauth_state_timeout_seconds:
             self.__oauth_state_timeout_seconds = int(env_oauth_state_timeout_seconds)
 
+        self.__compression_threshold = compression_threshold
+        env_compression_threshold = os.getenv("FLET_COMPRESSION_THRESHOLD")
+        if env_compression_threshold:
+            self.__compression_threshold = int(env_compression_threshold)
+
         self.__upload_endpoint_path = upload_endpoint_path
         self.__secret_key = secret_key
+        self.__encoding = MessageEncodings.JSON
+        self.__compression = None
+        self.__send_linger_seconds = send_linger_seconds
+        self.__frames_sent = 0
+        self.__frames_saved = 0
+
+        self.__max_send_queue_size = max_send_queue_size
+        env_max_send_queue_size = os.getenv("FLET_MAX_SEND_QUEUE_SIZE")
+        if env_max_send_queue_size:
+            self.__max_send_queue_size = int(env_max_send_queue_size)
+
+        self.__send_queue_policy, self.__keep_page_snapshot = get_send_queue_options(
+            send_queue_policy, keep_page_snapshot
+        )
+
+    @property
+    def frames_sent(self) -> int:
+        """
+        Number of WebSocket frames sent to the client.
+        """
+        return self.__frames_sent
+
+    @property
+    def frames_saved(self) -> int:
+        """
+        Number of messages sent in a batch with other messages instead of
+        a frame of their own.
+        """
+        return self.__frames_saved
+
+    @property
+    def send_queue(self) -> Optional[SendQueue]:
+        """
+        Queue of messages waiting to be sent to the connected client.
+        """
+        return self.__send_queue
 
     async def handle(self, websocket: WebSocket):
         """
@@ -101,7 +180,12 @@ class FletApp(LocalConnection):
         async with _pubsubhubs_lock:
             psh = _pubsubhubs.get(self.__session_handler, None)
             if psh is None:
-                psh = PubSubHub(loop=self.__loop, executor=app_manager.executor)
+                psh = PubSubHub(
+                    loop=self.__loop,
+                    executor=app_manager.session_executor,
+                    backend=app_manager.pubsub_backend,
+                    channel=f"{self.__session_handler.__module__}.{self.__session_handler.__qualname__}",
+                )
                 _pubsubhubs[self.__session_handler] = psh
             self.pubsubhub = psh
 
@@ -114,7 +198,15 @@ class FletApp(LocalConnection):
             )
 
         await self.__websocket.accept()
-        self.__send_queue = asyncio.Queue()
+        self.__send_queue = SendQueue(
+            asyncio.get_running_loop(),
+            max_size=self.__max_send_queue_size,
+            policy=self.__send_queue_policy,
+            resync=(
+                self.__create_resync_message if self.__keep_page_snapshot else None
+            ),
+            encode=self.__encode_control_message,
+        )
         st = asyncio.create_task(self.__send_loop())
         await self.__receive_loop()
         st.cancel()
@@ -168,13 +260,52 @@ class FletApp(LocalConnection):
         assert self.__websocket
         assert self.__send_queue
         while True:
-            message = await self.__send_queue.get()
-            try:
-                await self.__websocket.send_text(message)
-            except Exception:
-                # re-enqueue the message to repeat it when re-connected
-                self.__send_queue.put_nowait(message)
-                raise
+            messages = await self.__send_queue.get_all()
+            if self.__send_linger_seconds > 0:
+                await asyncio.sleep(self.__send_linger_seconds)
+                messages.extend(self.__send_queue.get_all_nowait())
+
+            # control messages are encoded by session threads already,
+            # consecutive ones are only joined into a single frame
+            frames = batch_encoded_messages(messages)
+            self.__frames_saved += len(messages) - len(frames)
+            for i, frame in enumerate(frames):
+                try:
+                    await self.__send_frame(frame)
+                except Exception:
+                    # re-enqueue messages to repeat them when re-connected
+                    self.__send_queue.put_back(frames[i:])
+                    raise
+                self.__frames_sent += 1
+
+    async def __send_frame(self, message: Union[ClientMessage, str, bytes]):
+        assert self.__websocket
+        m = (
+            self.__encode_frame(message)
+            if isinstance(message, ClientMessage)
+            else message
+        )
+        logger.debug(f"__send: {m}")
+        if isinstance(m, bytes):
+            await self.__websocket.send_bytes(m)
+        else:
+            await self.__websocket.send_text(m)
+
+    def __encode_frame(self, message: ClientMessage) -> Union[str, bytes]:
+        m = encode_message(message, self.__encoding)
+        if self.__compression:
+            m = compress_message(m, self.__compression, self.__compression_threshold)
+        return m
+
+    def __encode_control_message(
+        self, message: ClientMessage
+    ) -> EncodedControlMessages:
+        return EncodedControlMessages(
+            [message],
+            self.__encoding,
+            self.__compression,
+            self.__compression_threshold or 0,
+        )
 
     async def __receive_loop(self):
         assert self.__websocket
@@ -190,14 +321,33 @@ class FletApp(LocalConnection):
                     self.__session_timeout_seconds,
                 )
         self.__websocket = None
+        if self.__send_queue:
+            self.__send_queue.close()
         self.__send_queue = None
 
     async def __on_message(self, data: str):
         logger.debug(f"_on_message: {data}")
         msg_dict = json.loads(data)
         msg = ClientMessage(**msg_dict)
+        if msg.action != ClientActions.UPDATE_CONTROL_PROPS:
+            # apply control changes before other events
+            self.__flush_update_control_props()
+
         if msg.action == ClientActions.REGISTER_WEB_CLIENT:
             self._client_details = RegisterWebClientRequestPayload(**msg.payload)
+            self.__encoding = negotiate_encoding(self._client_details.encodings)
+            if self.__compression_threshold is not None:
+                self.__compression = negotiate_compression(
+                    self._client_details.compressions
+                )
+
+            if not self.__keep_page_snapshot and self._client_details.sessionId:
+                # controls of existing session can't be restored without
+                # snapshot, so it's replaced with a new one
+                await app_manager.delete_session(
+                    self.__get_unique_session_id(self._client_details.sessionId)
+                )
+                self._client_details.sessionId = ""
 
             new_session = True
             if (
@@ -207,21 +357,36 @@ class FletApp(LocalConnection):
                 )
                 is None
             ):
-                # generate session ID
-                self._client_details.sessionId = random_string(16)
+                # restore session saved before application restart
+                session_data = (
+                    await app_manager.load_session(
+                        self.__get_unique_session_id(self._client_details.sessionId)
+                    )
+                    if self._client_details.sessionId
+                    else None
+                )
+                if session_data is None:
+                    # generate session ID
+                    self._client_details.sessionId = random_string(16)
+                else:
+                    logger.info(f"Restoring session: {self._client_details.sessionId}")
 
                 # create new Page object
                 self.__page = Page(
                     self,
                     self._client_details.sessionId,
-                    executor=app_manager.executor,
+                    executor=app_manager.session_executor,
                     loop=asyncio.get_running_loop(),
                 )
+                if session_data is not None:
+                    for k, v in session_data.storage.items():
+                        self.__page.session.set(k, v)
 
                 # register session
                 await app_manager.add_session(
                     self.__get_unique_session_id(self._client_details.sessionId),
                     self.__page,
+                    self.__session_timeout_seconds,
                 )
             else:
                 # existing session
@@ -269,9 +434,14 @@ class FletApp(LocalConnection):
                 self.__page.snapshot["page"] = p
             self.__page.copy_attrs(p)
 
-            # send register response
+            # send register response encoded right away as snapshot
+            # could be changed by session handler before it's sent
             self.__send(
-                self._create_register_web_client_response(controls=self.__page.snapshot)
+                self.__encode_frame(
+                    self._create_register_web_client_response(
+                        controls=self.__page.snapshot
+                    )
+                )
             )
 
             # start session
@@ -294,14 +464,18 @@ class FletApp(LocalConnection):
                 )
 
         elif msg.action == ClientActions.UPDATE_CONTROL_PROPS:
-            if self.__on_event is not None:
-                asyncio.create_task(
-                    self.__on_event(self._create_update_control_props_handler_arg(msg))
-                )
+            # merge control changes received in the same event loop tick
+            if self.__on_event is not None and self._merge_update_control_props(msg):
+                asyncio.get_running_loop().call_soon(self.__flush_update_control_props)
         else:
             # it's something else
             raise Exception(f'Unknown message "{msg.action}": {msg.payload}')
 
+    def __flush_update_control_props(self):
+        e = self._pop_update_control_props_handler_arg()
+        if e is not None:
+            asyncio.create_task(self.__on_event(e))
+
     def _process_get_upload_url_command(self, attrs):
         assert len(attrs) == 2, '"getUploadUrl" command has wrong number of attrs'
         assert (
@@ -335,66 +509,31 @@ class FletApp(LocalConnection):
     def _process_add_command(self, command: Command):
         assert self.__page
         result, message = super()._process_add_command(command)
-        if message:
-            for oc in message.payload.controls:
-                control = copy.deepcopy(oc)
-                id = control["i"]
-                pid = control["p"]
-                parent = self.__page.snapshot[pid]
-                assert parent, f"parent control not found: {pid}"
-                if id not in parent["c"]:
-                    if "at" in control:
-                        parent["c"].insert(int(control["at"]), id)
-                    else:
-                        parent["c"].append(id)
-                self.__page.snapshot[id] = control
+        if message and self.__keep_page_snapshot:
+            self.__page.snapshot.add_controls(message.payload.controls)
         return result, message
 
     def _process_set_command(self, values, attrs):
         assert self.__page
         result, message = super()._process_set_command(values, attrs)
-        control = self.__page.snapshot.get(values[0])
-        if control:
-            for k, v in attrs.items():
-                control[k] = v
+        if self.__keep_page_snapshot:
+            self.__page.snapshot.set_props(values[0], attrs)
         return result, message
 
     def _process_remove_command(self, values):
         assert self.__page
         result, message = super()._process_remove_command(values)
-        for id in values:
-            control = self.__page.snapshot.get(id)
-            assert (
-                control is not None
-            ), f"_process_remove_command: control with ID '{id}' not found."
-            for cid in self.__get_all_descendant_ids(id):
-                self.__page.snapshot.pop(cid, None)
-            # delete control itself
-            self.__page.snapshot.pop(id, None)
-            # remove id from parent
-            parent = self.__page.snapshot.get(control["p"])
-            if parent:
-                parent["c"].remove(id)
+        if self.__keep_page_snapshot:
+            self.__page.snapshot.remove_controls(values)
         return result, message
 
     def _process_clean_command(self, values):
         assert self.__page
         result, message = super()._process_clean_command(values)
-        for id in values:
-            for cid in self.__get_all_descendant_ids(id):
-                self.__page.snapshot.pop(cid, None)
+        if self.__keep_page_snapshot:
+            self.__page.snapshot.clean_controls(values)
         return result, message
 
-    def __get_all_descendant_ids(self, id):
-        assert self.__page
-        ids = []
-        control = self.__page.snapshot.get(id)
-        if control:
-            for cid in control["c"]:
-                ids.append(cid)
-                ids.extend(self.__get_all_descendant_ids(cid))
-        return ids
-
     def send_command(self, session_id: str, command: Command):
         if command.name == "oauthAuthorize":
             result, message = self.__process_oauth_authorize_command(command.attrs)
@@ -420,11 +559,27 @@ class FletApp(LocalConnection):
             self.__send(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages))
         return PageCommandsBatchResponsePayload(results=results, error="")
 
-    def __send(self, message: ClientMessage):
-        m = json.dumps(message, cls=CommandEncoder, separators=(",", ":"))
-        logger.debug(f"__send: {m}")
-        if self.__send_queue:
-            self.__loop.call_soon_threadsafe(self.__send_queue.put_nowait, m)
+    def wait_send_queue(self, session_id: str):
+        send_queue = self.__send_queue
+        if send_queue:
+            send_queue.wait_not_full()
+
+    def __send(self, message: Union[ClientMessage, str, bytes]):
+        send_queue = self.__send_queue
+        if send_queue:
+            if is_control_message(message):
+                # encoded on the session thread instead of the send loop
+                # shared by all sessions
+                message = self.__encode_control_message(message)
+            send_queue.put(message)
+
+    def __create_resync_message(self):
+        # sent instead of dropped messages to replace all controls on
+        # the client with page snapshot
+        assert self.__page
+        return self.__encode_frame(
+            self._create_register_web_client_response(controls=self.__page.snapshot)
+        )
 
     def _get_next_control_id(self):
         assert self.__page
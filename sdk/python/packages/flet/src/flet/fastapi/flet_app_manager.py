@@ -1,18 +1,24 @@
 import asyncio
 import logging
+import os
 import shutil
 import threading
 import traceback
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import flet.fastapi as flet_fastapi
+from flet.fastapi.expiry_queue import ExpiryQueue
 from flet.fastapi.oauth_state import OAuthState
+from flet.fastapi.session_store import SessionData, SessionStore
 from flet_core.connection import Connection
+from flet_core.fair_executor import FairExecutor
 from flet_core.locks import NopeLock
 from flet_core.page import Page
+from flet_core.pubsub.pubsub_backend import PubSubBackend
 from flet_core.utils.concurrency_utils import is_pyodide
+from flet_core.utils.process_pool import shutdown_process_executor
 
 logger = logging.getLogger(flet_fastapi.__name__)
 
@@ -20,22 +26,76 @@ logger = logging.getLogger(flet_fastapi.__name__)
 class FletAppManager:
     """
     Manage application sessions and their lifetime.
+
+    Sessions are accessed in event loop thread only, so session registry
+    is not locked and event dispatch never waits for sessions being
+    added, reconnected or evicted.
     """
 
     def __init__(self):
-        self.__sessions_lock = asyncio.Lock()
         self.__sessions: dict[str, Page] = {}
+        self.__session_timeouts: dict[str, int] = {}
+        self.__sessions_expiry = ExpiryQueue()
+        self.__session_store: Optional[SessionStore] = None
+        self.__pubsub_backend: Optional[PubSubBackend] = None
         self.__evict_sessions_task = None
         self.__states: dict[str, OAuthState] = {}
+        self.__states_expiry = ExpiryQueue()
         self.__states_lock = threading.Lock() if not is_pyodide() else NopeLock()
         self.__evict_oauth_states_task = None
         self.__temp_dirs = {}
-        self.__executor = ThreadPoolExecutor(thread_name_prefix="flet_fastapi")
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self.__executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="flet_fastapi"
+        )
+        # handlers get a pool of their own, so session handlers running in
+        # `executor` don't take workers it dispatches to
+        self.__session_executor = FairExecutor(
+            ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="flet_fastapi_session"
+            ),
+            max_workers,
+        )
+        # slow session store I/O doesn't delay sync session handlers
+        self.__store_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="flet_fastapi_store"
+        )
 
     @property
     def executor(self):
         return self.__executor
 
+    @property
+    def session_executor(self) -> FairExecutor:
+        """
+        Scheduler of sync event and PubSub handlers of all sessions, with
+        its queue metrics.
+        """
+        return self.__session_executor
+
+    @property
+    def session_store(self) -> Optional[SessionStore]:
+        return self.__session_store
+
+    @session_store.setter
+    def session_store(self, value: Optional[SessionStore]):
+        """
+        Persistent store of session storage to restore sessions after
+        application restart.
+        """
+        self.__session_store = value
+
+    @property
+    def pubsub_backend(self) -> Optional[PubSubBackend]:
+        return self.__pubsub_backend
+
+    @pubsub_backend.setter
+    def pubsub_backend(self, value: Optional[PubSubBackend]):
+        """
+        Backend delivering PubSub messages between application processes.
+        """
+        self.__pubsub_backend = value
+
     async def start(self):
         """
         Background task evicting expired app data. Must be called at FastAPI application startup.
@@ -54,43 +114,54 @@ class FletAppManager:
         Cleanup temporary Flet resources on application shutdown.
         """
         logger.info("Shutting down Flet App Manager")
+        now = datetime.now(timezone.utc)
+        for session_id, page in list(self.__sessions.items()):
+            # connected sessions expire as if their users disconnected now
+            expires_at = page.expires_at or now + timedelta(
+                seconds=self.__session_timeouts[session_id]
+            )
+            await self.__save_session(session_id, page, expires_at)
         self.delete_temp_dirs()
+        shutdown_process_executor(wait=False)
         if self.__evict_sessions_task:
             self.__evict_sessions_task.cancel()
         if self.__evict_oauth_states_task:
             self.__evict_oauth_states_task.cancel()
 
     async def get_session(self, session_id: str) -> Optional[Page]:
-        async with self.__sessions_lock:
-            return self.__sessions.get(session_id)
-
-    async def add_session(self, session_id: str, conn: Page):
-        async with self.__sessions_lock:
-            self.__sessions[session_id] = conn
-            logger.info(
-                f"New session created ({len(self.__sessions)} total): {session_id}"
-            )
+        return self.__sessions.get(session_id)
+
+    async def add_session(
+        self, session_id: str, conn: Page, session_timeout_seconds: int
+    ):
+        self.__sessions[session_id] = conn
+        self.__session_timeouts[session_id] = session_timeout_seconds
+        logger.info(f"New session created ({len(self.__sessions)} total): {session_id}")
 
     async def reconnect_session(self, session_id: str, conn: Connection):
         logger.info(f"Session reconnected: {session_id}")
-        async with self.__sessions_lock:
-            if session_id in self.__sessions:
-                page = self.__sessions[session_id]
-                old_conn = page.connection
-                await page._connect(conn)
-                if old_conn:
-                    old_conn.dispose()
+        page = self.__sessions.get(session_id)
+        if page is not None:
+            old_conn = page.connection
+            await page._connect(conn)
+            if old_conn:
+                old_conn.dispose()
 
     async def disconnect_session(self, session_id: str, session_timeout_seconds: int):
         logger.info(f"Session disconnected: {session_id}")
-        async with self.__sessions_lock:
-            if session_id in self.__sessions:
-                await self.__sessions[session_id]._disconnect(session_timeout_seconds)
+        page = self.__sessions.get(session_id)
+        if page is not None:
+            await page._disconnect(session_timeout_seconds)
+            if page.expires_at:
+                self.__sessions_expiry.push(session_id, page.expires_at)
+            await self.__save_session(session_id, page, page.expires_at)
 
     async def delete_session(self, session_id: str):
-        async with self.__sessions_lock:
-            page = self.__sessions.pop(session_id, None)
-            total = len(self.__sessions)
+        page = self.__sessions.pop(session_id, None)
+        self.__session_timeouts.pop(session_id, None)
+        total = len(self.__sessions)
+        if self.__session_store:
+            await self.__run_in_store(self.__session_store.delete, session_id)
         if page is not None:
             logger.info(f"Delete session ({total} left): {session_id}")
             try:
@@ -103,10 +174,44 @@ class FletAppManager:
                     f"Error deleting expired session: {e} {traceback.format_exc()}"
                 )
 
+    async def load_session(self, session_id: str) -> Optional[SessionData]:
+        """
+        Loads data of a session from session store, if configured.
+        """
+        if not self.__session_store:
+            return None
+        data = await self.__run_in_store(self.__session_store.load, session_id)
+        if data is not None and data.is_expired():
+            await self.__run_in_store(self.__session_store.delete, session_id)
+            return None
+        return data
+
+    async def __save_session(
+        self, session_id: str, page: Page, expires_at: Optional[datetime]
+    ):
+        if not self.__session_store:
+            return
+        data = SessionData(
+            session_id=session_id,
+            storage={k: page.session.get(k) for k in page.session.get_keys()},
+            expires_at=expires_at,
+        )
+        await self.__run_in_store(self.__session_store.save, data)
+
+    async def __run_in_store(self, fn, *args):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.__store_executor, fn, *args
+            )
+        except Exception as e:
+            logger.error(f"Session store error: {e} {traceback.format_exc()}")
+
     def store_state(self, state_id: str, state: OAuthState):
         logger.info(f"Store oauth state: {state_id}")
         with self.__states_lock:
             self.__states[state_id] = state
+        if state.expires_at:
+            self.__states_expiry.push(state_id, state.expires_at)
 
     def retrieve_state(self, state_id: str) -> Optional[OAuthState]:
         with self.__states_lock:
@@ -117,29 +222,22 @@ class FletAppManager:
 
     async def __evict_expired_sessions(self):
         while True:
-            await asyncio.sleep(10)
-            session_ids = []
-            async with self.__sessions_lock:
-                for session_id, page in self.__sessions.items():
-                    if page.expires_at and datetime.now(timezone.utc) > page.expires_at:
-                        session_ids.append(session_id)
-            for session_id in session_ids:
-                await self.delete_session(session_id)
+            await self.__sessions_expiry.wait()
+            for session_id, expires_at in self.__sessions_expiry.pop_expired():
+                # skip sessions reconnected or disconnected again since then
+                page = self.__sessions.get(session_id)
+                if page is not None and page.expires_at == expires_at:
+                    await self.delete_session(session_id)
 
     async def __evict_expired_oauth_states(self):
         while True:
-            await asyncio.sleep(10)
-            with self.__states_lock:
-                ids = []
-                for id, state in self.__states.items():
-                    if (
-                        state.expires_at
-                        and datetime.now(timezone.utc) > state.expires_at
-                    ):
-                        ids.append(id)
-                for id in ids:
-                    logger.info(f"Delete expired oauth state: {id}")
-                    self.retrieve_state(id)
+            await self.__states_expiry.wait()
+            for id, expires_at in self.__states_expiry.pop_expired():
+                with self.__states_lock:
+                    state = self.__states.get(id)
+                    if state is not None and state.expires_at == expires_at:
+                        logger.info(f"Delete expired oauth state: {id}")
+                        del self.__states[id]
 
     def delete_temp_dirs(self):
         for temp_dir in self.__temp_dirs.keys():
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import flet.fastapi as flet_fastapi
+
+logger = logging.getLogger(flet_fastapi.__name__)
+
+
+@dataclass
+class SessionData:
+    session_id: str
+    storage: Dict[str, Any] = field(default_factory=dict)
+    expires_at: Optional[datetime] = None
+
+    def is_expired(self) -> bool:
+        return (
+            self.expires_at is not None and datetime.now(timezone.utc) > self.expires_at
+        )
+
+    def to_json(self) -> str:
+        storage = {}
+        for key, value in self.storage.items():
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                logger.warning(
+                    f"Session {self.session_id} storage key '{key}' is not JSON serializable and won't be persisted."
+                )
+                continue
+            storage[key] = value
+        return json.dumps(
+            {
+                "session_id": self.session_id,
+                "storage": storage,
+                "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            }
+        )
+
+    @staticmethod
+    def from_json(data: str) -> "SessionData":
+        d = json.loads(data)
+        return SessionData(
+            session_id=d["session_id"],
+            storage=d["storage"],
+            expires_at=(
+                datetime.fromisoformat(d["expires_at"]) if d["expires_at"] else None
+            ),
+        )
+
+
+class SessionStore:
+    """
+    Persistent store of session data, so sessions can be restored after
+    application restart.
+
+    Store methods are blocking and called in a thread pool.
+    """
+
+    def load(self, session_id: str) -> Optional[SessionData]:
+        raise NotImplementedError()
+
+    def save(self, data: SessionData):
+        raise NotImplementedError()
+
+    def delete(self, session_id: str):
+        raise NotImplementedError()
+
+
+class FileSessionStore(SessionStore):
+    """
+    Stores every session in a JSON file in `directory`. Expired sessions
+    are deleted when the store is opened.
+    """
+
+    def __init__(self, directory: str):
+        self.__directory = Path(directory)
+        os.makedirs(self.__directory, exist_ok=True)
+        self.__delete_expired()
+
+    def load(self, session_id: str) -> Optional[SessionData]:
+        path = self.__get_path(session_id)
+        if not path.exists():
+            return None
+        return SessionData.from_json(path.read_text(encoding="utf-8"))
+
+    def save(self, data: SessionData):
+        path = self.__get_path(data.session_id)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(data.to_json(), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def delete(self, session_id: str):
+        self.__get_path(session_id).unlink(missing_ok=True)
+
+    def __delete_expired(self):
+        for path in self.__directory.glob("*.json"):
+            try:
+                if SessionData.from_json(path.read_text(encoding="utf-8")).is_expired():
+                    path.unlink(missing_ok=True)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Error reading session file {path}: {e}")
+
+    def __get_path(self, session_id: str) -> Path:
+        name = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return self.__directory.joinpath(f"{name}.json")
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Stores sessions in `sessions` table of SQLite database at `path`.
+    Expired sessions are deleted when the store is opened.
+    """
+
+    def __init__(self, path: str):
+        self.__lock = threading.Lock()
+        self.__conn = sqlite3.connect(path, check_same_thread=False)
+        with self.__lock, self.__conn:
+            self.__conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            expired = []
+            for session_id, data in self.__conn.execute(
+                "SELECT id, data FROM sessions"
+            ):
+                try:
+                    if SessionData.from_json(data).is_expired():
+                        expired.append((session_id,))
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Error reading session {session_id}: {e}")
+            self.__conn.executemany("DELETE FROM sessions WHERE id = ?", expired)
+
+    def load(self, session_id: str) -> Optional[SessionData]:
+        with self.__lock:
+            row = self.__conn.execute(
+                "SELECT data FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        return SessionData.from_json(row[0]) if row else None
+
+    def save(self, data: SessionData):
+        with self.__lock, self.__conn:
+            self.__conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data) VALUES (?, ?)",
+                (data.session_id, data.to_json()),
+            )
+
+    def delete(self, session_id: str):
+        with self.__lock, self.__conn:
+            self.__conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+from flet.fastapi.expiry_queue import ExpiryQueue
+
+
+def _in(seconds: float) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+def test_pop_expired():
+    queue = ExpiryQueue()
+    assert queue.pop_expired() == []
+
+    t1, t2, t3 = _in(-3), _in(-2), _in(-1)
+    future = _in(60)
+    queue.push("c", t3)
+    queue.push("later", future)
+    queue.push("a", t1)
+    queue.push("b", t2)
+
+    # the earliest first, not expired keys stay
+    assert queue.pop_expired() == [("a", t1), ("b", t2), ("c", t3)]
+    assert queue.pop_expired() == []
+
+
+def test_pop_expired_returns_stale_entries():
+    queue = ExpiryQueue()
+    first, second = _in(-2), _in(-1)
+    queue.push("a", first)
+    queue.push("a", second)
+    queue.push("a", _in(60))
+
+    # a key is returned once per push, with expiration time of that push
+    assert queue.pop_expired() == [("a", first), ("a", second)]
+
+
+def test_wait_returns_when_key_expires():
+    queue = ExpiryQueue()
+    queue.push("a", _in(0.1))
+    asyncio.run(asyncio.wait_for(queue.wait(), 5))
+    assert [key for key, _ in queue.pop_expired()] == ["a"]
+
+
+def test_wait_wakes_on_earlier_push():
+    queue = ExpiryQueue()
+
+    async def main(push):
+        waiting = asyncio.create_task(queue.wait())
+        await asyncio.sleep(0.1)
+        assert not waiting.done()
+        # pushed from another thread
+        thread = threading.Thread(target=push)
+        thread.start()
+        thread.join()
+        await asyncio.wait_for(waiting, 5)
+
+    # empty queue
+    asyncio.run(main(lambda: queue.push("a", _in(0))))
+    assert [key for key, _ in queue.pop_expired()] == ["a"]
+
+    # key expiring earlier than the earliest one
+    queue.push("later", _in(60))
+    asyncio.run(main(lambda: queue.push("b", _in(0))))
+    assert [key for key, _ in queue.pop_expired()] == ["b"]
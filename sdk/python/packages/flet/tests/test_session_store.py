@@ -0,0 +1,110 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flet.fastapi.session_store import (
+    FileSessionStore,
+    SessionData,
+    SQLiteSessionStore,
+)
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def open_store(request, tmp_path):
+    def open_store():
+        if request.param == "file":
+            return FileSessionStore(str(tmp_path / "sessions"))
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+    return open_store
+
+
+def _in(seconds: int) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+def test_session_data_json_round_trip():
+    expires_at = _in(60)
+    data = SessionData(
+        session_id="s1",
+        storage={"name": "John", "items": [1, 2], "settings": {"dark": True}},
+        expires_at=expires_at,
+    )
+    restored = SessionData.from_json(data.to_json())
+    assert restored == data
+    assert restored.expires_at == expires_at
+
+    data = SessionData(session_id="s2")
+    assert SessionData.from_json(data.to_json()) == data
+
+
+def test_session_data_drops_non_json_values(caplog):
+    data = SessionData(session_id="s1", storage={"a": 1, "lock": object()})
+    assert SessionData.from_json(data.to_json()).storage == {"a": 1}
+    assert "'lock' is not JSON serializable" in caplog.text
+
+
+def test_session_data_is_expired():
+    assert not SessionData(session_id="s1").is_expired()
+    assert not SessionData(session_id="s1", expires_at=_in(60)).is_expired()
+    assert SessionData(session_id="s1", expires_at=_in(-60)).is_expired()
+
+
+def test_store_save_load_delete(open_store):
+    store = open_store()
+    assert store.load("s1") is None
+
+    data = SessionData(session_id="s1", storage={"a": 1}, expires_at=_in(60))
+    store.save(data)
+    assert store.load("s1") == data
+
+    data.storage["a"] = 2
+    store.save(data)
+    assert store.load("s1").storage == {"a": 2}
+
+    store.delete("s1")
+    assert store.load("s1") is None
+    store.delete("s1")
+
+
+def test_store_survives_reopen(open_store):
+    data = SessionData(session_id="s1", storage={"a": 1}, expires_at=_in(60))
+    open_store().save(data)
+    assert open_store().load("s1") == data
+
+
+def test_store_purges_expired_sessions_on_open(open_store):
+    store = open_store()
+    store.save(SessionData(session_id="expired", expires_at=_in(-60)))
+    store.save(SessionData(session_id="alive", expires_at=_in(60)))
+    store.save(SessionData(session_id="forever"))
+
+    store = open_store()
+    assert store.load("expired") is None
+    assert store.load("alive") is not None
+    assert store.load("forever") is not None
+
+
+def test_file_store_skips_corrupt_files(tmp_path, caplog):
+    directory = tmp_path / "sessions"
+    directory.mkdir()
+    directory.joinpath("corrupt.json").write_text("{", encoding="utf-8")
+
+    store = FileSessionStore(str(directory))
+    store.save(SessionData(session_id="s1"))
+    assert store.load("s1") is not None
+    assert "Error reading session file" in caplog.text
+
+
+def test_sqlite_store_skips_corrupt_rows(tmp_path, caplog):
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path)
+    store.save(SessionData(session_id="expired", expires_at=_in(-60)))
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO sessions (id, data) VALUES ('corrupt', '{')")
+        conn.execute("INSERT INTO sessions (id, data) VALUES ('no_keys', '{}')")
+
+    store = SQLiteSessionStore(path)
+    assert store.load("expired") is None
+    assert "Error reading session corrupt" in caplog.text
+    assert "Error reading session no_keys" in caplog.text